@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from datenerfassung.engine import ReceiptEngine
+from datenerfassung.project_paths import ProjectPaths
+from datenerfassung.rules.loader import RuleSet
+from datenerfassung.services.ingest_service.async_orchestrator import AsyncIngestOrchestrator
+from datenerfassung.services.ingest_service.orchestrator import IngestOrchestrator, RoutingConfig
+
+RULES_DIR = Path(__file__).resolve().parents[1] / "data" / "rules"
+OCR_TEXT = "Kaufland\n29.12.2025 12:07\nFrosch Waschmittel 2,99\nVollmilch 1,19\nBrot 2,49\nPfand 0,25\nSUMME 6,92"
+# Starlette runs sync endpoints on an anyio thread pool limited to 40 threads.
+SYNC_THREADS = 40
+
+
+def _stand_in_service(latency_s: float, ports: multiprocessing.Queue) -> None:
+    # Pretends to be the household receipt service: parses, waits `latency_s`, does not persist.
+    # Runs in its own process like the real service, so it does not compete for this process's GIL.
+    engine = ReceiptEngine(RuleSet.load_from_dir(RULES_DIR))
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self) -> None:
+            super().setup()
+            # http.server writes headers and body separately; without this Nagle + delayed ACKs add
+            # ~40 ms to every response.
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def do_POST(self) -> None:
+            req = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            receipt = engine.parse_text(req["text"], source_type=req["source_type"])
+            time.sleep(latency_s)
+            body = json.dumps(
+                {
+                    "status": "ok",
+                    "canonical_receipt_path": f"data/canonical/receipts/{receipt.receipt.id}.json",
+                    "receipt": receipt.model_dump(mode="json"),
+                }
+            ).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args: object) -> None:
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        # Listen backlog; the default of 5 drops SYNs when many clients connect at once.
+        request_queue_size = 1024
+
+    server = Server(("127.0.0.1", 0), Handler)
+    ports.put(server.server_address[1])
+    server.serve_forever()
+
+
+def _orchestrator(root: Path, routing: RoutingConfig) -> IngestOrchestrator:
+    data_dir = root / "data"
+    paths = ProjectPaths(
+        root=root,
+        data_dir=data_dir,
+        raw_dir=data_dir / "raw",
+        canonical_dir=data_dir / "canonical",
+        rules_dir=RULES_DIR,
+        schema_dir=root / "schema",
+    )
+    paths.ensure_dirs()
+    ruleset = RuleSet.load_from_dir(RULES_DIR)
+    return IngestOrchestrator(paths=paths, ruleset=ruleset, receipt_engine=ReceiptEngine(ruleset), routing=routing)
+
+
+def _check(orchestrator: IngestOrchestrator, label: str) -> None:
+    statuses = {}
+    for event in (orchestrator.paths.raw_dir / "ingest_events").glob("*.json"):
+        status = json.loads(event.read_text(encoding="utf-8")).get("status")
+        statuses[status] = statuses.get(status, 0) + 1
+    print(f"{label:<8} statuses: {statuses}")
+
+
+def _report(label: str, wall_s: float, latencies: list[float]) -> None:
+    lat = sorted(latencies)
+    p50 = statistics.median(lat) * 1000
+    p99 = lat[min(len(lat) - 1, int(len(lat) * 0.99))] * 1000
+    print(f"{label:<8} {len(lat) / wall_s:8.1f} uploads/s   p50 {p50:8.1f} ms   p99 {p99:8.1f} ms")
+
+
+# All uploads arrive at t0; latency is measured from arrival, so time spent waiting for a free
+# threadpool thread counts too.
+def _run_sync(orchestrator: IngestOrchestrator, uploads: int) -> None:
+    t0 = time.perf_counter()
+
+    def one(idx: int) -> float:
+        orchestrator.ingest_image(b"\xff\xd8fake-jpeg" * 512, filename=f"bon_{idx}.jpg", ocr_text=OCR_TEXT)
+        return time.perf_counter() - t0
+
+    with ThreadPoolExecutor(max_workers=SYNC_THREADS) as pool:
+        latencies = list(pool.map(one, range(uploads)))
+    _report("sync", time.perf_counter() - t0, latencies)
+
+
+def _run_async(orchestrator: IngestOrchestrator, uploads: int, io_workers: int) -> None:
+    async def main() -> tuple[float, list[float]]:
+        front = AsyncIngestOrchestrator(orchestrator, io_workers=io_workers)
+
+        t0 = time.perf_counter()
+
+        async def one(idx: int) -> float:
+            await front.ingest_image(b"\xff\xd8fake-jpeg" * 512, filename=f"bon_{idx}.jpg", ocr_text=OCR_TEXT)
+            return time.perf_counter() - t0
+
+        try:
+            latencies = await asyncio.gather(*(one(idx) for idx in range(uploads)))
+            return time.perf_counter() - t0, list(latencies)
+        finally:
+            await front.aclose()
+
+    wall, latencies = asyncio.run(main())
+    _report("async", wall, latencies)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Concurrent image uploads: sync (threadpool) vs async ingest.")
+    parser.add_argument("--uploads", type=int, default=200, help="Concurrent uploads per run.")
+    parser.add_argument("--service-latency-ms", type=float, default=50.0)
+    parser.add_argument("--connections", type=int, default=32, help="Receipt service connections.")
+    parser.add_argument("--io-workers", type=int, default=8)
+    parser.add_argument("--local", action="store_true", help="No receipt service; parse locally.")
+    args = parser.parse_args()
+
+    service = None
+    url = ""
+    if not args.local:
+        ports: multiprocessing.Queue = multiprocessing.Queue()
+        service = multiprocessing.Process(
+            target=_stand_in_service, args=(args.service_latency_ms / 1000, ports), daemon=True
+        )
+        service.start()
+        url = f"http://127.0.0.1:{ports.get(timeout=30)}"
+    routing = RoutingConfig(receipt_service_url=url, max_connections=args.connections, timeout_s=30)
+
+    mode = "local parse" if args.local else f"service latency {args.service_latency_ms:.0f} ms"
+    print(f"{args.uploads} concurrent uploads, cpus={os.cpu_count()}, {mode}, {args.connections} connections")
+    with tempfile.TemporaryDirectory() as tmp:
+        sync_orchestrator = _orchestrator(Path(tmp) / "sync", routing)
+        _run_sync(sync_orchestrator, args.uploads)
+        async_orchestrator = _orchestrator(Path(tmp) / "async", routing)
+        _run_async(async_orchestrator, args.uploads, args.io_workers)
+        _check(sync_orchestrator, "sync")
+        _check(async_orchestrator, "async")
+    if service is not None:
+        service.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+from datenerfassung.rules.categorization import categorize, compile_categories
+from datenerfassung.rules.loader import CategoriesRules, CategoryRule
+
+
+def _vocab(rng: random.Random, size: int) -> list[str]:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choices(letters, k=rng.randint(4, 10))) for _ in range(size)]
+
+
+def _rules(rng: random.Random, vocab: list[str], count: int, regex_share: float) -> list[CategoryRule]:
+    rules = []
+    for idx in range(count):
+        when_any: list[dict] = [{"contains_any": rng.sample(vocab, k=3)}]
+        if rng.random() < regex_share:
+            when_any.append({"regex": rf"\b{rng.choice(vocab)}\b"})
+        rules.append(
+            CategoryRule(
+                id=f"rule_{idx}",
+                priority=rng.randint(0, 300),
+                when_any=when_any,
+                then={"category": f"cat.{idx % 20}", "confidence": 0.9},
+            )
+        )
+    rules.sort(key=lambda r: r.priority, reverse=True)
+    return rules
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare linear vs. compiled categorization.")
+    parser.add_argument("--rules", type=int, default=300)
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--regex-share", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocab = _vocab(rng, max(50, args.rules * 2))
+    rules = _rules(rng, vocab, args.rules, args.regex_share)
+
+    items = []
+    for _ in range(args.items):
+        tokens = rng.choices(vocab, k=rng.randint(1, 4))
+        items.append((" ".join(tokens), tokens))
+
+    linear = CategoriesRules(rules=rules)
+    start = time.perf_counter()
+    compiled = CategoriesRules(rules=rules, compiled=compile_categories(rules))
+    compile_s = time.perf_counter() - start
+
+    timings = {}
+    results = {}
+    for label, ruleset in [("linear", linear), ("compiled", compiled)]:
+        start = time.perf_counter()
+        results[label] = [categorize(name, tokens, ruleset) for name, tokens in items]
+        timings[label] = time.perf_counter() - start
+
+    assert results["linear"] == results["compiled"], "compiled categorization diverged from linear scan"
+
+    print(f"rules={args.rules} items={args.items} compile={compile_s * 1000:.1f}ms")
+    for label, elapsed in timings.items():
+        print(f"{label:>9}: {elapsed * 1000:8.1f}ms  ({elapsed / args.items * 1e6:6.1f}us/item)")
+    print(f"  speedup: {timings['linear'] / timings['compiled']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from datenerfassung.event_store import EVENT_LOG_DIR, EVENTS_DIR, EventFiles, EventLog
+from datenerfassung.storage import DirectStorage, set_storage
+
+
+def _event(ingest_event_id: str, i: int) -> dict:
+    return {
+        "ingest_event_id": ingest_event_id,
+        "received_at": f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}T12:00:00+01:00",
+        "source_type": "text",
+        "source_name": None,
+        "raw_text_path": f"data/raw/ocr_text/{ingest_event_id}.txt",
+        "canonical_receipt_path": f"data/canonical/receipts/2025/2025-01-01_kaufland_{i}.json",
+        "detection": {"is_receipt": True, "score": 0.9, "reason": "merchant+total"},
+        "status": "ok_local",
+    }
+
+
+def _percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def _bench(label: str, store, ids: list[str], lookups: list[str], replay) -> None:
+    start = time.perf_counter()
+    for i, ingest_event_id in enumerate(ids):
+        store.append(_event(ingest_event_id, i))
+    append_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    replayed = sum(1 for _ in replay())
+    replay_s = time.perf_counter() - start
+
+    latencies = []
+    for ingest_event_id in lookups:
+        start = time.perf_counter()
+        store.get(ingest_event_id)
+        latencies.append(time.perf_counter() - start)
+    print(
+        f"{label:<6} append {len(ids) / append_s:>9.0f}/s  replay {replayed / replay_s:>9.0f}/s  "
+        f"get p50 {_percentile(latencies, 0.5) * 1e6:>7.1f}us p99 {_percentile(latencies, 0.99) * 1e6:>7.1f}us"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-file ingest events vs. the segmented event log.")
+    parser.add_argument("--events", type=int, default=50000)
+    parser.add_argument("--lookups", type=int, default=5000)
+    parser.add_argument("--segment-mb", type=float, default=1.0, help="Small segments to exercise sealed lookups.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--dir", type=Path, default=None, help="Directory on the disk/mount to test (default: tmp).")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    ids = [str(uuid.UUID(int=rng.getrandbits(128), version=4)) for _ in range(args.events)]
+    lookups = [rng.choice(ids) for _ in range(args.lookups)]
+    set_storage(DirectStorage())
+
+    with tempfile.TemporaryDirectory(prefix="bench_event_store_", dir=args.dir) as tmp:
+        raw_dir = Path(tmp)
+        print(f"events={args.events} lookups={args.lookups} segment={args.segment_mb}MiB dir={raw_dir}")
+        files = EventFiles(raw_dir / EVENTS_DIR)
+        _bench("files", files, ids, lookups, files.replay)
+        with EventLog(raw_dir / EVENT_LOG_DIR, segment_max_bytes=int(args.segment_mb * 1024 * 1024)) as log:
+            _bench("log", log, ids, lookups, log.replay)
+            segments = len(list((raw_dir / EVENT_LOG_DIR).glob("*.ndjson")))
+        print(f"files in {EVENTS_DIR}/: {len(ids)}, in {EVENT_LOG_DIR}/: {segments * 2 - 1} ({segments} segments)")
+
+
+if __name__ == "__main__":
+    main()
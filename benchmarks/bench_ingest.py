@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterable
+from datetime import UTC, datetime
+from pathlib import Path
+
+from synthetic_corpus import build_corpus, write_rules
+
+from datenerfassung.classification.receipt_detector import detect_receipt
+from datenerfassung.dedup import open_duplicate_index
+from datenerfassung.engine import IngestEngine, ReceiptEngine
+from datenerfassung.project_paths import ProjectPaths
+from datenerfassung.receipt.parser_de_v1 import parse_receipt_text
+from datenerfassung.receipt_index import open_receipt_index
+from datenerfassung.rules.categorization import categorize
+from datenerfassung.rules.loader import RuleSet
+from datenerfassung.rules.normalization import clean_text, normalize_name
+from datenerfassung.services.ingest_service.orchestrator import IngestOrchestrator, RoutingConfig
+from datenerfassung.storage import persist_canonical_receipt
+
+STAGES = (
+    "clean_text",
+    "detect_receipt",
+    "parse_receipt_text",
+    "normalize_name",
+    "categorize",
+    "persist_canonical_receipt",
+    "engine.ingest_text",
+    "orchestrator.ingest_text",
+)
+DEFAULT_BASELINE = Path(__file__).parent / "baselines" / "bench_ingest.json"
+
+
+def _measure(calls: Iterable[Callable[[], object]]) -> dict:
+    # Every call is timed on its own so the percentiles describe single operations.
+    latencies = []
+    for call in calls:
+        start = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    total = sum(latencies)
+    return {
+        "ops": len(latencies),
+        "ops_per_s": round(len(latencies) / total, 1) if total else 0.0,
+        "p50_us": round(_percentile(latencies, 0.50) * 1e6, 2),
+        "p99_us": round(_percentile(latencies, 0.99) * 1e6, 2),
+    }
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def _paths(root: Path, rules_dir: Path) -> ProjectPaths:
+    data_dir = root / "data"
+    paths = ProjectPaths(
+        root=root,
+        data_dir=data_dir,
+        raw_dir=data_dir / "raw",
+        canonical_dir=data_dir / "canonical",
+        rules_dir=rules_dir,
+        schema_dir=root / "schema",
+    )
+    paths.ensure_dirs()
+    return paths
+
+
+def run(args: argparse.Namespace, work_dir: Path) -> dict:
+    corpus = build_corpus(seed=args.seed, receipts=args.receipts, lines=args.lines, merchants=args.merchants)
+    rules_dir = args.rules_dir
+    if rules_dir is None:
+        rules_dir = work_dir / "rules"
+        write_rules(rules_dir, corpus, seed=args.seed, category_rules=args.rules, synonyms=args.synonyms)
+    ruleset = RuleSet.load_from_dir(rules_dir)
+    engine = ReceiptEngine(ruleset)
+    texts = corpus.texts
+    selected = set(args.stages or STAGES)
+    stages: dict[str, dict] = {}
+
+    if "clean_text" in selected:
+        stages["clean_text"] = _measure(lambda text=text: clean_text(text) for text in texts)
+    if "detect_receipt" in selected:
+        stages["detect_receipt"] = _measure(lambda text=text: detect_receipt(text, ruleset) for text in texts)
+    if "parse_receipt_text" in selected:
+        stages["parse_receipt_text"] = _measure(lambda text=text: parse_receipt_text(text) for text in texts)
+
+    names = [line.name_raw for text in texts for line in parse_receipt_text(text).lines]
+    if "normalize_name" in selected:
+        stages["normalize_name"] = _measure(lambda name=name: normalize_name(name, ruleset.normalization) for name in names)
+    if "categorize" in selected:
+        normalized = [normalize_name(name, ruleset.normalization) for name in names]
+        stages["categorize"] = _measure(
+            lambda clean=clean, tokens=tokens: categorize(clean, tokens, ruleset.categories)
+            for clean, tokens, _ in normalized
+        )
+    if "persist_canonical_receipt" in selected:
+        receipts = [engine.parse_text(text, source_type="text") for text in texts]
+        canonical_dir = work_dir / "persist" / "canonical"
+        stages["persist_canonical_receipt"] = _measure(
+            lambda receipt=receipt: persist_canonical_receipt(canonical_dir, receipt) for receipt in receipts
+        )
+
+    if "engine.ingest_text" in selected:
+        ingest = IngestEngine(_paths(work_dir / "engine", rules_dir), receipt_engine=engine)
+        stages["engine.ingest_text"] = _measure(lambda text=text: ingest.ingest_text(text) for text in texts)
+    if "orchestrator.ingest_text" in selected:
+        paths = _paths(work_dir / "orchestrator", rules_dir)
+        # Local routing only: no receipt service URL, so every receipt is parsed in-process.
+        orchestrator = IngestOrchestrator(
+            paths=paths,
+            ruleset=ruleset,
+            receipt_engine=engine,
+            routing=RoutingConfig(receipt_service_url=""),
+            duplicates=open_duplicate_index(paths.canonical_dir, root=paths.root),
+            receipt_index=open_receipt_index(paths.canonical_dir, root=paths.root),
+        )
+        try:
+            stages["orchestrator.ingest_text"] = _measure(
+                lambda text=text: orchestrator.ingest_text(text) for text in texts
+            )
+        finally:
+            orchestrator.close()
+
+    return {
+        "created_at": datetime.now(UTC).isoformat(timespec="seconds"),
+        "config": {
+            "receipts": args.receipts,
+            "lines": args.lines,
+            "merchants": args.merchants,
+            "rules": args.rules,
+            "synonyms": args.synonyms,
+            "seed": args.seed,
+            "rules_dir": str(args.rules_dir) if args.rules_dir else None,
+            "line_items": len(names),
+        },
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "stages": stages,
+    }
+
+
+def compare(current: dict, baseline: dict, *, tolerance: float) -> list[str]:
+    # A stage regresses when its p50 or p99 latency grew by more than `tolerance` (relative).
+    regressions = []
+    if current["config"] != baseline.get("config"):
+        print("note: baseline was recorded with a different configuration; deltas are indicative only")
+    print(f"\n{'stage':<27} {'p50 now/base (us)':>24} {'p99 now/base (us)':>24}")
+    for stage, now in current["stages"].items():
+        base = (baseline.get("stages") or {}).get(stage)
+        if not base:
+            continue
+        cells = []
+        for key in ("p50_us", "p99_us"):
+            delta = (now[key] - base[key]) / base[key] if base[key] else 0.0
+            cells.append(f"{now[key]:9.1f}/{base[key]:9.1f} {delta:+5.0%}")
+            if delta > tolerance:
+                regressions.append(f"{stage} {key}: {base[key]} -> {now[key]} ({delta:+.0%})")
+        print(f"{stage:<27} {cells[0]:>24} {cells[1]:>24}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-stage and end-to-end ingest benchmark on a synthetic corpus.")
+    parser.add_argument("--receipts", type=int, default=2000)
+    parser.add_argument("--lines", type=int, default=25, help="Mean line items per receipt.")
+    parser.add_argument("--merchants", type=int, default=50)
+    parser.add_argument("--rules", type=int, default=300, help="Category rules.")
+    parser.add_argument("--synonyms", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--rules-dir", type=Path, default=None, help="Use these rule files instead of synthetic ones.")
+    parser.add_argument("--stages", nargs="*", choices=STAGES, default=None)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative latency increase.")
+    parser.add_argument("--output", type=Path, default=None, help="Also write this run's results as JSON.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_ingest_") as tmp:
+        result = run(args, Path(tmp))
+
+    cfg = result["config"]
+    print(f"receipts={cfg['receipts']} line_items={cfg['line_items']} rules={cfg['rules']} synonyms={cfg['synonyms']}")
+    print(f"{'stage':<27} {'ops':>8} {'ops/s':>11} {'p50 us':>9} {'p99 us':>9}")
+    for stage, stats in result["stages"].items():
+        print(f"{stage:<27} {stats['ops']:>8} {stats['ops_per_s']:>11.1f} {stats['p50_us']:>9.1f} {stats['p99_us']:>9.1f}")
+
+    if args.output is not None:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+        print(f"\nbaseline saved to {args.baseline}")
+        return
+    if args.baseline.exists():
+        regressions = compare(result, json.loads(args.baseline.read_text(encoding="utf-8")), tolerance=args.tolerance)
+        if regressions:
+            print("\nregressions beyond tolerance:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
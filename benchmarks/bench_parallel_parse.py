@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import time
+from pathlib import Path
+
+from datenerfassung.parallel import ReceiptEnginePool
+from datenerfassung.project_paths import ProjectPaths
+
+_ITEMS = ["H-Milch 3,5%", "Champignons braun", "Frosch Waschmittel", "Pfandartikel", "Vollkornbrot", "Bananen"]
+
+
+def _receipt(rng: random.Random, lines: int) -> str:
+    out = ["Kaufland", f"{rng.randint(1, 28):02d}.{rng.randint(1, 12):02d}.2025 {rng.randint(8, 20):02d}:07"]
+    for _ in range(lines):
+        out.append(f"{rng.choice(_ITEMS)} {rng.randint(0, 20)},{rng.randint(0, 99):02d}")
+    out.append("Summe 42,00")
+    return "\n".join(out)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure ReceiptEnginePool scaling across worker counts.")
+    parser.add_argument("--receipts", type=int, default=5000)
+    parser.add_argument("--lines", type=int, default=25)
+    parser.add_argument("--workers", type=int, nargs="*", default=None)
+    parser.add_argument("--chunk-size", type=int, default=64)
+    parser.add_argument("--rules-dir", type=Path, default=None)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    texts = [_receipt(rng, args.lines) for _ in range(args.receipts)]
+    rules_dir = args.rules_dir or ProjectPaths.detect().rules_dir
+    cpu = os.cpu_count() or 1
+    worker_counts = args.workers or sorted({1, 2, 4, 8, cpu} & set(range(1, cpu + 1)))
+
+    baseline = None
+    for workers in worker_counts:
+        with ReceiptEnginePool(rules_dir, workers=workers, chunk_size=args.chunk_size) as pool:
+            # Warm up the workers (process start + RuleSet load) outside the timed section.
+            list(pool.parse_many(texts[: workers * args.chunk_size]))
+            start = time.perf_counter()
+            count = sum(1 for _ in pool.parse_many(texts))
+            elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(
+            f"workers={workers:>2}  {count / elapsed:8.0f} receipts/s  "
+            f"{elapsed:6.2f}s  speedup={baseline / elapsed:4.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import time
+
+from datenerfassung.receipt.parser_de_v1 import (
+    _DATE,
+    _PRICE,
+    _TIME,
+    ParsedLine,
+    ParsedReceipt,
+    _datetime_hint,
+    _parse_number,
+    parse_receipt_text,
+)
+
+_ITEMS = ["Vollmilch", "Brot", "Frosch Waschmittel", "Bananen", "Kaffee", "Butter", "Pfand", "Joghurt", "Käse"]
+_NOISE = ["SUMME EUR", "Geg. BAR", "MwSt 19%", "Karte", "EC-Cash", "Gesamt"]
+_MARKERS = ["summe", "gesamt", "total", "mwst", "ust", "steuern", "bar", "karte", "ec", "visa"]
+
+
+def _receipts(rng: random.Random, count: int, items: int) -> list[str]:
+    out = []
+    for _ in range(count):
+        lines = ["Kaufland Filiale 123", f"{rng.randint(1, 28):02d}.{rng.randint(1, 12):02d}.2026 {rng.randint(0, 23):02d}:15"]
+        for _ in range(items):
+            qty = rng.choice(["", "", f"{rng.randint(2, 5)} x "])
+            lines.append(f"{rng.choice(_ITEMS)} {qty}{rng.randint(0, 20)},{rng.randint(0, 99):02d}")
+        lines.extend(rng.sample(_NOISE, 3))
+        out.append("\n".join(lines))
+    return out
+
+
+def _multi_pass(text: str, *, tz: str = "Europe/Berlin") -> ParsedReceipt:
+    # The previous implementation, kept here as the baseline: several passes over the text, a
+    # casefold + marker scan per line and the quantity pattern looked up per call.
+    lines = [ln.strip() for ln in text.splitlines()]
+    lines = [ln for ln in lines if ln]
+    date_match = _DATE.search(text)
+    time_match = _TIME.search(text)
+    dt_hint = _datetime_hint(
+        date_match.groups() if date_match else None, time_match.groups() if time_match else None, tz=tz
+    )
+    parsed = []
+    for ln in lines:
+        if any(marker in ln.casefold() for marker in _MARKERS):
+            continue
+        m = _PRICE.search(ln)
+        if not m:
+            parsed.append(ParsedLine(name_raw=ln))
+            continue
+        price = _parse_number(m.group("price"))
+        name_part = ln[: m.start("price")].strip()
+        qty_m = re.search(r"\b(?P<qty>\d+(?:[\.,]\d+)?)\s*[x\*]\s*$", name_part)
+        if qty_m:
+            qty = _parse_number(qty_m.group("qty"))
+            name_part = name_part[: qty_m.start()].strip()
+            if qty and price is not None:
+                parsed.append(ParsedLine(name_raw=name_part, quantity=qty, unit_price=price, total=round(qty * price, 2)))
+                continue
+        parsed.append(ParsedLine(name_raw=name_part or ln, quantity=1.0, unit_price=price, total=price))
+    return ParsedReceipt(merchant_name_hint=lines[0][:80] if lines else None, datetime_hint=dt_hint, lines=parsed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare the multi-pass and single-pass receipt parser.")
+    parser.add_argument("--receipts", type=int, default=5000)
+    parser.add_argument("--items", type=int, default=20, help="Line items per receipt.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3, help="Best of N runs.")
+    args = parser.parse_args()
+
+    texts = _receipts(random.Random(args.seed), args.receipts, args.items)
+    line_lists = [text.split("\n") for text in texts]
+    runs = {
+        "multi-pass": lambda: [_multi_pass(text) for text in texts],
+        "single-pass": lambda: [parse_receipt_text(text) for text in texts],
+        "streamed": lambda: [parse_receipt_text(iter(lines)) for lines in line_lists],
+    }
+
+    timings = {}
+    results = {}
+    for label, run in runs.items():
+        best = float("inf")
+        for _ in range(max(1, args.repeat)):
+            start = time.perf_counter()
+            results[label] = run()
+            best = min(best, time.perf_counter() - start)
+        timings[label] = best
+
+    assert results["multi-pass"] == results["single-pass"] == results["streamed"], "parser outputs diverged"
+
+    lines = sum(len(lines) for lines in line_lists)
+    print(f"receipts={args.receipts} lines={lines}")
+    for label, elapsed in timings.items():
+        print(f"{label:>11}: {elapsed * 1000:8.1f}ms  ({elapsed / args.receipts * 1e6:6.1f}us/receipt)")
+    print(f"    speedup: {timings['multi-pass'] / timings['single-pass']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from datenerfassung.models import CanonicalReceipt
+from datenerfassung.receipt_index import ReceiptIndex
+
+MERCHANTS = ["rewe", "edeka", "lidl", "aldi_sued", "dm", "rossmann", "kaufland", "penny", "netto", "real"]
+CATEGORIES = [
+    "food.dairy",
+    "food.bakery",
+    "food.produce",
+    "food.meat",
+    "drinks.soft",
+    "drinks.alcohol",
+    "household.cleaning",
+    "personal_care",
+    "other",
+]
+
+
+def _receipt(rng: random.Random, idx: int) -> CanonicalReceipt:
+    day = rng.randint(0, 5 * 365)
+    year, rest = 2020 + day // 365, day % 365
+    month, dom = 1 + rest // 31 % 12, 1 + rest % 28
+    items = []
+    for pos in range(rng.randint(3, 25)):
+        total = round(rng.uniform(0.3, 20.0), 2)
+        items.append(
+            {
+                "line_id": f"r{idx}-{pos}",
+                "name_raw": f"ARTIKEL {pos}",
+                "name_norm": f"artikel {pos}",
+                "quantity": 1.0,
+                "unit_price": total,
+                "total": total,
+                "category": rng.choice(CATEGORIES),
+            }
+        )
+    return CanonicalReceipt.model_validate(
+        {
+            "receipt": {
+                "id": f"r{idx}",
+                "merchant": {"id": rng.choice(MERCHANTS)},
+                "datetime": f"{year}-{month:02d}-{dom:02d}T12:00:00+01:00",
+            },
+            "line_items": items,
+            "totals": {"total": round(sum(i["total"] for i in items), 2)},
+            "provenance": {"source_type": "text", "created_at": "2024-01-01T00:00:00+01:00"},
+        }
+    )
+
+
+def _timed(label: str, fn, repeat: int = 5) -> None:
+    best = float("inf")
+    rows = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        rows = len(fn())
+        best = min(best, time.perf_counter() - t0)
+    print(f"{label:<40} {best * 1000:8.1f} ms  ({rows} rows)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Query latency of the SQLite receipt index.")
+    parser.add_argument("--receipts", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        index = ReceiptIndex(root / "index.sqlite3", root=root)
+        t0 = time.perf_counter()
+        index.upsert_many(
+            (_receipt(rng, idx), root / "receipts" / f"r{idx}.json") for idx in range(args.receipts)
+        )
+        print(f"indexed {len(index)} receipts in {time.perf_counter() - t0:.1f}s")
+
+        _timed("receipts merchant + 1 month", lambda: index.query_receipts(
+            merchant="REWE", date_from="2023-03-01", date_to="2023-03-31"
+        ))
+        _timed("receipts 1 year, first page", lambda: index.query_receipts(
+            date_from="2023-01-01", date_to="2023-12-31"
+        ))
+        _timed("category stats, all time, by month", lambda: index.category_stats())
+        _timed("category stats, 1 year", lambda: index.category_stats(
+            date_from="2023-01-01", date_to="2023-12-31", by_month=False
+        ))
+        _timed("category stats, merchant, 1 year", lambda: index.category_stats(
+            merchant="lidl", date_from="2023-01-01", date_to="2023-12-31"
+        ))
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import datenerfassung.storage as storage_module
+from datenerfassung.storage import DirectStorage, WriteBatch, WriteBehindStorage, _fsync_dir
+
+
+def _emulate_slow_sync(latency_s: float) -> None:
+    # Emulates a device that completes one flush at a time (spinning disk, network mount round trip).
+    device = threading.Lock()
+
+    def slow(real_sync):
+        def sync(fd: int) -> None:
+            real_sync(fd)
+            with device:
+                time.sleep(latency_s)
+
+        return sync
+
+    storage_module._fdatasync = slow(storage_module._fdatasync)
+    os.fsync = slow(os.fsync)
+
+
+def _artifacts(i: int, image: bytes) -> list[tuple[str, object]]:
+    # What one image ingest writes: image, OCR text, canonical receipt and ingest event.
+    receipt = {
+        "receipt": {"id": f"r{i}", "merchant": {"name": "Kaufland"}, "datetime": "2025-12-29T12:07:00"},
+        "line_items": [{"name_raw": f"Artikel {n}", "total": 1.99, "category": "other"} for n in range(25)],
+    }
+    return [
+        (f"raw/images/{i}.jpg", image),
+        (f"raw/ocr_text/{i}.txt", "Kaufland\n" + "\n".join(f"Artikel {n} 1,99" for n in range(25))),
+        (f"canonical/receipts/2025/{i}.json", receipt),
+        (f"raw/ingest_events/{i}.json", {"ingest_event_id": str(i), "status": "ok_local", "canonical": f"{i}.json"}),
+    ]
+
+
+def _legacy(root: Path, i: int, image: bytes, fsync: bool) -> None:
+    # Previous behaviour: one mkdir + pretty-printed write per file.
+    for rel, data in _artifacts(i, image):
+        path = root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(data, bytes):
+            payload = data
+        elif isinstance(data, str):
+            payload = data.encode("utf-8")
+        else:
+            payload = json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+        with path.open("wb") as fh:
+            fh.write(payload)
+            if fsync:
+                fh.flush()
+                os.fsync(fh.fileno())
+        if fsync:
+            _fsync_dir(path.parent)
+
+
+def _batched(storage, root: Path, i: int, image: bytes) -> None:
+    with WriteBatch(storage) as batch:
+        for rel, data in _artifacts(i, image):
+            if isinstance(data, bytes):
+                batch.write_bytes(root / rel, data)
+            elif isinstance(data, str):
+                batch.write_text(root / rel, data)
+            else:
+                batch.write_json(root / rel, data)
+
+
+def _run(label: str, work: Path, ingests: int, threads: int, image: bytes, make) -> float:
+    root = work / label
+    ingest, close = make(root)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(ingest, range(ingests)))
+    close()
+    elapsed = time.perf_counter() - start
+    shutil.rmtree(root, ignore_errors=True)
+    return ingests / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ingest artifact writes: per-file writes vs. storage backends.")
+    parser.add_argument("--ingests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=16, help="Concurrent ingests (request threads).")
+    parser.add_argument("--image-kb", type=int, default=200)
+    parser.add_argument("--durability", choices=("written", "fsync"), default="fsync")
+    parser.add_argument("--dir", type=Path, default=None, help="Directory on the disk/mount to test (default: tmp).")
+    parser.add_argument(
+        "--sync-latency-ms",
+        type=float,
+        default=0.0,
+        help="Add this much serialized latency to every fsync, to emulate a slow disk on fast local storage.",
+    )
+    args = parser.parse_args()
+    if args.sync_latency_ms:
+        _emulate_slow_sync(args.sync_latency_ms / 1000)
+
+    image = os.urandom(args.image_kb * 1024)
+    fsync = args.durability == "fsync"
+    base = args.dir or Path(tempfile.gettempdir())
+    base.mkdir(parents=True, exist_ok=True)
+    work = Path(tempfile.mkdtemp(prefix="bench_storage_", dir=base))
+
+    def legacy(root: Path):
+        return (lambda i: _legacy(root, i, image, fsync)), (lambda: None)
+
+    def backend(storage_factory):
+        def make(root: Path):
+            storage = storage_factory()
+            return (lambda i: _batched(storage, root, i, image)), storage.close
+
+        return make
+
+    variants = [
+        ("per_file", legacy),
+        ("direct", backend(lambda: DirectStorage(durability=args.durability))),
+        ("direct_compact", backend(lambda: DirectStorage(durability=args.durability, compact_json=True))),
+        ("write_behind", backend(lambda: WriteBehindStorage(durability=args.durability))),
+        ("write_behind_compact", backend(lambda: WriteBehindStorage(durability=args.durability, compact_json=True))),
+    ]
+    try:
+        print(
+            f"ingests={args.ingests} threads={args.threads} image={args.image_kb}KiB "
+            f"durability={args.durability} sync_latency={args.sync_latency_ms}ms dir={work}"
+        )
+        baseline = None
+        for label, make in variants:
+            rate = _run(label, work, args.ingests, args.threads, image, make)
+            baseline = baseline or rate
+            print(f"{label:<22} {rate:>10.1f} ingests/s  x{rate / baseline:.2f}")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from pathlib import Path
+
+import yaml
+
+# Synthetic German receipts and matching rule files for benchmarks. Everything is derived from the
+# seed, so two runs with the same arguments see exactly the same corpus.
+
+_CHAINS = ["Kaufland", "REWE", "EDEKA", "Lidl", "ALDI SÜD", "Netto Marken-Discount", "PENNY", "dm-drogerie markt", "Rossmann", "Müller"]
+_PRODUCTS = [
+    "H-Milch 3,5%", "Vollmilch", "Butter", "Gouda jung", "Bergkäse", "Joghurt Natur", "Quark 40%", "Sahne",
+    "Eier Bodenhaltung", "Bananen", "Äpfel Elstar", "Kartoffeln festk.", "Möhren", "Zwiebeln", "Tomaten",
+    "Gurke", "Champignons braun", "Paprika rot", "Vollkornbrot", "Brötchen", "Laugenbrezel", "Haferflocken",
+    "Spaghetti", "Reis Basmati", "Mehl Type 405", "Zucker", "Kaffee gemahlen", "Schwarztee", "Orangensaft",
+    "Mineralwasser", "Apfelschorle", "Pils 0,5l", "Hähnchenbrust", "Hackfleisch gem.", "Lachsfilet",
+    "Schokolade Vollmilch", "Gummibärchen", "Frosch Waschmittel", "Spülmittel", "Toilettenpapier",
+    "Zahnpasta", "Duschgel", "Küchenrolle", "Müllbeutel", "Pfandartikel", "Pfand 0,25",
+]
+_BRANDS = ["K-Classic", "ja!", "Gut&Günstig", "Milsani", "Bio", "KBio", "REWE Beste Wahl", "Weihenstephan", "Balea", ""]
+_SIZES = ["", "", "500g", "1kg", "250g", "1,5L", "0,75l", "6x1,5L", "10 St.", "200ml"]
+_NOISE = ["SUMME EUR", "Geg. EC-Karte", "MwSt 7% 1,23", "MwSt 19% 2,10", "Netto", "Kartenzahlung", "VISA", "Gesamt"]
+_FOOTER = ["Vielen Dank für Ihren Einkauf!", "Steuer-Nr. 123/456/78901", "Kasse 3 Bon 4711", "Es bediente Sie: Frau Schäfer"]
+_SYLLABLES = ["ber", "gen", "hof", "kra", "mü", "lin", "sta", "dor", "wal", "ße", "rei", "zel", "bach", "feld"]
+
+
+@dataclass(frozen=True, slots=True)
+class Corpus:
+    texts: list[str]
+    merchant_names: list[str]
+    item_names: list[str]
+
+
+def _word(rng: random.Random, parts: int = 3) -> str:
+    return "".join(rng.choice(_SYLLABLES) for _ in range(parts))
+
+
+def merchant_names(rng: random.Random, count: int) -> list[str]:
+    names = list(_CHAINS[:count])
+    while len(names) < count:
+        names.append(f"{_word(rng).capitalize()} Markt {len(names)}")
+    return names
+
+
+def item_names(rng: random.Random, count: int) -> list[str]:
+    names = []
+    for idx in range(count):
+        base = _PRODUCTS[idx % len(_PRODUCTS)] if idx < len(_PRODUCTS) else f"{_word(rng).capitalize()} {rng.choice(_PRODUCTS)}"
+        names.append(" ".join(part for part in (rng.choice(_BRANDS), base, rng.choice(_SIZES)) if part))
+    return names
+
+
+def receipt_text(rng: random.Random, merchant: str, items: list[str], lines: int) -> str:
+    out = [merchant, f"Filiale {rng.randint(1, 999)}", f"{rng.randint(10000, 99999)} {_word(rng).capitalize()}"]
+    out.append(f"{rng.randint(1, 28):02d}.{rng.randint(1, 12):02d}.2025 {rng.randint(7, 21):02d}:{rng.randint(0, 59):02d}")
+    for _ in range(lines):
+        name = rng.choice(items)
+        cents = rng.randint(19, 2999)
+        if rng.random() < 0.15:
+            out.append(f"{name} {rng.randint(2, 6)} x {cents // 100},{cents % 100:02d}")
+        else:
+            out.append(f"{name} {cents // 100},{cents % 100:02d}")
+    out.extend(rng.sample(_NOISE, 4))
+    out.extend(rng.sample(_FOOTER, 2))
+    return "\n".join(out)
+
+
+def build_corpus(
+    *, seed: int, receipts: int, lines: int, merchants: int, vocabulary: int = 400
+) -> Corpus:
+    rng = random.Random(seed)
+    merchant_list = merchant_names(rng, merchants)
+    items = item_names(rng, vocabulary)
+    texts = [
+        receipt_text(rng, rng.choice(merchant_list), items, max(1, int(rng.gauss(lines, lines / 4))))
+        for _ in range(receipts)
+    ]
+    return Corpus(texts=texts, merchant_names=merchant_list, item_names=items)
+
+
+def write_rules(
+    rules_dir: Path, corpus: Corpus, *, seed: int, category_rules: int, synonyms: int, regex_share: float = 0.1
+) -> None:
+    # Rule files in the same shape as data/rules/*.yml, sized by the arguments.
+    rng = random.Random(seed + 1)
+    rules_dir.mkdir(parents=True, exist_ok=True)
+    tokens = sorted({tok.casefold() for name in corpus.item_names for tok in name.split() if tok.isalpha() and len(tok) > 3})
+
+    normalization = {
+        "version": 1,
+        "stopwords": ["k", "kbio", "bio", "ja", "classic"],
+        "synonyms": {f"{_word(rng, 2)} {rng.choice(tokens)}": rng.choice(tokens) for _ in range(synonyms)},
+    }
+    merchants = {
+        "version": 1,
+        "merchants": [
+            {"id": f"m{idx}", "names": [name.casefold()]} for idx, name in enumerate(corpus.merchant_names)
+        ],
+    }
+    rules = []
+    for idx in range(category_rules):
+        when: list[dict] = [{"contains_any": rng.sample(tokens, k=min(3, len(tokens)))}]
+        if rng.random() < regex_share:
+            when.append({"regex": rf"\b{rng.choice(tokens)}\b"})
+        rules.append(
+            {
+                "id": f"rule_{idx}",
+                "priority": rng.randint(0, 200),
+                "when": {"any": when},
+                "then": {"category": f"cat.{idx % 40}", "confidence": 0.9},
+            }
+        )
+    categories = {"version": 1, "rules": rules}
+
+    for name, data in (("normalization.yml", normalization), ("merchants.yml", merchants), ("categories.yml", categories)):
+        (rules_dir / name).write_text(yaml.safe_dump(data, allow_unicode=True, sort_keys=False), encoding="utf-8")
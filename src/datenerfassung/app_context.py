@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import TypeVar
+
+from .dedup import DuplicateIndex, DuplicatePolicy, duplicate_policy_from_env, open_duplicate_index
+from .engine import ReceiptEngine
+from .event_store import EventStore, open_event_store
+from .project_paths import ProjectPaths
+from .recategorize import save_rules_snapshot
+from .receipt_index import ReceiptIndex, open_receipt_index, receipt_index_enabled_from_env
+from .rules.loader import RuleSet
+from .rules.reload import RuleReloader, rules_poll_interval_from_env
+
+T = TypeVar("T")
+_UNSET = object()
+
+
+class AppContext:
+    # Process-wide shared state for the services: paths, the parsed rules and everything built from
+    # them are created on first use and then reused, so every component of a process works off one
+    # RuleSet/ReceiptEngine. Each first construction is timed into `timings`.
+    def __init__(self, paths: ProjectPaths | None = None, *, tz: str = "Europe/Berlin") -> None:
+        self.tz = tz
+        self._values: dict[str, object] = {}
+        if paths is not None:
+            self._values["paths"] = paths
+        self._lock = threading.RLock()
+        self._timings: dict[str, float] = {}
+
+    @property
+    def paths(self) -> ProjectPaths:
+        def build() -> ProjectPaths:
+            paths = ProjectPaths.detect()
+            paths.ensure_dirs()
+            return paths
+
+        return self._get("paths", build)
+
+    @property
+    def ruleset(self) -> RuleSet:
+        # Always the engine's current rules, so it follows reloads.
+        return self.receipt_engine.ruleset
+
+    @property
+    def receipt_engine(self) -> ReceiptEngine:
+        def build() -> ReceiptEngine:
+            with self.timed("ruleset"):
+                ruleset = RuleSet.load_from_dir(self.paths.rules_dir)
+            save_rules_snapshot(self.paths.canonical_dir, ruleset)
+            return ReceiptEngine(ruleset, tz=self.tz)
+
+        return self._get("receipt_engine", build)
+
+    @property
+    def rule_reloader(self) -> RuleReloader:
+        def snapshot(_: RuleSet, ruleset: RuleSet) -> None:
+            save_rules_snapshot(self.paths.canonical_dir, ruleset)
+
+        return self._get(
+            "rule_reloader",
+            lambda: RuleReloader(
+                self.receipt_engine,
+                self.paths.rules_dir,
+                poll_interval_s=rules_poll_interval_from_env(),
+                on_reload=snapshot,
+            ),
+        )
+
+    @property
+    def duplicate_policy(self) -> DuplicatePolicy | None:
+        return self._get("duplicate_policy", duplicate_policy_from_env)
+
+    @property
+    def duplicates(self) -> DuplicateIndex | None:
+        def build() -> DuplicateIndex | None:
+            if self.duplicate_policy is None:
+                return None
+            return open_duplicate_index(self.paths.canonical_dir, root=self.paths.root)
+
+        return self._get("duplicates", build)
+
+    @property
+    def receipt_index(self) -> ReceiptIndex | None:
+        def build() -> ReceiptIndex | None:
+            if not receipt_index_enabled_from_env():
+                return None
+            return open_receipt_index(self.paths.canonical_dir, root=self.paths.root)
+
+        return self._get("receipt_index", build)
+
+    @property
+    def events(self) -> EventStore:
+        return self._get("events", lambda: open_event_store(self.paths.raw_dir))
+
+    @property
+    def timings(self) -> dict[str, float]:
+        # Milliseconds per timed step, in the order the steps first ran.
+        with self._lock:
+            return {name: round(seconds * 1000, 1) for name, seconds in self._timings.items()}
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._timings[name] = seconds
+
+    @contextmanager
+    def timed(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def preload(self) -> None:
+        # Builds the rules, the duplicate index and the query index now instead of on first use.
+        _ = self.receipt_engine, self.duplicates, self.receipt_index
+
+    def preload_ocr(self) -> bool:
+        # Imports PaddleOCR and builds the model now; False when OCR is not installed.
+        from .ocr.paddleocr_backend import OcrNotAvailableError, PaddleOcrConfig, warm_up
+
+        with self.timed("ocr_preload"):
+            try:
+                warm_up(PaddleOcrConfig(lang="german", use_angle_cls=True))
+            except OcrNotAvailableError:
+                return False
+        return True
+
+    def _get(self, name: str, build: Callable[[], T]) -> T:
+        value = self._values.get(name, _UNSET)
+        if value is not _UNSET:
+            return value  # type: ignore[return-value]
+        with self._lock:
+            value = self._values.get(name, _UNSET)
+            if value is _UNSET:
+                with self.timed(name):
+                    value = build()
+                self._values[name] = value
+        return value  # type: ignore[return-value]
+
+
+_context: AppContext | None = None
+_context_lock = threading.Lock()
+
+
+def get_app_context() -> AppContext:
+    global _context
+    if _context is None:
+        with _context_lock:
+            if _context is None:
+                _context = AppContext()
+    return _context
@@ -1,18 +1,26 @@
 from __future__ import annotations
 
 import re
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
 
 from ..rules.loader import RuleSet
-from ..rules.merchants import detect_merchant
+from ..rules.merchants import MerchantMatch, match_merchant
 from ..rules.normalization import clean_text
 
+if TYPE_CHECKING:
+    from ..rules.loader import MerchantsRules
+
 
 @dataclass(frozen=True, slots=True)
 class ReceiptDetection:
     is_receipt: bool
     score: float
     reason: str
+    # The merchant match on the cleaned text and the merchant rules it was made with, so parsing the
+    # same text (ReceiptEngine.parse_text(detection=...)) does not clean and scan it again.
+    merchant: MerchantMatch | None = None
+    merchants: MerchantsRules | None = field(default=None, compare=False, repr=False)
 
 
 _PRICE = re.compile(r"\b\d+[.,]\d{2}\b")
@@ -22,11 +30,17 @@ _PERCENT = re.compile(r"\b\d{1,2}\s*%")
 def detect_receipt(text: str, ruleset: RuleSet) -> ReceiptDetection:
     cleaned = clean_text(text)
     if not cleaned:
-        return ReceiptDetection(is_receipt=False, score=0.0, reason="empty_text")
+        return ReceiptDetection(is_receipt=False, score=0.0, reason="empty_text", merchants=ruleset.merchants)
 
-    merchant = detect_merchant(text, ruleset.merchants)
-    if merchant:
-        return ReceiptDetection(is_receipt=True, score=0.95, reason=f"merchant:{merchant.id}")
+    match = match_merchant(cleaned, ruleset.merchants)
+    if match:
+        return ReceiptDetection(
+            is_receipt=True,
+            score=0.95,
+            reason=f"merchant:{match.merchant.id}",
+            merchant=match,
+            merchants=ruleset.merchants,
+        )
 
     hints = 0
     for token in [
@@ -55,6 +69,4 @@ def detect_receipt(text: str, ruleset: RuleSet) -> ReceiptDetection:
     score = min(1.0, 0.15 * hints + 0.03 * prices + 0.05 * min(percents, 4) + line_score)
 
     reason = f"hints={hints},prices={prices},percents={percents},lines={non_empty_lines}"
-    if score >= 0.45:
-        return ReceiptDetection(is_receipt=True, score=score, reason=reason)
-    return ReceiptDetection(is_receipt=False, score=score, reason=reason)
+    return ReceiptDetection(is_receipt=score >= 0.45, score=score, reason=reason, merchants=ruleset.merchants)
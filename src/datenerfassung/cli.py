@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from collections.abc import Iterator
+from dataclasses import asdict
+from pathlib import Path
+
+from .dedup import open_duplicate_index
+from .engine import IngestEngine, ReceiptEngine
+from .event_store import EVENT_LOG_DIR, EventLog, LogPosition, migrate_event_files, open_event_store
+from .export import ExportNotAvailableError, compact_partitions, export_line_items
+from .parallel import ParseJob, ReceiptEnginePool
+from .project_paths import ProjectPaths
+from .recategorize import recategorize_receipts
+from .receipt_index import ReceiptIndex
+from .reparse import reparse_events
+from .rules.loader import RuleSet
+
+
+def _iter_text_files(inputs: list[str]) -> Iterator[Path]:
+    for raw in inputs:
+        path = Path(raw)
+        if path.is_dir():
+            yield from sorted(p for p in path.rglob("*.txt") if p.is_file())
+        else:
+            yield path
+
+
+def _cmd_parse(args: argparse.Namespace) -> int:
+    paths = ProjectPaths.detect()
+    rules_dir = Path(args.rules_dir) if args.rules_dir else paths.rules_dir
+    files = list(_iter_text_files(args.inputs))
+    jobs = (ParseJob(text=f.read_text(encoding="utf-8"), source_type=args.source_type) for f in files)
+
+    failed = 0
+    with ReceiptEnginePool(rules_dir, workers=args.workers, chunk_size=args.chunk_size) as pool:
+        for file, result in zip(files, pool.parse_many(jobs, return_exceptions=True)):
+            if isinstance(result, Exception):
+                failed += 1
+                print(f"{file}: {result}", file=sys.stderr)
+                continue
+            record = {"source": file.as_posix(), "receipt": result.model_dump(mode="json")}
+            sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return 1 if failed else 0
+
+
+def _cmd_ingest(args: argparse.Namespace) -> int:
+    engine = IngestEngine()
+    files = list(_iter_text_files(args.inputs))
+    # Read as the pool asks for them; receipts are not kept once persisted.
+    items = ({"text": f.read_text(encoding="utf-8"), "source_name": f.name} for f in files)
+
+    with ReceiptEnginePool(engine.paths.rules_dir, workers=args.workers, chunk_size=args.chunk_size) as pool:
+        result = engine.ingest_many(items, pool=pool, keep_receipts=False)
+
+    for item in result.items:
+        if item.error:
+            print(f"{files[item.index]}: {item.error}", file=sys.stderr)
+    print(json.dumps({"ok": result.ok, "failed": result.failed}))
+    return 1 if result.failed else 0
+
+
+def _cmd_index_rebuild(args: argparse.Namespace) -> int:
+    paths = ProjectPaths.detect()
+    index = ReceiptIndex(paths.canonical_dir / "index.sqlite3", root=paths.root)
+    try:
+        count = index.rebuild(paths.canonical_dir)
+    finally:
+        index.close()
+    print(json.dumps({"indexed": count, "index": index.db_path.as_posix()}))
+    return 0
+
+
+def _cmd_export(args: argparse.Namespace) -> int:
+    paths = ProjectPaths.detect()
+    out_dir = Path(args.out) if args.out else paths.data_dir / "exports" / "line_items"
+    try:
+        result = export_line_items(paths.canonical_dir, out_dir, full=args.full)
+        compacted = compact_partitions(out_dir) if args.compact else 0
+    except ExportNotAvailableError as exc:
+        print(str(exc), file=sys.stderr)
+        return 2
+    summary = {
+        "receipts": result.receipts,
+        "line_items": result.line_items,
+        "files": len(result.files),
+        "skipped": result.skipped,
+        "compacted_partitions": compacted,
+        "out": out_dir.as_posix(),
+    }
+    print(json.dumps(summary))
+    return 0
+
+
+def _cmd_recategorize(args: argparse.Namespace) -> int:
+    paths = ProjectPaths.detect()
+    index_path = paths.canonical_dir / "index.sqlite3"
+    index = ReceiptIndex(index_path, root=paths.root) if index_path.exists() else None
+    try:
+        result = recategorize_receipts(
+            paths.canonical_dir,
+            RuleSet.load_from_dir(paths.rules_dir),
+            rules_dir=paths.rules_dir,
+            workers=args.workers if args.workers is not None else (os.cpu_count() or 1),
+            chunk_receipts=args.chunk_size,
+            resume=not args.restart,
+            index=index,
+        )
+    finally:
+        if index is not None:
+            index.close()
+    for error in result.failed:
+        print(error, file=sys.stderr)
+    print(json.dumps(asdict(result), ensure_ascii=False))
+    return 1 if result.failed else 0
+
+
+def _cmd_reparse(args: argparse.Namespace) -> int:
+    paths = ProjectPaths.detect()
+    index_path = paths.canonical_dir / "index.sqlite3"
+    index = ReceiptIndex(index_path, root=paths.root) if index_path.exists() else None
+    try:
+        result = reparse_events(
+            paths.root,
+            paths.raw_dir,
+            paths.canonical_dir,
+            ReceiptEngine(RuleSet.load_from_dir(paths.rules_dir)),
+            rules_dir=paths.rules_dir,
+            workers=args.workers if args.workers is not None else (os.cpu_count() or 1),
+            chunk_events=args.chunk_size,
+            restart=args.restart,
+            index=index,
+            duplicates=open_duplicate_index(paths.canonical_dir, root=paths.root),
+        )
+    finally:
+        if index is not None:
+            index.close()
+    for error in result.failed:
+        print(error, file=sys.stderr)
+    print(json.dumps(asdict(result), ensure_ascii=False))
+    return 1 if result.failed else 0
+
+
+def _cmd_events_migrate(args: argparse.Namespace) -> int:
+    paths = ProjectPaths.detect()
+    with EventLog.from_env(paths.raw_dir / EVENT_LOG_DIR) as log:
+        result = migrate_event_files(paths.raw_dir, log, delete=args.delete)
+    print(json.dumps({**asdict(result), "log": log.log_dir.as_posix()}))
+    return 0
+
+
+def _cmd_events_replay(args: argparse.Namespace) -> int:
+    # NDJSON of {"position": "<segment>:<offset>", "event": {...}}; a consumer that stopped can pass
+    # the last position it processed to --after to continue behind it.
+    paths = ProjectPaths.detect()
+    after = LogPosition.parse(args.after) if args.after else None
+    with EventLog(paths.raw_dir / EVENT_LOG_DIR, readonly=True) as log:
+        for position, event in log.replay(after):
+            if position == after:
+                continue
+            if args.source_type and event.get("source_type") != args.source_type:
+                continue
+            sys.stdout.write(json.dumps({"position": str(position), "event": event}, ensure_ascii=False) + "\n")
+    return 0
+
+
+def _cmd_events_get(args: argparse.Namespace) -> int:
+    paths = ProjectPaths.detect()
+    with EventLog(paths.raw_dir / EVENT_LOG_DIR, readonly=True) as log:
+        event = log.get(args.ingest_event_id)
+    if event is None:
+        event = open_event_store(paths.raw_dir, kind="files").get(args.ingest_event_id)
+    if event is None:
+        print(f"Unknown ingest event: {args.ingest_event_id}", file=sys.stderr)
+        return 1
+    print(json.dumps(event, ensure_ascii=False))
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="datenerfassung")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    parse = sub.add_parser("parse", help="Parse receipt text files and print canonical receipts as NDJSON.")
+    parse.add_argument("inputs", nargs="+", help="Text files or directories (searched for *.txt).")
+    parse.add_argument("--rules-dir", default=None)
+    parse.add_argument("--source-type", default="text")
+    parse.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    parse.add_argument("--chunk-size", type=int, default=64)
+    parse.set_defaults(func=_cmd_parse)
+
+    ingest = sub.add_parser("ingest", help="Ingest receipt text files (raw + canonical persistence).")
+    ingest.add_argument("inputs", nargs="+", help="Text files or directories (searched for *.txt).")
+    ingest.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    ingest.add_argument("--chunk-size", type=int, default=64)
+    ingest.set_defaults(func=_cmd_ingest)
+
+    index = sub.add_parser("index", help="Maintain the SQLite query index over canonical receipts.")
+    index_sub = index.add_subparsers(dest="index_command", required=True)
+    rebuild = index_sub.add_parser("rebuild", help="Rebuild the index from data/canonical/receipts/.")
+    rebuild.set_defaults(func=_cmd_index_rebuild)
+
+    export = sub.add_parser("export", help="Export line items to Parquet, partitioned by year/month.")
+    export.add_argument("--out", default=None, help="Output directory (default: data/exports/line_items).")
+    export.add_argument("--full", action="store_true", help="Drop the previous export and re-export everything.")
+    export.add_argument("--compact", action="store_true", help="Merge part files per partition afterwards.")
+    export.set_defaults(func=_cmd_export)
+
+    recategorize = sub.add_parser(
+        "recategorize", help="Re-apply the category rules to stored receipts after rule changes."
+    )
+    recategorize.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    recategorize.add_argument("--chunk-size", type=int, default=256, help="Receipts per work unit / checkpoint.")
+    recategorize.add_argument("--restart", action="store_true", help="Ignore the checkpoint of an earlier run.")
+    recategorize.set_defaults(func=_cmd_recategorize)
+
+    reparse = sub.add_parser(
+        "reparse", help="Regenerate canonical receipts from raw OCR text with the current parser and rules."
+    )
+    reparse.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    reparse.add_argument("--chunk-size", type=int, default=512, help="Ingest events per work unit / checkpoint.")
+    reparse.add_argument("--restart", action="store_true", help="Re-parse every event, ignoring recorded hashes.")
+    reparse.set_defaults(func=_cmd_reparse)
+
+    events = sub.add_parser("events", help="Ingest event log: migrate per-file events, replay, look up.")
+    events_sub = events.add_subparsers(dest="events_command", required=True)
+    migrate = events_sub.add_parser(
+        "migrate", help="Append data/raw/ingest_events/*.json to data/raw/event_log/ (resumable)."
+    )
+    migrate.add_argument("--delete", action="store_true", help="Remove the migrated event files afterwards.")
+    migrate.set_defaults(func=_cmd_events_migrate)
+    replay = events_sub.add_parser("replay", help="Print logged events as NDJSON in append order.")
+    replay.add_argument("--after", default=None, help="Start behind this <segment>:<offset> position.")
+    replay.add_argument("--source-type", default=None, help="Only events of this source type (text, image, ...).")
+    replay.set_defaults(func=_cmd_events_replay)
+    get = events_sub.add_parser("get", help="Print one ingest event by id (event log or per-file layout).")
+    get.add_argument("ingest_event_id")
+    get.set_defaults(func=_cmd_events_get)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return int(args.func(args))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
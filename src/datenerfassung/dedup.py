@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Literal
+
+from .models import CanonicalReceipt
+from .storage import WriteBatch, canonical_receipt_path, persist_canonical_receipt
+
+if TYPE_CHECKING:
+    from .receipt_index import ReceiptIndex
+
+DuplicatePolicy = Literal["skip", "link", "overwrite"]
+DUPLICATE_POLICIES: tuple[str, ...] = ("skip", "link", "overwrite")
+
+
+def receipt_fingerprint(receipt: CanonicalReceipt) -> str | None:
+    # Content only: ids, timestamps of ingestion and provenance are deliberately left out. Undated
+    # receipts get None and are not deduplicated: without a date nothing on them tells the same
+    # order bought on two days apart.
+    if receipt.receipt.datetime_source == "ingest":
+        return None
+    merchant = receipt.receipt.merchant
+    material = {
+        "merchant": merchant.id or (merchant.name or "").casefold(),
+        "datetime": receipt.receipt.datetime,
+        "total": receipt.totals.total,
+        "items": [[li.name_norm or li.name_raw, li.total] for li in receipt.line_items],
+    }
+    encoded = json.dumps(material, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+    # 128 bits are plenty to tell receipts apart and keep the on-disk index compact.
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:32]
+
+
+@dataclass(frozen=True, slots=True)
+class PersistOutcome:
+    path: Path | None
+    status: str  # ok | duplicate
+    duplicate_of: Path | None = None
+
+
+class DuplicateIndex:
+    # Append-only "<fingerprint>\t<canonical path relative to root>" lines, held in a dict for O(1)
+    # lookups. Later lines win; a line without a path drops the fingerprint. Other processes may
+    # append too, so new lines are read before lookups.
+    def __init__(self, path: Path, *, root: Path) -> None:
+        self.path = path
+        self.root = root
+        self._entries: dict[str, str] = {}
+        # Fingerprints of receipts that are being written, claimed by persist() until their file
+        # has landed, so concurrent ingests of the same receipt see each other.
+        self._reserved: dict[str, str] = {}
+        self._offset = 0
+        self._lock = threading.Lock()
+        with self._lock:
+            self._refresh()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, fingerprint: str) -> Path | None:
+        with self._lock:
+            self._refresh()
+            rel = self._reserved.get(fingerprint) or self._entries.get(fingerprint)
+        return self.root / rel if rel is not None else None
+
+    def record(self, fingerprint: str, canonical_path: Path) -> None:
+        rel = self._rel(canonical_path)
+        with self._lock:
+            self._append(fingerprint, rel)
+            self._entries[fingerprint] = rel
+            if self._reserved.get(fingerprint) == rel:
+                del self._reserved[fingerprint]
+
+    def forget(self, fingerprint: str, canonical_path: Path) -> None:
+        # Drops the fingerprint if it still points at canonical_path (e.g. a receipt that was
+        # re-parsed into different content or moved).
+        rel = self._rel(canonical_path)
+        with self._lock:
+            self._refresh()
+            if self._entries.get(fingerprint) != rel:
+                return
+            self._append(fingerprint, "")
+            del self._entries[fingerprint]
+
+    def persist(
+        self,
+        canonical_dir: Path,
+        receipt: CanonicalReceipt,
+        *,
+        policy: DuplicatePolicy = "link",
+        batch: WriteBatch | None = None,
+        index: ReceiptIndex | None = None,
+    ) -> PersistOutcome:
+        # Lookup and reservation happen under one lock, so of two concurrent identical receipts only
+        # one is written. The fingerprint is recorded (and an overwritten receipt removed) once the
+        # file has landed: right away, or with a batch after its flush; a failed flush releases it.
+        fingerprint = receipt_fingerprint(receipt)
+        if fingerprint is None:
+            path = persist_canonical_receipt(canonical_dir, receipt, batch=batch, index=index)
+            return PersistOutcome(path=path, status="ok")
+        path = canonical_receipt_path(canonical_dir, receipt)
+        rel = self._rel(path)
+        with self._lock:
+            self._refresh()
+            existing_rel = self._reserved.get(fingerprint) or self._entries.get(fingerprint)
+            existing = self.root / existing_rel if existing_rel is not None else None
+            if existing is not None and policy != "overwrite":
+                return PersistOutcome(
+                    path=existing if policy == "link" else None, status="duplicate", duplicate_of=existing
+                )
+            self._reserved[fingerprint] = rel
+
+        def landed() -> None:
+            if existing is not None and existing != path:
+                existing.unlink(missing_ok=True)
+                if index is not None:
+                    index.remove(existing)
+            self.record(fingerprint, path)
+
+        def failed(exc: BaseException | None = None) -> None:
+            with self._lock:
+                if self._reserved.get(fingerprint) == rel:
+                    del self._reserved[fingerprint]
+
+        try:
+            persist_canonical_receipt(canonical_dir, receipt, batch=batch, index=index)
+        except BaseException:
+            failed()
+            raise
+        if batch is None:
+            landed()
+        else:
+            batch.after_flush(landed, on_error=failed)
+        return PersistOutcome(path=path, status="ok", duplicate_of=existing)
+
+    @classmethod
+    def rebuild(cls, path: Path, *, canonical_dir: Path, root: Path) -> DuplicateIndex:
+        # One-off scan of data/canonical/receipts/ for trees that predate the index.
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        tmp_path.parent.mkdir(parents=True, exist_ok=True)
+        with tmp_path.open("w", encoding="utf-8") as fh:
+            for receipt_path in sorted((canonical_dir / "receipts").rglob("*.json")):
+                try:
+                    receipt = CanonicalReceipt.model_validate_json(receipt_path.read_text(encoding="utf-8"))
+                except ValueError:
+                    continue
+                fingerprint = receipt_fingerprint(receipt)
+                if fingerprint is not None:
+                    fh.write(f"{fingerprint}\t{_relative(receipt_path, root)}\n")
+        os.replace(tmp_path, path)
+        return cls(path, root=root)
+
+    def _refresh(self) -> None:
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            return
+        if size <= self._offset:
+            return
+        with self.path.open("rb") as fh:
+            fh.seek(self._offset)
+            chunk = fh.read()
+        # Only consume complete lines; a concurrent writer may be mid-line.
+        end = chunk.rfind(b"\n")
+        if end < 0:
+            return
+        for line in chunk[:end].decode("utf-8").split("\n"):
+            fingerprint, sep, rel = line.partition("\t")
+            if not fingerprint or not sep:
+                continue
+            if rel:
+                self._entries[fingerprint] = rel
+            else:
+                self._entries.pop(fingerprint, None)
+        self._offset += end + 1
+
+    def _append(self, fingerprint: str, rel: str) -> None:
+        # Called with the lock held.
+        self._refresh()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as fh:
+            fh.write(f"{fingerprint}\t{rel}\n")
+
+    def _rel(self, path: Path) -> str:
+        return _relative(path, self.root)
+
+
+def _relative(path: Path, root: Path) -> str:
+    try:
+        return path.relative_to(root).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def open_duplicate_index(canonical_dir: Path, *, root: Path) -> DuplicateIndex:
+    path = canonical_dir / "fingerprints.tsv"
+    if not path.exists() and any((canonical_dir / "receipts").rglob("*.json")):
+        return DuplicateIndex.rebuild(path, canonical_dir=canonical_dir, root=root)
+    return DuplicateIndex(path, root=root)
+
+
+def duplicate_policy_from_env(default: DuplicatePolicy = "link") -> DuplicatePolicy | None:
+    value = os.getenv("INGEST_DUPLICATE_POLICY", default).strip().casefold()
+    if value in {"", "off", "none", "0"}:
+        return None
+    if value not in DUPLICATE_POLICIES:
+        raise ValueError(f"INGEST_DUPLICATE_POLICY must be one of {', '.join(DUPLICATE_POLICIES)} or 'off'.")
+    return value  # type: ignore[return-value]
+
@@ -1,12 +1,23 @@
 from __future__ import annotations
 
+import time
 import uuid
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future
 from dataclasses import dataclass
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
+from typing import TYPE_CHECKING
 from zoneinfo import ZoneInfo
 
+from .dedup import DuplicateIndex, DuplicatePolicy, PersistOutcome, open_duplicate_index
+from .event_store import open_event_store
 from .models import (
+    BatchIngestItem,
+    BatchIngestItemResult,
+    BatchIngestResult,
     CanonicalReceipt,
     IngestResult,
     LineItem,
@@ -17,13 +28,20 @@ from .models import (
     Totals,
 )
 from .project_paths import ProjectPaths
-from .receipt.parser_de_v1 import parse_receipt_text
+from .recategorize import save_rules_snapshot
+from .receipt.parser_de_v1 import PARSER_NAME, PARSER_VERSION, parse_receipt_text
 from .receipt.structured_receipt_v1 import StructuredReceiptV1
+from .receipt_index import ReceiptIndex, open_receipt_index
 from .rules.categorization import categorize
 from .rules.loader import RuleSet
 from .rules.merchants import detect_merchant
 from .rules.normalization import normalize_name
-from .storage import canonical_receipt_path, persist_canonical_receipt, slug, write_json
+from .storage import WriteBatch, canonical_receipt_path, persist_canonical_receipt, slug, write_json
+
+if TYPE_CHECKING:
+    from .classification.receipt_detector import ReceiptDetection
+    from .parallel import ReceiptEnginePool
+    from .profiling import RequestProfile
 
 
 def _now(tz: str = "Europe/Berlin") -> datetime:
@@ -38,27 +56,61 @@ def _slug(value: str) -> str:
     return slug(value)
 
 
-@dataclass(frozen=True, slots=True)
+@dataclass(slots=True)
 class ReceiptEngine:
+    # Not frozen: `ruleset` is replaced by swap_ruleset on rule reloads. Each parse reads it once,
+    # so a receipt is always produced by exactly one RuleSet.
     ruleset: RuleSet
     tz: str = "Europe/Berlin"
 
-    def parse_text(self, text: str, *, source_type: str, ingest_event_id: str | None = None) -> CanonicalReceipt:
+    def swap_ruleset(self, ruleset: RuleSet) -> RuleSet:
+        previous, self.ruleset = self.ruleset, ruleset
+        return previous
+
+    def parse_text(
+        self,
+        text: str,
+        *,
+        source_type: str,
+        ingest_event_id: str | None = None,
+        profile: RequestProfile | None = None,
+        detection: ReceiptDetection | None = None,
+    ) -> CanonicalReceipt:
+        # detection: detect_receipt() of the same text; its merchant match is reused when it was made
+        # with this ruleset's merchants (not across a rule reload).
+        ruleset = self.ruleset
+        if profile is not None:
+            profile.rules_hash = ruleset.hash or None
+            started = time.perf_counter()
         parsed = parse_receipt_text(text, tz=self.tz)
-        merchant = detect_merchant(text, self.ruleset.merchants)
+        if profile is not None:
+            profile.add_stage("parse.text", time.perf_counter() - started)
+            started = time.perf_counter()
+        if detection is not None and detection.merchants is ruleset.merchants:
+            merchant = detection.merchant.merchant if detection.merchant is not None else None
+        else:
+            merchant = detect_merchant(text, ruleset.merchants)
+        if profile is not None:
+            profile.add_stage("parse.merchant", time.perf_counter() - started)
 
         receipt_id = str(uuid.uuid4())
         dt = parsed.datetime_hint or _now(self.tz)
+        datetime_source = "receipt" if parsed.datetime_hint else "ingest"
 
         line_items: list[LineItem] = []
         for parsed_line in parsed.lines:
             line_id = str(uuid.uuid4())
-            name_clean, tokens, name_norm = normalize_name(
-                parsed_line.name_raw, self.ruleset.normalization
-            )
-            category, rule_id, confidence, tags_add = categorize(
-                name_clean, tokens, self.ruleset.categories
-            )
+            if profile is None:
+                name_clean, tokens, name_norm = normalize_name(
+                    parsed_line.name_raw, ruleset.normalization
+                )
+                category, rule_id, confidence, tags_add = categorize(
+                    name_clean, tokens, ruleset.categories
+                )
+            else:
+                name_clean, tokens, name_norm, (category, rule_id, confidence, tags_add) = _profiled_line(
+                    parsed_line.name_raw, ruleset, profile
+                )
 
             item = LineItem(
                 line_id=line_id,
@@ -85,19 +137,107 @@ class ReceiptEngine:
                     name=(merchant.names[0] if merchant and merchant.names else parsed.merchant_name_hint),
                 ),
                 datetime=dt.isoformat(),
+                datetime_source=datetime_source,
             ),
             line_items=line_items,
             totals=Totals(total=total),
             provenance=Provenance(
                 source_type=source_type,
                 ocr_engine=None,
-                parser="de_receipt_v1",
+                parser=PARSER_NAME,
+                parser_version=PARSER_VERSION,
                 created_at=_now(self.tz).isoformat(),
                 ingest_event_id=ingest_event_id,
+                rules_version=ruleset.version or None,
+                rules_hash=ruleset.hash or None,
             ),
         )
         return receipt
 
+    def parse_structured(
+        self, structured: StructuredReceiptV1, *, ingest_event_id: str | None = None
+    ) -> CanonicalReceipt:
+        ruleset = self.ruleset
+        receipt_id = str(uuid.uuid4())
+        dt = structured.datetime or _now(self.tz).isoformat()
+
+        merchant_id = None
+        merchant_name = structured.merchant.name
+        if merchant_name:
+            merchant = detect_merchant(merchant_name, ruleset.merchants)
+            merchant_id = merchant.id if merchant else None
+
+        line_items: list[LineItem] = []
+        for it in structured.items:
+            line_id = str(uuid.uuid4())
+            name_clean, tokens, name_norm = normalize_name(it.name, ruleset.normalization)
+            category, rule_id, confidence, tags_add = categorize(
+                name_clean, tokens, ruleset.categories
+            )
+            line_items.append(
+                LineItem(
+                    line_id=line_id,
+                    name_raw=it.name,
+                    name_clean=name_clean,
+                    tokens=tokens,
+                    name_norm=name_norm,
+                    quantity=it.quantity,
+                    unit_price=it.unit_price,
+                    total=it.total,
+                    vat_rate=it.vat_rate,
+                    category=category,
+                    tags=tags_add,
+                    classification=LineItemClassification(rule_id=rule_id, confidence=confidence),
+                )
+            )
+
+        total = structured.totals.total if structured.totals.total is not None else _sum_totals(line_items)
+        vat_breakdown = []
+        for vat in structured.totals.vat:
+            if vat.gross is None:
+                continue
+            vat_breakdown.append({"rate": vat.rate, "gross": vat.gross})
+
+        return CanonicalReceipt(
+            receipt=ReceiptInfo(
+                id=receipt_id,
+                merchant=ReceiptMerchant(
+                    id=merchant_id,
+                    name=merchant_name,
+                    store_id=structured.merchant.store_id,
+                ),
+                datetime=dt,
+                datetime_source="receipt" if structured.datetime else "ingest",
+                currency=structured.currency or "EUR",
+                payment_method=structured.totals.payment_method,
+            ),
+            line_items=line_items,
+            totals=Totals(total=total, vat_breakdown=vat_breakdown),
+            provenance=Provenance(
+                source_type="receipt_json",
+                ocr_engine=None,
+                parser="structured_receipt_v1",
+                created_at=_now(self.tz).isoformat(),
+                ingest_event_id=ingest_event_id,
+                rules_version=ruleset.version or None,
+                rules_hash=ruleset.hash or None,
+            ),
+        )
+
+
+def _profiled_line(
+    name_raw: str, ruleset: RuleSet, profile: RequestProfile
+) -> tuple[str, list[str], str, tuple[str, str | None, float | None, list[str]]]:
+    started = time.perf_counter()
+    name_clean, tokens, name_norm = normalize_name(name_raw, ruleset.normalization)
+    normalized = time.perf_counter()
+    result = categorize(name_clean, tokens, ruleset.categories, profile=profile)
+    done = time.perf_counter()
+    profile.add_stage("parse.normalize", normalized - started)
+    profile.add_stage("parse.categorize", done - normalized)
+    profile.add_line(name_raw, normalize_s=normalized - started, categorize_s=done - normalized, rule_id=result[1])
+    return name_clean, tokens, name_norm, result
+
 
 def _sum_totals(line_items: list[LineItem]) -> float | None:
     totals = [li.total for li in line_items if li.total is not None]
@@ -106,82 +246,240 @@ def _sum_totals(line_items: list[LineItem]) -> float | None:
     return round(sum(totals), 2)
 
 
+def run_batch(
+    items: Iterable[BatchIngestItem | dict],
+    handle: Callable[[int, BatchIngestItem, WriteBatch], IngestResult],
+    *,
+    source_name: str | None = None,
+    flush_every: int = 100,
+    keep_receipts: bool = True,
+) -> BatchIngestResult:
+    # Files are written every flush_every items. A failed flush marks the items whose files were in
+    # it as failed; the rest of the batch carries on. keep_receipts=False drops the parsed receipts
+    # from the item results, so long backfills do not hold every receipt in memory.
+    results: list[BatchIngestItemResult] = []
+    unflushed: list[int] = []
+    batch = WriteBatch()
+
+    def flush() -> None:
+        try:
+            batch.flush()
+        except Exception as exc:  # noqa: BLE001 - marks the unflushed items as failed
+            for position in unflushed:
+                index = results[position].index
+                results[position] = BatchIngestItemResult(index=index, status="failed", error=f"write failed: {exc}")
+        unflushed.clear()
+
+    for count, (index, raw_item) in enumerate(enumerate(items), start=1):
+        try:
+            item = raw_item if isinstance(raw_item, BatchIngestItem) else BatchIngestItem.model_validate(raw_item)
+            if item.source_name is None and source_name is not None:
+                item = item.model_copy(update={"source_name": source_name})
+            result = handle(index, item, batch)
+        except Exception as exc:  # noqa: BLE001 - reported per item, the batch carries on
+            results.append(BatchIngestItemResult(index=index, status="failed", error=str(exc)))
+        else:
+            if not keep_receipts and result.receipt is not None:
+                result = result.model_copy(update={"receipt": None})
+            unflushed.append(len(results))
+            results.append(BatchIngestItemResult(index=index, status=result.status, result=result))
+        if count % max(1, flush_every) == 0:
+            flush()
+    flush()
+    ok = sum(1 for item in results if item.status != "failed")
+    return BatchIngestResult(items=results, ok=ok, failed=len(results) - ok)
+
+
 class IngestEngine:
-    def __init__(self, paths: ProjectPaths | None = None, *, tz: str = "Europe/Berlin") -> None:
+    def __init__(
+        self,
+        paths: ProjectPaths | None = None,
+        *,
+        tz: str = "Europe/Berlin",
+        duplicate_policy: DuplicatePolicy | None = "link",
+        index_receipts: bool = True,
+        receipt_engine: ReceiptEngine | None = None,
+    ) -> None:
         self.paths = paths or ProjectPaths.detect()
         self.paths.ensure_dirs()
         self.tz = tz
-        self.ruleset = RuleSet.load_from_dir(self.paths.rules_dir)
-        self.receipt_engine = ReceiptEngine(self.ruleset, tz=tz)
+        # A shared engine (e.g. from AppContext) avoids parsing the rule files again.
+        self.receipt_engine = receipt_engine or ReceiptEngine(RuleSet.load_from_dir(self.paths.rules_dir), tz=tz)
+        save_rules_snapshot(self.paths.canonical_dir, self.receipt_engine.ruleset)
+        self.duplicate_policy = duplicate_policy
+        self.duplicates: DuplicateIndex | None = (
+            open_duplicate_index(self.paths.canonical_dir, root=self.paths.root) if duplicate_policy else None
+        )
+        self.receipt_index: ReceiptIndex | None = (
+            open_receipt_index(self.paths.canonical_dir, root=self.paths.root) if index_receipts else None
+        )
+        self.events = open_event_store(self.paths.raw_dir)
+
+    @property
+    def ruleset(self) -> RuleSet:
+        return self.receipt_engine.ruleset
 
     def ingest_text(self, text: str, *, source_name: str | None = None) -> IngestResult:
-        ingest_event_id = str(uuid.uuid4())
+        with WriteBatch() as batch:
+            return self._ingest_text(text, source_name=source_name, batch=batch)
+
+    def ingest_receipt_json(self, payload: dict, *, source_name: str | None = None) -> IngestResult:
+        with WriteBatch() as batch:
+            return self._ingest_receipt_json(payload, source_name=source_name, batch=batch)
+
+    def ingest_many(
+        self,
+        items: Iterable[BatchIngestItem | dict],
+        *,
+        source_name: str | None = None,
+        flush_every: int = 100,
+        pool: ReceiptEnginePool | None = None,
+        keep_receipts: bool = True,
+    ) -> BatchIngestResult:
+        if pool is None:
+            return run_batch(
+                items, self._ingest_item, source_name=source_name, flush_every=flush_every, keep_receipts=keep_receipts
+            )
+
+        # Text items are parsed on the pool chunk by chunk and persisted in input order as their
+        # chunks come back. Like _chunk_results in reparse.py, up to max_pending_chunks chunks stay in
+        # flight while the oldest is persisted, so only those chunks' inputs and receipts are held.
+        from .parallel import ParseError, ParseJob
+
+        current: list[tuple[ParseJob | None, CanonicalReceipt | ParseError | None]] = [(None, None)]
+
+        def parse_job(raw_item: BatchIngestItem | dict) -> ParseJob | None:
+            text = raw_item.text if isinstance(raw_item, BatchIngestItem) else (
+                raw_item.get("text") if isinstance(raw_item, dict) else None
+            )
+            if isinstance(text, str) and text.strip():
+                return ParseJob(text=text, source_type="text", ingest_event_id=str(uuid.uuid4()))
+            return None
+
+        Chunk = tuple[
+            list[BatchIngestItem | dict], list[ParseJob | None], Future[list[CanonicalReceipt | ParseError]]
+        ]
+
+        def chunk_items(chunk: Chunk) -> Iterator[BatchIngestItem | dict]:
+            raw_items, jobs, future = chunk
+            receipts = iter(future.result())
+            for raw_item, job in zip(raw_items, jobs):
+                # run_batch hands each item to handle() right after taking it from here.
+                current[0] = (job, next(receipts) if job is not None else None)
+                yield raw_item
+
+        def parsed_items() -> Iterator[BatchIngestItem | dict]:
+            remaining = iter(items)
+            pending: deque[Chunk] = deque()
+            while raw_items := list(islice(remaining, pool.chunk_size)):
+                jobs = [parse_job(raw_item) for raw_item in raw_items]
+                pending.append((raw_items, jobs, pool.submit([job for job in jobs if job is not None])))
+                if len(pending) >= pool.max_pending_chunks:
+                    yield from chunk_items(pending.popleft())
+            while pending:
+                yield from chunk_items(pending.popleft())
+
+        def handle(index: int, item: BatchIngestItem, batch: WriteBatch) -> IngestResult:
+            job, receipt = current[0]
+            if job is None or item.text is None:
+                return self._ingest_item(index, item, batch)
+            # Failed items are re-parsed in-process so they fail exactly like the serial path.
+            return self._ingest_text(
+                item.text,
+                source_name=item.source_name,
+                batch=batch,
+                ingest_event_id=job.ingest_event_id,
+                receipt=None if isinstance(receipt, ParseError) else receipt,
+            )
+
+        return run_batch(
+            parsed_items(), handle, source_name=source_name, flush_every=flush_every, keep_receipts=keep_receipts
+        )
+
+    def _ingest_item(self, index: int, item: BatchIngestItem, batch: WriteBatch) -> IngestResult:
+        if item.text is not None:
+            return self._ingest_text(item.text, source_name=item.source_name, batch=batch)
+        return self._ingest_receipt_json(item.receipt or {}, source_name=item.source_name, batch=batch)
+
+    def _ingest_text(
+        self,
+        text: str,
+        *,
+        source_name: str | None,
+        batch: WriteBatch,
+        ingest_event_id: str | None = None,
+        receipt: CanonicalReceipt | None = None,
+    ) -> IngestResult:
+        ingest_event_id = ingest_event_id or str(uuid.uuid4())
         received_at = _now(self.tz).isoformat()
 
         raw_text_path = self.paths.raw_dir / "ocr_text" / f"{ingest_event_id}.txt"
-        raw_text_path.write_text(text, encoding="utf-8")
+        batch.write_text(raw_text_path, text)
 
-        receipt = self.receipt_engine.parse_text(
-            text, source_type="text", ingest_event_id=ingest_event_id
-        )
+        if receipt is None:
+            receipt = self.receipt_engine.parse_text(
+                text, source_type="text", ingest_event_id=ingest_event_id
+            )
 
-        canonical_path = persist_canonical_receipt(self.paths.canonical_dir, receipt)
+        outcome = self._persist(receipt, batch=batch)
+        canonical_path = outcome.path
 
-        ingest_event_path = self.paths.raw_dir / "ingest_events" / f"{ingest_event_id}.json"
-        write_json(
-            ingest_event_path,
+        ingest_event_path = self.events.append(
             {
                 "ingest_event_id": ingest_event_id,
                 "received_at": received_at,
                 "source_type": "text",
                 "source_name": source_name,
                 "raw_text_path": self._rel(raw_text_path),
-                "canonical_receipt_path": self._rel(canonical_path),
+                "canonical_receipt_path": self._rel(canonical_path) if canonical_path else None,
+                **self._duplicate_info(outcome),
             },
+            batch=batch,
         )
 
         return IngestResult(
             ingest_event_id=ingest_event_id,
-            status="ok",
+            status=outcome.status,
             raw_text_path=self._rel(raw_text_path),
             ingest_event_path=self._rel(ingest_event_path),
-            canonical_receipt_path=self._rel(canonical_path),
-            receipt=receipt,
+            canonical_receipt_path=self._rel(canonical_path) if canonical_path else None,
+            receipt=receipt if outcome.status == "ok" else None,
         )
 
-    def ingest_receipt_json(self, payload: dict, *, source_name: str | None = None) -> IngestResult:
+    def _ingest_receipt_json(self, payload: dict, *, source_name: str | None, batch: WriteBatch) -> IngestResult:
         ingest_event_id = str(uuid.uuid4())
         received_at = _now(self.tz).isoformat()
 
         raw_json_path = self.paths.raw_dir / "ocr_text" / f"{ingest_event_id}.json"
-        write_json(raw_json_path, payload)
+        batch.write_json(raw_json_path, payload)
 
         structured = StructuredReceiptV1.model_validate(payload)
         receipt = self._canonical_from_structured(structured, ingest_event_id=ingest_event_id)
 
-        canonical_path = persist_canonical_receipt(self.paths.canonical_dir, receipt)
+        outcome = self._persist(receipt, batch=batch)
+        canonical_path = outcome.path
 
-        ingest_event_path = self.paths.raw_dir / "ingest_events" / f"{ingest_event_id}.json"
-        write_json(
-            ingest_event_path,
+        ingest_event_path = self.events.append(
             {
                 "ingest_event_id": ingest_event_id,
                 "received_at": received_at,
                 "source_type": "receipt_json",
                 "source_name": source_name,
                 "raw_receipt_json_path": self._rel(raw_json_path),
-                "canonical_receipt_path": self._rel(canonical_path),
+                "canonical_receipt_path": self._rel(canonical_path) if canonical_path else None,
                 "structured_confidence": structured.confidence,
+                **self._duplicate_info(outcome),
             },
+            batch=batch,
         )
 
         return IngestResult(
             ingest_event_id=ingest_event_id,
-            status="ok",
+            status=outcome.status,
             raw_receipt_json_path=self._rel(raw_json_path),
             ingest_event_path=self._rel(ingest_event_path),
-            canonical_receipt_path=self._rel(canonical_path),
-            receipt=receipt,
+            canonical_receipt_path=self._rel(canonical_path) if canonical_path else None,
+            receipt=receipt if outcome.status == "ok" else None,
         )
 
     def ingest_image(
@@ -191,6 +489,20 @@ class IngestEngine:
         filename: str | None = None,
         ocr_text: str | None = None,
         source_name: str | None = None,
+    ) -> IngestResult:
+        with WriteBatch() as batch:
+            return self._ingest_image(
+                image_bytes, filename=filename, ocr_text=ocr_text, source_name=source_name, batch=batch
+            )
+
+    def _ingest_image(
+        self,
+        image_bytes: bytes,
+        *,
+        filename: str | None,
+        ocr_text: str | None,
+        source_name: str | None,
+        batch: WriteBatch,
     ) -> IngestResult:
         ingest_event_id = str(uuid.uuid4())
         received_at = _now(self.tz).isoformat()
@@ -199,7 +511,7 @@ class IngestEngine:
         safe_stem = _slug(original.stem or "image")
         suffix = original.suffix if original.suffix else ".jpg"
         raw_image_path = self.paths.raw_dir / "images" / f"{ingest_event_id}_{safe_stem}{suffix}"
-        raw_image_path.write_bytes(image_bytes)
+        batch.write_bytes(raw_image_path, image_bytes)
 
         receipt = None
         canonical_path = None
@@ -208,16 +520,17 @@ class IngestEngine:
         raw_text_path = None
         if ocr_text is not None:
             raw_text_path = self.paths.raw_dir / "ocr_text" / f"{ingest_event_id}.txt"
-            raw_text_path.write_text(ocr_text, encoding="utf-8")
+            batch.write_text(raw_text_path, ocr_text)
             receipt = self.receipt_engine.parse_text(
                 ocr_text, source_type="image", ingest_event_id=ingest_event_id
             )
-            canonical_path = persist_canonical_receipt(self.paths.canonical_dir, receipt)
-            status = "ok"
+            outcome = self._persist(receipt, batch=batch)
+            canonical_path = outcome.path
+            status = outcome.status
+            if status != "ok":
+                receipt = None
 
-        ingest_event_path = self.paths.raw_dir / "ingest_events" / f"{ingest_event_id}.json"
-        write_json(
-            ingest_event_path,
+        ingest_event_path = self.events.append(
             {
                 "ingest_event_id": ingest_event_id,
                 "received_at": received_at,
@@ -226,8 +539,9 @@ class IngestEngine:
                 "raw_image_path": self._rel(raw_image_path),
                 "raw_text_path": self._rel(raw_text_path) if raw_text_path else None,
                 "canonical_receipt_path": self._rel(canonical_path) if canonical_path else None,
-                "note": None if receipt else "Provide ocr_text to process (OCR integration is not wired yet).",
+                "note": None if ocr_text is not None else "Provide ocr_text to process (OCR integration is not wired yet).",
             },
+            batch=batch,
         )
 
         return IngestResult(
@@ -240,71 +554,29 @@ class IngestEngine:
             receipt=receipt,
         )
 
-    def _canonical_from_structured(
-        self, structured: StructuredReceiptV1, *, ingest_event_id: str
-    ) -> CanonicalReceipt:
-        receipt_id = str(uuid.uuid4())
-        dt = structured.datetime or _now(self.tz).isoformat()
-
-        merchant_id = None
-        merchant_name = structured.merchant.name
-        if merchant_name:
-            merchant = detect_merchant(merchant_name, self.ruleset.merchants)
-            merchant_id = merchant.id if merchant else None
-
-        line_items: list[LineItem] = []
-        for it in structured.items:
-            line_id = str(uuid.uuid4())
-            name_clean, tokens, name_norm = normalize_name(it.name, self.ruleset.normalization)
-            category, rule_id, confidence, tags_add = categorize(
-                name_clean, tokens, self.ruleset.categories
-            )
-            line_items.append(
-                LineItem(
-                    line_id=line_id,
-                    name_raw=it.name,
-                    name_clean=name_clean,
-                    tokens=tokens,
-                    name_norm=name_norm,
-                    quantity=it.quantity,
-                    unit_price=it.unit_price,
-                    total=it.total,
-                    vat_rate=it.vat_rate,
-                    category=category,
-                    tags=tags_add,
-                    classification=LineItemClassification(rule_id=rule_id, confidence=confidence),
-                )
+    def _persist(self, receipt: CanonicalReceipt, *, batch: WriteBatch | None = None) -> PersistOutcome:
+        if self.duplicates is None or self.duplicate_policy is None:
+            path = persist_canonical_receipt(
+                self.paths.canonical_dir, receipt, batch=batch, index=self.receipt_index
             )
+            return PersistOutcome(path=path, status="ok")
+        return self.duplicates.persist(
+            self.paths.canonical_dir,
+            receipt,
+            policy=self.duplicate_policy,
+            batch=batch,
+            index=self.receipt_index,
+        )
 
-        total = structured.totals.total if structured.totals.total is not None else _sum_totals(line_items)
-        vat_breakdown = []
-        for vat in structured.totals.vat:
-            if vat.gross is None:
-                continue
-            vat_breakdown.append({"rate": vat.rate, "gross": vat.gross})
+    def _duplicate_info(self, outcome: PersistOutcome) -> dict:
+        if outcome.duplicate_of is None:
+            return {}
+        return {"duplicate_of": self._rel(outcome.duplicate_of), "duplicate_policy": self.duplicate_policy}
 
-        return CanonicalReceipt(
-            receipt=ReceiptInfo(
-                id=receipt_id,
-                merchant=ReceiptMerchant(
-                    id=merchant_id,
-                    name=merchant_name,
-                    store_id=structured.merchant.store_id,
-                ),
-                datetime=dt,
-                currency=structured.currency or "EUR",
-                payment_method=structured.totals.payment_method,
-            ),
-            line_items=line_items,
-            totals=Totals(total=total, vat_breakdown=vat_breakdown),
-            provenance=Provenance(
-                source_type="receipt_json",
-                ocr_engine=None,
-                parser="structured_receipt_v1",
-                created_at=_now(self.tz).isoformat(),
-                ingest_event_id=ingest_event_id,
-            ),
-        )
+    def _canonical_from_structured(
+        self, structured: StructuredReceiptV1, *, ingest_event_id: str
+    ) -> CanonicalReceipt:
+        return self.receipt_engine.parse_structured(structured, ingest_event_id=ingest_event_id)
 
     def _canonical_receipt_path(self, receipt: CanonicalReceipt) -> Path:
         return canonical_receipt_path(self.paths.canonical_dir, receipt)
@@ -0,0 +1,466 @@
+from __future__ import annotations
+
+import bisect
+import json
+import os
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Self
+
+from .storage import StorageConfig, write_json
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    from .storage import WriteBatch
+
+EVENTS_DIR = "ingest_events"
+EVENT_LOG_DIR = "event_log"
+SEGMENT_SUFFIX = ".ndjson"
+INDEX_SUFFIX = ".idx"
+DEFAULT_SEGMENT_BYTES = 64 * 1024 * 1024
+# One in-memory key per this many entries of a sealed segment's index file.
+SPARSE_EVERY = 64
+
+
+@dataclass(frozen=True, slots=True, order=True)
+class LogPosition:
+    # Where a record starts; replay(start=...) resumes at a position taken from an earlier replay.
+    segment: int
+    offset: int
+
+    def __str__(self) -> str:
+        return f"{self.segment}:{self.offset}"
+
+    @classmethod
+    def parse(cls, value: str) -> LogPosition:
+        segment, _, offset = value.partition(":")
+        return cls(int(segment), int(offset or 0))
+
+
+class EventFiles:
+    # The original layout: data/raw/ingest_events/<ingest_event_id>.json, one file per event.
+    def __init__(self, events_dir: Path) -> None:
+        self.events_dir = events_dir
+
+    def event_path(self, ingest_event_id: str) -> Path:
+        return self.events_dir / f"{ingest_event_id}.json"
+
+    def append(self, event: dict, *, batch: WriteBatch | None = None) -> Path:
+        path = self.event_path(str(event["ingest_event_id"]))
+        (batch.write_json if batch is not None else write_json)(path, event)
+        return path
+
+    def get(self, ingest_event_id: str) -> dict | None:
+        try:
+            return json.loads(self.event_path(ingest_event_id).read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+
+    def ids(self) -> list[str]:
+        if not self.events_dir.exists():
+            return []
+        # Names only (no stat per entry), sorted for a stable order.
+        names = (entry.name for entry in os.scandir(self.events_dir))
+        return sorted(name[: -len(".json")] for name in names if name.endswith(".json"))
+
+    def replay(self) -> Iterator[dict]:
+        for ingest_event_id in self.ids():
+            event = self.get(ingest_event_id)
+            if event is not None:
+                yield event
+
+    def close(self) -> None:
+        pass
+
+
+@dataclass(slots=True)
+class _Segment:
+    # A sealed segment: records in <n>.ndjson, "<id>\t<offset>" lines sorted by id in <n>.idx, and
+    # every SPARSE_EVERY-th id of that file with its byte position kept in memory.
+    number: int
+    keys: list[str]
+    positions: list[int]
+    last_key: str
+    # The .idx file, kept open for lookups.
+    index_file: BinaryIO | None = None
+    # Readonly instances index a segment whose .idx is missing (writer crashed while sealing) in memory.
+    dense: dict[str, int] | None = None
+
+
+class EventLog:
+    # Ingest events appended as compact NDJSON records to numbered segment files under
+    # data/raw/event_log/; a segment is sealed once it would grow past segment_max_bytes.
+    # Lookups by id check the active segment's in-memory index, then the sealed segments newest
+    # first, each with one bisect and one small read of its sorted index file. Several processes may
+    # append to one log (e.g. uvicorn workers and the CLI): every append holds an flock on .lock and
+    # first catches up on the records and segments the other writers added. Lookups that miss and
+    # replays catch up too; readonly instances do so without taking the lock.
+    def __init__(
+        self,
+        log_dir: Path,
+        *,
+        segment_max_bytes: int = DEFAULT_SEGMENT_BYTES,
+        fsync: bool = False,
+        readonly: bool = False,
+    ) -> None:
+        self.log_dir = log_dir
+        self.segment_max_bytes = max(1, segment_max_bytes)
+        self.fsync = fsync
+        self.readonly = readonly
+        self._lock = threading.Lock()
+        # Serializes seek + read on the shared index file handles of sealed segments.
+        self._read_lock = threading.Lock()
+        self._lock_fd: int | None = None
+        self._fd: int | None = None
+        if not readonly:
+            log_dir.mkdir(parents=True, exist_ok=True)
+            if fcntl is not None:
+                self._lock_fd = os.open(log_dir / ".lock", os.O_WRONLY | os.O_CREAT, 0o666)
+
+        with self._process_lock():
+            numbers = self._segment_numbers()
+            self._sealed: list[_Segment] = [self._load_sealed(n) for n in numbers[:-1]]
+            self._active = numbers[-1] if numbers else 1
+            self._active_index: dict[str, int] = {}
+            self._size = self._scan_active(0)
+            if not readonly:
+                self._fd = self._open_active()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    @classmethod
+    def from_env(cls, log_dir: Path) -> EventLog:
+        # Segment size from DATENERFASSUNG_EVENT_SEGMENT_MB; synced when the storage durability is fsync.
+        return cls(
+            log_dir,
+            segment_max_bytes=int(float(os.getenv("DATENERFASSUNG_EVENT_SEGMENT_MB", "64")) * 1024 * 1024),
+            fsync=StorageConfig.from_env().durability == "fsync",
+        )
+
+    def __contains__(self, ingest_event_id: str) -> bool:
+        return self._locate(ingest_event_id) is not None
+
+    def event_path(self, ingest_event_id: str) -> Path:
+        # The segment holding the event, or the one it will be appended to.
+        position = self._locate(ingest_event_id)
+        return self._segment_path(position.segment if position is not None else self._active)
+
+    def append(self, event: dict, *, batch: WriteBatch | None = None) -> Path:
+        if self._fd is None:
+            raise RuntimeError(f"Event log {self.log_dir} is not open for writing.")
+        ingest_event_id = str(event["ingest_event_id"])
+        record = json.dumps(event, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+        if batch is not None:
+            # The event goes in after the files it points to, once the batch owner flushes them. The
+            # path is the current active segment; a rotation before then puts it in the next one.
+            def write() -> None:
+                self._write(ingest_event_id, record)
+
+            batch.after_flush(write)
+            with self._lock:
+                return self._segment_path(self._active)
+        return self._write(ingest_event_id, record)
+
+    def _write(self, ingest_event_id: str, record: bytes) -> Path:
+        with self._lock, self._process_lock():
+            if self._fd is None:
+                raise RuntimeError(f"Event log {self.log_dir} is not open for writing.")
+            self._catch_up()
+            if self._size and self._size + len(record) > self.segment_max_bytes:
+                self._rotate()
+            view = memoryview(record)
+            while view:
+                view = view[os.write(self._fd, view):]
+            if self.fsync:
+                os.fsync(self._fd)
+            self._active_index[ingest_event_id] = self._size
+            self._size += len(record)
+            return self._segment_path(self._active)
+
+    def get(self, ingest_event_id: str) -> dict | None:
+        position = self._locate(ingest_event_id)
+        if position is None:
+            return None
+        with self._segment_path(position.segment).open("rb") as fh:
+            fh.seek(position.offset)
+            return json.loads(fh.readline())
+
+    def replay(self, start: LogPosition | None = None) -> Iterator[tuple[LogPosition, dict]]:
+        # Every record in append order with its position, from `start` (inclusive) on, as of the
+        # moment the replay started.
+        with self._lock, self._process_lock():
+            self._catch_up()
+            numbers = [segment.number for segment in self._sealed] + [self._active]
+            active_end = self._size
+        for number in numbers:
+            if start is not None and number < start.segment:
+                continue
+            offset = start.offset if start is not None and number == start.segment else 0
+            end = active_end if number == numbers[-1] else None
+            path = self._segment_path(number)
+            if not path.exists():
+                continue
+            with path.open("rb") as fh:
+                fh.seek(offset)
+                while end is None or offset < end:
+                    line = fh.readline()
+                    if not line.endswith(b"\n"):
+                        break
+                    yield LogPosition(number, offset), json.loads(line)
+                    offset += len(line)
+
+    def sync(self) -> None:
+        if self._fd is not None:
+            os.fsync(self._fd)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+            if self._lock_fd is not None:
+                os.close(self._lock_fd)
+                self._lock_fd = None
+            for segment in self._sealed:
+                if segment.index_file is not None:
+                    segment.index_file.close()
+                    segment.index_file = None
+
+    def _locate(self, ingest_event_id: str) -> LogPosition | None:
+        position = self._find(ingest_event_id)
+        if position is None:
+            # Possibly appended by another process since this one last looked.
+            with self._lock, self._process_lock():
+                before = (self._active, self._size)
+                self._catch_up()
+                changed = (self._active, self._size) != before
+            if changed:
+                position = self._find(ingest_event_id)
+        return position
+
+    def _find(self, ingest_event_id: str) -> LogPosition | None:
+        with self._lock:
+            offset = self._active_index.get(ingest_event_id)
+            if offset is not None:
+                return LogPosition(self._active, offset)
+            sealed = list(self._sealed)
+        for segment in reversed(sealed):
+            offset = self._lookup_sealed(segment, ingest_event_id)
+            if offset is not None:
+                return LogPosition(segment.number, offset)
+        return None
+
+    def _lookup_sealed(self, segment: _Segment, ingest_event_id: str) -> int | None:
+        if segment.dense is not None:
+            return segment.dense.get(ingest_event_id)
+        if not segment.keys or ingest_event_id < segment.keys[0] or ingest_event_id > segment.last_key:
+            return None
+        slot = bisect.bisect_right(segment.keys, ingest_event_id) - 1
+        start = segment.positions[slot]
+        end = segment.positions[slot + 1] if slot + 1 < len(segment.positions) else None
+        with self._read_lock:
+            if segment.index_file is None:
+                segment.index_file = self._index_path(segment.number).open("rb")
+            segment.index_file.seek(start)
+            block = segment.index_file.read(end - start) if end is not None else segment.index_file.read()
+        for line in block.decode("utf-8").splitlines():
+            key, _, offset = line.partition("\t")
+            if key == ingest_event_id:
+                return int(offset)
+        return None
+
+    def _rotate(self) -> None:
+        # Called with the lock held: seal the active segment and start the next one.
+        self._write_index(self._active, self._active_index)
+        self._sealed.append(self._load_sealed(self._active))
+        if self._fd is not None:
+            if self.fsync:
+                os.fsync(self._fd)
+            os.close(self._fd)
+        self._active += 1
+        self._active_index = {}
+        self._size = 0
+        self._fd = self._open_active()
+
+    def _catch_up(self) -> None:
+        # Called with both locks held: seal the segments other writers rotated away from and index
+        # the records they appended to the active one.
+        if not self._segment_path(self._active + 1).exists():
+            self._size = self._scan_active(self._size)
+            return
+        while self._segment_path(self._active + 1).exists():
+            self._sealed.append(self._load_sealed(self._active))
+            self._active += 1
+        self._active_index = {}
+        self._size = self._scan_active(0)
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = self._open_active()
+
+    def _open_active(self) -> int:
+        return os.open(self._segment_path(self._active), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o666)
+
+    def _scan_active(self, start: int) -> int:
+        # Index the active segment from `start` on. Writers hold the process lock here, so an
+        # incomplete last record is torn (crash mid-append) and is cut off.
+        path = self._segment_path(self._active)
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            return start
+        if size == start:
+            return start
+        index, end = _scan_segment(path, start)
+        self._active_index.update(index)
+        if not self.readonly and end < size:
+            with path.open("r+b") as fh:
+                fh.truncate(end)
+        return end
+
+    def _load_sealed(self, number: int) -> _Segment:
+        index_path = self._index_path(number)
+        if not index_path.exists():
+            if self.readonly:
+                return _Segment(number, [], [], "", dense=_scan_segment(self._segment_path(number))[0])
+            # Sealed by a process that stopped before writing the index.
+            self._write_index(number, _scan_segment(self._segment_path(number))[0])
+        keys: list[str] = []
+        positions: list[int] = []
+        last_key = ""
+        position = 0
+        with index_path.open("rb") as fh:
+            for entry, line in enumerate(fh):
+                key = line.decode("utf-8").partition("\t")[0]
+                if entry % SPARSE_EVERY == 0:
+                    keys.append(key)
+                    positions.append(position)
+                last_key = key
+                position += len(line)
+        return _Segment(number, keys, positions, last_key)
+
+    def _write_index(self, number: int, index: dict[str, int]) -> None:
+        path = self._index_path(number)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        lines = [f"{key}\t{offset}\n" for key, offset in sorted(index.items())]
+        tmp_path.write_text("".join(lines), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def _segment_numbers(self) -> list[int]:
+        if not self.log_dir.exists():
+            return []
+        return sorted(
+            int(entry.name[: -len(SEGMENT_SUFFIX)])
+            for entry in os.scandir(self.log_dir)
+            if entry.name.endswith(SEGMENT_SUFFIX) and entry.name[: -len(SEGMENT_SUFFIX)].isdigit()
+        )
+
+    def _segment_path(self, number: int) -> Path:
+        return self.log_dir / f"{number:06d}{SEGMENT_SUFFIX}"
+
+    def _index_path(self, number: int) -> Path:
+        return self.log_dir / f"{number:06d}{INDEX_SUFFIX}"
+
+    @contextmanager
+    def _process_lock(self) -> Iterator[None]:
+        # Exclusive across the processes writing this log; a no-op for readonly instances.
+        if self._lock_fd is None:
+            yield
+            return
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+
+def _scan_segment(path: Path, start: int = 0) -> tuple[dict[str, int], int]:
+    # id -> offset of its latest record, and the end of the last complete record.
+    index: dict[str, int] = {}
+    offset = start
+    with path.open("rb") as fh:
+        fh.seek(start)
+        for line in fh:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                event = json.loads(line)
+            except ValueError:
+                break
+            index[str(event["ingest_event_id"])] = offset
+            offset += len(line)
+    return index, offset
+
+
+EventStore = EventFiles | EventLog
+
+_open_logs: dict[Path, EventLog] = {}
+_open_logs_lock = threading.Lock()
+
+
+def event_store_from_env() -> str:
+    # DATENERFASSUNG_EVENT_STORE=log appends events to data/raw/event_log/ instead of one file each.
+    value = os.getenv("DATENERFASSUNG_EVENT_STORE", "files").strip().casefold()
+    if value not in {"files", "log"}:
+        raise ValueError(f"DATENERFASSUNG_EVENT_STORE must be files or log, not {value!r}")
+    return value
+
+
+def open_event_store(raw_dir: Path, *, kind: str | None = None) -> EventStore:
+    # Log stores are shared per directory within the process, so every component appends through
+    # the same writer.
+    if (kind or event_store_from_env()) == "files":
+        return EventFiles(raw_dir / EVENTS_DIR)
+    log_dir = (raw_dir / EVENT_LOG_DIR).resolve()
+    with _open_logs_lock:
+        log = _open_logs.get(log_dir)
+        if log is None or log._fd is None:
+            log = _open_logs[log_dir] = EventLog.from_env(log_dir)
+        return log
+
+
+@dataclass(frozen=True, slots=True)
+class EventMigrationResult:
+    migrated: int
+    skipped: int
+    deleted: int
+
+
+def migrate_event_files(raw_dir: Path, log: EventLog, *, delete: bool = False) -> EventMigrationResult:
+    # Appends every data/raw/ingest_events/*.json to the log in received_at order. Events already in
+    # the log are skipped, so an interrupted migration can simply be run again. With delete=True the
+    # files are removed once the log is synced.
+    files = EventFiles(raw_dir / EVENTS_DIR)
+    pending: list[tuple[str, str, dict]] = []
+    skipped = 0
+    for ingest_event_id in files.ids():
+        if ingest_event_id in log:
+            skipped += 1
+            continue
+        event = files.get(ingest_event_id)
+        if event is None:
+            continue
+        event.setdefault("ingest_event_id", ingest_event_id)
+        pending.append((str(event.get("received_at") or ""), ingest_event_id, event))
+    pending.sort(key=lambda item: (item[0], item[1]))
+    for _, _, event in pending:
+        log.append(event)
+    log.sync()
+
+    deleted = 0
+    if delete:
+        for ingest_event_id in files.ids():
+            if ingest_event_id in log:
+                files.event_path(ingest_event_id).unlink(missing_ok=True)
+                deleted += 1
+    return EventMigrationResult(migrated=len(pending), skipped=skipped, deleted=deleted)
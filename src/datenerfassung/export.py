@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import os
+import shutil
+import uuid
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+from .models import CanonicalReceipt
+
+STATE_FILE = "_exported.txt"
+DEFAULT_CHUNK_RECEIPTS = 5000
+
+
+class ExportNotAvailableError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class ExportResult:
+    receipts: int
+    line_items: int
+    files: list[Path] = field(default_factory=list)
+    skipped: int = 0
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow as pa  # type: ignore
+        import pyarrow.parquet as pq  # type: ignore
+    except Exception as exc:
+        raise ExportNotAvailableError(
+            "Columnar export requires pyarrow. Install it with `pip install -e .[analytics]`."
+        ) from exc
+    return pa, pq
+
+
+def line_item_schema():
+    pa, _ = _require_pyarrow()
+    # Low-cardinality strings are dictionary-encoded; year/month are the hive partition keys and
+    # live in the directory names, not in the files.
+    text_dict = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema(
+        [
+            ("receipt_id", pa.string()),
+            ("line_id", pa.string()),
+            ("position", pa.int32()),
+            ("datetime", pa.timestamp("us", tz="UTC")),
+            ("date", pa.date32()),
+            ("merchant", text_dict),
+            ("merchant_name", text_dict),
+            ("currency", text_dict),
+            ("name_raw", pa.string()),
+            ("name_norm", text_dict),
+            ("category", text_dict),
+            ("rule_id", text_dict),
+            ("confidence", pa.float64()),
+            ("quantity", pa.float64()),
+            ("unit", text_dict),
+            ("unit_price", pa.float64()),
+            ("total", pa.float64()),
+            ("vat_rate", pa.float64()),
+            ("source_type", text_dict),
+        ]
+    )
+
+
+def line_item_rows(receipt: CanonicalReceipt) -> list[dict]:
+    info = receipt.receipt
+    dt = datetime.fromisoformat(info.datetime)
+    rows = []
+    for position, li in enumerate(receipt.line_items):
+        rows.append(
+            {
+                "receipt_id": info.id,
+                "line_id": li.line_id,
+                "position": position,
+                "datetime": dt,
+                "date": dt.date(),
+                "merchant": info.merchant.id or info.merchant.name,
+                "merchant_name": info.merchant.name,
+                "currency": info.currency,
+                "name_raw": li.name_raw,
+                "name_norm": li.name_norm,
+                "category": li.category,
+                "rule_id": li.classification.rule_id if li.classification else None,
+                "confidence": li.classification.confidence if li.classification else None,
+                "quantity": li.quantity,
+                "unit": li.unit,
+                "unit_price": li.unit_price,
+                "total": li.total,
+                "vat_rate": li.vat_rate,
+                "source_type": receipt.provenance.source_type,
+            }
+        )
+    return rows
+
+
+def export_line_items(
+    canonical_dir: Path,
+    out_dir: Path,
+    *,
+    full: bool = False,
+    chunk_receipts: int = DEFAULT_CHUNK_RECEIPTS,
+) -> ExportResult:
+    # Writes one row per line item to out_dir/year=YYYY/month=MM/part-*.parquet. Receipts already
+    # listed in out_dir/_exported.txt are skipped, so repeated runs only append new receipts.
+    # full=True drops the previous export first (e.g. after re-categorization or overwrites).
+    pa, pq = _require_pyarrow()
+    schema = line_item_schema()
+    receipts_dir = canonical_dir / "receipts"
+
+    if full and out_dir.exists():
+        shutil.rmtree(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    exported = _read_state(out_dir)
+
+    run_id = f"{datetime.now().strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    files: list[Path] = []
+    receipts = line_items = skipped = 0
+    pending = [p for p in sorted(receipts_dir.rglob("*.json")) if _rel(p, receipts_dir) not in exported]
+
+    for chunk_no, chunk in enumerate(_chunks(pending, max(1, chunk_receipts))):
+        partitions: dict[tuple[int, int], list[dict]] = defaultdict(list)
+        done: list[str] = []
+        for path in chunk:
+            try:
+                receipt = CanonicalReceipt.model_validate_json(path.read_text(encoding="utf-8"))
+                rows = line_item_rows(receipt)
+            except ValueError:
+                skipped += 1
+                continue
+            for row in rows:
+                partitions[(row["date"].year, row["date"].month)].append(row)
+            done.append(_rel(path, receipts_dir))
+            receipts += 1
+            line_items += len(rows)
+
+        for (year, month), rows in sorted(partitions.items()):
+            target = out_dir / f"year={year}" / f"month={month:02d}" / f"part-{run_id}-{chunk_no:05d}.parquet"
+            _write_table(pq, pa.Table.from_pylist(rows, schema=schema), target)
+            files.append(target)
+        # Recorded only after the chunk's files exist; a crash re-exports at most one chunk.
+        _append_state(out_dir, done)
+
+    return ExportResult(receipts=receipts, line_items=line_items, files=files, skipped=skipped)
+
+
+def compact_partitions(out_dir: Path) -> int:
+    # Merges the part files of each year/month partition into one, undoing the small-file build-up
+    # of many incremental runs. Returns the number of partitions rewritten.
+    pa, pq = _require_pyarrow()
+    schema = line_item_schema()
+    compacted = 0
+    for partition in sorted(out_dir.glob("year=*/month=*")):
+        parts = sorted(partition.glob("part-*.parquet"))
+        if len(parts) < 2:
+            continue
+        merged = pa.concat_tables([pq.read_table(part).cast(schema) for part in parts])
+        _write_table(pq, merged, partition / f"part-compacted-{uuid.uuid4().hex[:8]}.parquet")
+        for part in parts:
+            part.unlink()
+        compacted += 1
+    return compacted
+
+
+def _write_table(pq, table, target: Path) -> None:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_name(f".{target.name}.tmp")
+    pq.write_table(table, tmp_path, use_dictionary=True, compression="snappy")
+    os.replace(tmp_path, target)
+
+
+def _read_state(out_dir: Path) -> set[str]:
+    state = out_dir / STATE_FILE
+    if not state.exists():
+        return set()
+    return {line for line in state.read_text(encoding="utf-8").splitlines() if line}
+
+
+def _append_state(out_dir: Path, rels: Iterable[str]) -> None:
+    lines = "".join(f"{rel}\n" for rel in rels)
+    if lines:
+        with (out_dir / STATE_FILE).open("a", encoding="utf-8") as fh:
+            fh.write(lines)
+
+
+def _chunks(items: list[Path], size: int) -> Iterator[list[Path]]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _rel(path: Path, base: Path) -> str:
+    return path.relative_to(base).as_posix()
@@ -1,14 +1,25 @@
 from __future__ import annotations
 
+import asyncio
+import http.client
 import json
+import threading
+import time
 import urllib.error
+import urllib.parse
 import urllib.request
+from collections.abc import Callable
+from typing import Self
 
 
 class HttpRequestError(RuntimeError):
     pass
 
 
+class CircuitOpenError(HttpRequestError):
+    pass
+
+
 def post_json(url: str, payload: dict, *, timeout_s: float = 5.0) -> dict:
     data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
     req = urllib.request.Request(
@@ -27,3 +38,327 @@ def post_json(url: str, payload: dict, *, timeout_s: float = 5.0) -> dict:
     except urllib.error.URLError as exc:
         raise HttpRequestError(f"Request to {url} failed: {exc.reason}") from exc
 
+
+class CircuitBreaker:
+    # closed -> open after `failure_threshold` consecutive failures. While open, requests are refused
+    # without touching the network; after `reset_after_s` a single probe is let through (half-open)
+    # and its outcome closes or re-opens the circuit.
+    def __init__(
+        self,
+        *,
+        failure_threshold: int = 5,
+        reset_after_s: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_after_s = reset_after_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if self._probing or self._clock() - self._opened_at >= self.reset_after_s:
+                return "half_open"
+            return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._probing or self._clock() - self._opened_at < self.reset_after_s:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._probing = False
+
+
+class PooledHttpClient:
+    # Keeps HTTP/1.1 keep-alive connections to one host and reuses them across requests and threads.
+    # At most `max_connections` requests are in flight; callers beyond that wait up to timeout_s.
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        timeout_s: float = 5.0,
+        max_connections: int = 8,
+        breaker: CircuitBreaker | None = None,
+    ) -> None:
+        parts = urllib.parse.urlsplit(base_url)
+        if parts.scheme not in {"http", "https"} or not parts.hostname:
+            raise ValueError(f"Unsupported base URL: {base_url!r}")
+        self.base_url = base_url.rstrip("/")
+        self.timeout_s = timeout_s
+        self.max_connections = max(1, max_connections)
+        self.breaker = breaker or CircuitBreaker()
+        self._host = parts.hostname
+        self._port = parts.port
+        self._base_path = parts.path.rstrip("/")
+        self._connection_cls = (
+            http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        )
+        self._idle: list[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_connections)
+        self.connections_opened = 0
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def post_json(self, path: str, payload: dict) -> dict:
+        url = f"{self.base_url}{path}"
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        # The slot is taken before asking the breaker, so a half-open probe never waits for one.
+        if not self._slots.acquire(timeout=self.timeout_s):
+            raise HttpRequestError(f"No free connection to {self.base_url} within {self.timeout_s}s")
+        try:
+            if not self.breaker.allow():
+                raise CircuitOpenError(f"Circuit open for {self.base_url}; not sending request to {url}")
+            healthy = False
+            try:
+                try:
+                    status, data = self._request("POST", self._base_path + path, body)
+                except (OSError, http.client.HTTPException) as exc:
+                    raise HttpRequestError(f"Request to {url} failed: {exc}") from exc
+                text = data.decode("utf-8", errors="replace")
+                # A 4xx still proves the service is up.
+                healthy = status < 500
+                if status >= 400:
+                    raise HttpRequestError(f"HTTP {status} from {url}: {text}")
+                try:
+                    return json.loads(text) if text else {}
+                except ValueError as exc:
+                    healthy = False
+                    raise HttpRequestError(f"Invalid JSON from {url}: {exc}") from exc
+            finally:
+                # Every exit records an outcome, so a probe that ends in an unexpected error
+                # re-opens the circuit instead of leaving it half-open for good.
+                if healthy:
+                    self.breaker.record_success()
+                else:
+                    self.breaker.record_failure()
+        finally:
+            self._slots.release()
+
+    def _request(self, method: str, path: str, body: bytes) -> tuple[int, bytes]:
+        headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+            "Connection": "keep-alive",
+        }
+        conn, reused = self._checkout()
+        try:
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                resp = conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                if not reused:
+                    raise
+                # The server closed an idle keep-alive connection; retry once on a fresh one.
+                conn.close()
+                conn = self._connect()
+                conn.request(method, path, body=body, headers=headers)
+                resp = conn.getresponse()
+            data = resp.read()
+        except BaseException:
+            conn.close()
+            raise
+        if resp.will_close:
+            conn.close()
+        else:
+            with self._lock:
+                self._idle.append(conn)
+        return resp.status, data
+
+    def _checkout(self) -> tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return self._connect(), False
+
+    def _connect(self) -> http.client.HTTPConnection:
+        with self._lock:
+            self.connections_opened += 1
+        return self._connection_cls(self._host, self._port, timeout=self.timeout_s)
+
+
+class AsyncPooledHttpClient:
+    # asyncio counterpart of PooledHttpClient on plain stream connections (no extra dependency).
+    # Speaks just enough HTTP/1.1 for JSON APIs: Content-Length or chunked responses, keep-alive.
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        timeout_s: float = 5.0,
+        max_connections: int = 8,
+        breaker: CircuitBreaker | None = None,
+    ) -> None:
+        parts = urllib.parse.urlsplit(base_url)
+        if parts.scheme not in {"http", "https"} or not parts.hostname:
+            raise ValueError(f"Unsupported base URL: {base_url!r}")
+        self.base_url = base_url.rstrip("/")
+        self.timeout_s = timeout_s
+        self.max_connections = max(1, max_connections)
+        self.breaker = breaker or CircuitBreaker()
+        self._host = parts.hostname
+        self._port = parts.port or (443 if parts.scheme == "https" else 80)
+        self._ssl = parts.scheme == "https"
+        self._base_path = parts.path.rstrip("/")
+        self._idle: list[tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self._slots: asyncio.Semaphore | None = None
+        self.connections_opened = 0
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+        for _, writer in idle:
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def post_json(self, path: str, payload: dict) -> dict:
+        url = f"{self.base_url}{path}"
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        if self._slots is None:
+            # Created lazily so the semaphore binds to the running loop.
+            self._slots = asyncio.Semaphore(self.max_connections)
+
+        # As in PooledHttpClient: slot first, then the breaker, and an outcome on every exit
+        # (including cancellation).
+        async with self._slots:
+            if not self.breaker.allow():
+                raise CircuitOpenError(f"Circuit open for {self.base_url}; not sending request to {url}")
+            healthy = False
+            try:
+                try:
+                    status, data = await asyncio.wait_for(
+                        self._request("POST", self._base_path + path, body), timeout=self.timeout_s
+                    )
+                except (OSError, TimeoutError, asyncio.IncompleteReadError, ValueError) as exc:
+                    raise HttpRequestError(f"Request to {url} failed: {exc!r}") from exc
+                text = data.decode("utf-8", errors="replace")
+                # A 4xx still proves the service is up.
+                healthy = status < 500
+                if status >= 400:
+                    raise HttpRequestError(f"HTTP {status} from {url}: {text}")
+                try:
+                    return json.loads(text) if text else {}
+                except ValueError as exc:
+                    healthy = False
+                    raise HttpRequestError(f"Invalid JSON from {url}: {exc}") from exc
+            finally:
+                if healthy:
+                    self.breaker.record_success()
+                else:
+                    self.breaker.record_failure()
+
+    async def _request(self, method: str, path: str, body: bytes) -> tuple[int, bytes]:
+        head = (
+            f"{method} {path} HTTP/1.1\r\n"
+            f"Host: {self._host}:{self._port}\r\n"
+            "Content-Type: application/json\r\n"
+            "Accept: application/json\r\n"
+            "Connection: keep-alive\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n"
+        ).encode("ascii")
+        reader, writer, reused = await self._checkout()
+        try:
+            try:
+                writer.write(head + body)
+                await writer.drain()
+                status, headers, data = await self._read_response(reader)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                if not reused:
+                    raise
+                # The server closed an idle keep-alive connection; retry once on a fresh one.
+                writer.close()
+                reader, writer = await self._connect()
+                writer.write(head + body)
+                await writer.drain()
+                status, headers, data = await self._read_response(reader)
+        except BaseException:
+            writer.close()
+            raise
+        if headers.get("connection", "").lower() == "close":
+            writer.close()
+        else:
+            self._idle.append((reader, writer))
+        return status, data
+
+    async def _read_response(self, reader: asyncio.StreamReader) -> tuple[int, dict[str, str], bytes]:
+        status_line = await reader.readuntil(b"\r\n")
+        parts = status_line.decode("latin-1").split(" ", 2)
+        if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+            raise ValueError(f"Malformed status line: {status_line!r}")
+        status = int(parts[1])
+        headers: dict[str, str] = {}
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readuntil(b"\r\n")).split(b";", 1)[0], 16)
+                if size == 0:
+                    # Skip trailers up to the terminating blank line.
+                    while await reader.readuntil(b"\r\n") != b"\r\n":
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            return status, headers, b"".join(chunks)
+        if "content-length" in headers:
+            return status, headers, await reader.readexactly(int(headers["content-length"]))
+        headers["connection"] = "close"
+        return status, headers, await reader.read()
+
+    async def _checkout(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter, bool]:
+        while self._idle:
+            reader, writer = self._idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                return reader, writer, True
+            writer.close()
+        reader, writer = await self._connect()
+        return reader, writer, False
+
+    async def _connect(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        self.connections_opened += 1
+        return await asyncio.open_connection(self._host, self._port, ssl=self._ssl or None)
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import bisect
+import os
+import threading
+import time
+from collections.abc import Callable, Iterable
+from contextlib import nullcontext
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .profiling import RequestProfile
+
+# Minimal in-process metrics with Prometheus text exposition (no client library dependency).
+# Counters and histograms are updated on the request path; gauges such as queue depths and cache
+# stats are read from their owners by collectors only when /metrics is scraped.
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Sample = tuple[str, dict[str, str], float]
+Collector = Callable[[], Iterable[tuple[str, str, str, list[Sample]]]]
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        # Unlabelled counters are exported as 0 before their first increment.
+        self._values: dict[tuple[str, ...], float] = {} if labelnames else {(): 0.0}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> list[Sample]:
+        with self._lock:
+            items = list(self._values.items())
+        return [(f"{self.name}_total", dict(zip(self.labelnames, labels)), value) for labels, value in items]
+
+
+class Histogram:
+    def __init__(
+        self, name: str, help_text: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (non-cumulative, last one is +Inf), sum, count].
+        self._values: dict[tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][slot] += 1
+            state[1] += value
+            state[2] += 1
+
+    def count(self, *labels: str) -> int:
+        state = self._values.get(labels)
+        return state[2] if state is not None else 0
+
+    def samples(self) -> list[Sample]:
+        with self._lock:
+            items = [(labels, list(state[0]), state[1], state[2]) for labels, state in self._values.items()]
+        out: list[Sample] = []
+        for labels, counts, total, count in items:
+            base = dict(zip(self.labelnames, labels))
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, float("inf")), counts):
+                cumulative += bucket_count
+                out.append((f"{self.name}_bucket", {**base, "le": _format_bound(bound)}, cumulative))
+            out.append((f"{self.name}_sum", base, total))
+            out.append((f"{self.name}_count", base, count))
+        return out
+
+
+Metric = Counter | Histogram
+
+
+class MetricsRegistry:
+    def __init__(self, *, enabled: bool = True) -> None:
+        # When disabled, stage timers are a shared no-op and /metrics answers 404.
+        self.enabled = enabled
+        self._metrics: dict[str, Metric] = {}
+        self._collectors: dict[str, Collector] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(name, lambda: Counter(name, help_text, labelnames))
+
+    def histogram(
+        self, name: str, help_text: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(name, lambda: Histogram(name, help_text, labelnames, buckets))
+
+    def register_collector(self, key: str, collector: Collector) -> None:
+        # Collectors yield (name, type, help, samples) at scrape time; registering a key again
+        # replaces the previous collector (e.g. after the app rebuilt its components).
+        with self._lock:
+            self._collectors[key] = collector
+
+    def unregister_collector(self, key: str) -> None:
+        with self._lock:
+            self._collectors.pop(key, None)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors.values())
+        lines: list[str] = []
+        for metric in metrics:
+            kind = "counter" if isinstance(metric, Counter) else "histogram"
+            _render_family(lines, metric.name, kind, metric.help, metric.samples())
+        for collector in collectors:
+            for name, kind, help_text, samples in collector():
+                _render_family(lines, name, kind, help_text, samples)
+        return "\n".join(lines) + "\n"
+
+    def _register(self, name: str, build: Callable[[], Metric]):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = build()
+            return metric
+
+
+class _StageTimer:
+    __slots__ = ("_histogram", "_profile", "_stage", "_started")
+
+    def __init__(self, histogram: Histogram | None, stage: str, profile: RequestProfile | None) -> None:
+        self._histogram = histogram
+        self._stage = stage
+        self._profile = profile
+
+    def __enter__(self) -> None:
+        self._started = time.perf_counter()
+
+    def __exit__(self, *exc_info: object) -> None:
+        elapsed = time.perf_counter() - self._started
+        if self._histogram is not None:
+            self._histogram.observe(elapsed, self._stage)
+        if self._profile is not None:
+            self._profile.add_stage(self._stage, elapsed)
+
+
+def metrics_enabled_from_env() -> bool:
+    # DATENERFASSUNG_METRICS=0 turns instrumentation and /metrics off.
+    return os.getenv("DATENERFASSUNG_METRICS", "1") not in {"0", "false", "False"}
+
+
+REGISTRY = MetricsRegistry(enabled=metrics_enabled_from_env())
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "datenerfassung_stage_seconds", "Time spent per pipeline stage.", ("stage",)
+)
+INGEST_RESULTS = REGISTRY.counter(
+    "datenerfassung_ingest_results", "Finished ingests by source type and status.", ("source_type", "status")
+)
+ROUTE_ERRORS = REGISTRY.counter(
+    "datenerfassung_route_errors", "Failed calls to the receipt service (before any local fallback)."
+)
+
+_NULL_TIMER = nullcontext()
+
+
+def stage_timer(stage: str, profile: RequestProfile | None = None):
+    # `with stage_timer("detect"): ...` records into datenerfassung_stage_seconds and, for profiled
+    # requests, into the request's profile.
+    enabled = REGISTRY.enabled
+    if not enabled and profile is None:
+        return _NULL_TIMER
+    return _StageTimer(STAGE_SECONDS if enabled else None, stage, profile)
+
+
+def count_result(source_type: str, status: str) -> None:
+    if REGISTRY.enabled:
+        INGEST_RESULTS.inc(source_type, status)
+
+
+def count_route_error() -> None:
+    if REGISTRY.enabled:
+        ROUTE_ERRORS.inc()
+
+
+def gauge_family(name: str, help_text: str, value: float):
+    # Single-sample families for collectors.
+    return name, "gauge", help_text, [(name, {}, value)]
+
+
+def counter_family(name: str, help_text: str, value: float):
+    return name, "counter", help_text, [(f"{name}_total", {}, value)]
+
+
+def _render_family(lines: list[str], name: str, kind: str, help_text: str, samples: list[Sample]) -> None:
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+    for sample_name, labels, value in samples:
+        lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    parts = [f'{key}="{_escape(str(value))}"' for key, value in labels.items()]
+    return "{" + ",".join(parts) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 class ReceiptMerchant(BaseModel):
@@ -13,6 +13,8 @@ class ReceiptInfo(BaseModel):
     id: str
     merchant: ReceiptMerchant
     datetime: str
+    # receipt | ingest (no date on the receipt: `datetime` is the time it was ingested)
+    datetime_source: str = "receipt"
     currency: str = "EUR"
     payment_method: str | None = None
 
@@ -53,8 +55,11 @@ class Provenance(BaseModel):
     source_type: str
     ocr_engine: str | None = None
     parser: str = "de_receipt_v1"
+    parser_version: str | None = None
     created_at: str
     ingest_event_id: str | None = None
+    rules_version: str | None = None
+    rules_hash: str | None = None
 
 
 class CanonicalReceipt(BaseModel):
@@ -74,3 +79,30 @@ class IngestResult(BaseModel):
     ingest_event_path: str
     canonical_receipt_path: str | None = None
     receipt: CanonicalReceipt | None = None
+
+
+class BatchIngestItem(BaseModel):
+    text: str | None = None
+    receipt: dict | None = None
+    source_name: str | None = None
+
+    @model_validator(mode="after")
+    def _exactly_one_payload(self) -> BatchIngestItem:
+        if (self.text is None) == (self.receipt is None):
+            raise ValueError("Batch item needs exactly one of 'text' or 'receipt'.")
+        if self.text is not None and not self.text.strip():
+            raise ValueError("Batch item 'text' must not be empty.")
+        return self
+
+
+class BatchIngestItemResult(BaseModel):
+    index: int
+    status: str
+    result: IngestResult | None = None
+    error: str | None = None
+
+
+class BatchIngestResult(BaseModel):
+    items: list[BatchIngestItemResult]
+    ok: int = 0
+    failed: int = 0
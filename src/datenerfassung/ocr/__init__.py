@@ -1,3 +1,13 @@
-from .paddleocr_backend import OcrNotAvailableError, ocr_image_path
+from .cache import OcrCache, OcrCacheStats
+from .paddleocr_backend import OcrNotAvailableError, ocr_image_path, ocr_images, warm_up
+from .pool import OcrWorkerPool
 
-__all__ = ["OcrNotAvailableError", "ocr_image_path"]
+__all__ = [
+    "OcrCache",
+    "OcrCacheStats",
+    "OcrNotAvailableError",
+    "OcrWorkerPool",
+    "ocr_image_path",
+    "ocr_images",
+    "warm_up",
+]
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+
+from .paddleocr_backend import PaddleOcrConfig, engine_version
+
+
+@dataclass(frozen=True, slots=True)
+class OcrCacheStats:
+    entries: int
+    hits: int
+    misses: int
+    evictions: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+def hash_file(path: Path, *, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as fh:
+        while chunk := fh.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(image_sha256: str, config: PaddleOcrConfig, *, engine: str = "paddleocr") -> str:
+    material = f"{image_sha256}|{engine}|{engine_version()}|{config.lang}|{int(config.use_angle_cls)}"
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class OcrCache:
+    # Content-addressed OCR text cache: one file per key under cache_dir/<key[:2]>/<key>.txt.
+    # File mtimes double as the LRU order, so the recency survives restarts without an index file.
+    def __init__(self, cache_dir: Path, *, max_entries: int = 10_000) -> None:
+        self.cache_dir = cache_dir
+        self.max_entries = max(1, max_entries)
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, None] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._load()
+
+    def get(self, key: str) -> str | None:
+        path = self._path(key)
+        with self._lock:
+            if key not in self._entries:
+                self._misses += 1
+                return None
+            try:
+                text = path.read_text(encoding="utf-8")
+            except FileNotFoundError:
+                del self._entries[key]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return text
+
+    def put(self, key: str, text: str) -> None:
+        # A unique temp file per writer: concurrent puts of the same key (the same photo uploaded
+        # twice at once) each rename a complete file, and the last one wins.
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                fh.write(text)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        with self._lock:
+            self._entries[key] = None
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._path(evicted).unlink(missing_ok=True)
+                self._evictions += 1
+
+    def stats(self) -> OcrCacheStats:
+        with self._lock:
+            return OcrCacheStats(
+                entries=len(self._entries), hits=self._hits, misses=self._misses, evictions=self._evictions
+            )
+
+    def _load(self) -> None:
+        if not self.cache_dir.exists():
+            return
+        found = []
+        for path in self.cache_dir.glob("*/*.txt"):
+            try:
+                found.append((path.stat().st_mtime, path.stem))
+            except OSError:
+                continue
+        for _, key in sorted(found):
+            self._entries[key] = None
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._path(evicted).unlink(missing_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.txt"
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import logging
 from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
@@ -8,6 +9,9 @@ from collections.abc import Mapping
 from collections.abc import Sequence
 
 
+logger = logging.getLogger(__name__)
+
+
 class OcrNotAvailableError(RuntimeError):
     pass
 
@@ -34,6 +38,40 @@ def ocr_image_path(image_path: Path, *, config: PaddleOcrConfig | None = None) -
     return "\n".join(lines).strip()
 
 
+def ocr_images(
+    image_paths: Sequence[Path],
+    *,
+    config: PaddleOcrConfig | None = None,
+    batch_size: int = 8,
+    ocr: object | None = None,
+) -> list[str]:
+    # Runs up to batch_size images per inference call; `ocr` replaces the cached PaddleOCR instance
+    # (worker processes pass their own, tests pass a fake).
+    for image_path in image_paths:
+        if not image_path.exists():
+            raise FileNotFoundError(str(image_path))
+
+    cfg = config or PaddleOcrConfig()
+    engine = ocr if ocr is not None else _get_ocr(cfg.lang, cfg.use_angle_cls)
+
+    texts: list[str] = []
+    step = max(1, batch_size)
+    for start in range(0, len(image_paths), step):
+        batch = [str(p) for p in image_paths[start : start + step]]
+        try:
+            results = _predict_batch(engine, batch, use_angle_cls=cfg.use_angle_cls)
+        except Exception as exc:
+            raise RuntimeError(f"PaddleOCR failed: {exc}") from exc
+        texts.extend("\n".join(_flatten_and_sort(result)).strip() for result in results)
+    return texts
+
+
+def warm_up(config: PaddleOcrConfig | None = None) -> None:
+    # Builds (and caches) the model so the first request does not pay the cold start.
+    cfg = config or PaddleOcrConfig()
+    _get_ocr(cfg.lang, cfg.use_angle_cls)
+
+
 def _flatten_and_sort(result: object) -> list[str]:
     # PaddleOCR returns either:
     # - list[list[[box, (text, score)], ...]] for multiple images
@@ -122,6 +160,18 @@ def _top_left_xy(box: object) -> tuple[float, float]:
     return 0.0, 0.0
 
 
+@lru_cache(maxsize=1)
+def engine_version() -> str:
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+    except ImportError:  # pragma: no cover
+        return "unknown"
+    try:
+        return version("paddleocr")
+    except PackageNotFoundError:
+        return "unknown"
+
+
 @lru_cache(maxsize=4)
 def _get_ocr(lang: str, use_angle_cls: bool):
     try:
@@ -153,6 +203,23 @@ def _get_ocr(lang: str, use_angle_cls: bool):
     return PaddleOCR(lang=lang)
 
 
+def _predict_batch(ocr, image_paths: list[str], *, use_angle_cls: bool) -> list[object]:
+    # Newer PaddleOCR accepts a list of inputs in predict() and returns one page result per image.
+    # Wrap each in a list so it has the same shape as a single-image result.
+    if len(image_paths) > 1 and hasattr(ocr, "predict"):
+        results = list(ocr.predict(image_paths))
+        if len(results) == len(image_paths):
+            return [[result] for result in results]
+        # Pages cannot be matched to images (e.g. a multi-page input): run every image on its own,
+        # which costs a second inference per image.
+        logger.warning(
+            "OCR returned %d results for a batch of %d images; re-running them one by one",
+            len(results),
+            len(image_paths),
+        )
+    return [_predict(ocr, image_path, use_angle_cls=use_angle_cls) for image_path in image_paths]
+
+
 def _predict(ocr, image_path: str, *, use_angle_cls: bool) -> object:
     # PaddleOCR APIs vary:
     # - older: ocr.ocr(img, cls=bool)
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Self
+
+from .paddleocr_backend import OcrNotAvailableError, PaddleOcrConfig, _get_ocr, ocr_images
+
+OcrFactory = Callable[[PaddleOcrConfig], object]
+
+logger = logging.getLogger(__name__)
+
+
+# Per worker process: the OCR model built once by _init_worker, or the error that prevented it.
+_worker_ocr: object | None = None
+_worker_error: Exception | None = None
+_worker_config: PaddleOcrConfig | None = None
+
+
+def _default_factory(config: PaddleOcrConfig) -> object:
+    return _get_ocr(config.lang, config.use_angle_cls)
+
+
+def _init_worker(config: PaddleOcrConfig, factory: OcrFactory | None) -> None:
+    global _worker_ocr, _worker_error, _worker_config
+    _worker_config = config
+    try:
+        _worker_ocr = (factory or _default_factory)(config)
+    except Exception as exc:  # noqa: BLE001 - raised again by every request this worker takes
+        # Raising here would break the whole pool; report it per request instead.
+        _worker_error = exc
+
+
+def _ping() -> bool:
+    if _worker_error is not None:
+        raise _worker_error
+    return True
+
+
+def _ocr_batch(image_paths: list[str], batch_size: int) -> list[str | RuntimeError]:
+    if _worker_error is not None:
+        raise _worker_error
+    paths = [Path(p) for p in image_paths]
+    try:
+        return list(ocr_images(paths, config=_worker_config, batch_size=batch_size, ocr=_worker_ocr))
+    except Exception as exc:  # noqa: BLE001 - logged, then retried per image below
+        logger.warning(
+            "OCR batch of %d images failed, retrying one by one: %s: %s", len(paths), type(exc).__name__, exc
+        )
+    # One bad image must not fail its batch neighbours: retry one by one and report per image.
+    out: list[str | RuntimeError] = []
+    for path in paths:
+        try:
+            out.extend(ocr_images([path], config=_worker_config, batch_size=1, ocr=_worker_ocr))
+        except Exception as exc:  # noqa: BLE001 - reported for this image only
+            out.append(exc if isinstance(exc, RuntimeError) else RuntimeError(str(exc)))
+    return out
+
+
+class OcrWorkerPool:
+    # Long-lived worker processes, each holding its own warm OCR model. Single-image requests from
+    # concurrent callers (e.g. job queue threads) are coalesced into batches of up to batch_size,
+    # waiting at most max_wait_s for a batch to fill.
+    def __init__(
+        self,
+        *,
+        workers: int = 1,
+        config: PaddleOcrConfig | None = None,
+        batch_size: int = 4,
+        max_wait_s: float = 0.05,
+        factory: OcrFactory | None = None,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.config = config or PaddleOcrConfig()
+        self.batch_size = max(1, batch_size)
+        self.max_wait_s = max_wait_s
+        self.factory = factory
+        # Why start(warm_up=True) could not build the model; OCR requests report it as well.
+        self.warm_up_error: Exception | None = None
+        self._executor: ProcessPoolExecutor | None = None
+        self._requests: queue.Queue[tuple[str, Future[str]] | None] = queue.Queue()
+        self._dispatcher: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def start(self, *, warm_up: bool = True) -> None:
+        with self._lock:
+            if self._executor is not None:
+                return
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.config, self.factory),
+            )
+            self._dispatcher = threading.Thread(target=self._dispatch, name="ocr-dispatch", daemon=True)
+            self._dispatcher.start()
+        if warm_up:
+            # Forces worker start-up (and model construction) now instead of on the first upload.
+            # A failure here must not keep the service from starting: image ingests without OCR still
+            # store the raw image, and OCR requests report the same error.
+            pings = [self._executor.submit(_ping) for _ in range(self.workers)]
+            for ping in pings:
+                try:
+                    ping.result()
+                except Exception as exc:  # noqa: BLE001 - kept in warm_up_error, see above
+                    self.warm_up_error = exc
+                    if not isinstance(exc, OcrNotAvailableError):
+                        logger.warning("OCR worker warm-up failed: %s: %s", type(exc).__name__, exc)
+                    break
+
+    def close(self) -> None:
+        with self._lock:
+            if self._executor is None:
+                return
+            self._requests.put(None)
+            if self._dispatcher is not None:
+                self._dispatcher.join()
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+            self._dispatcher = None
+
+    def ocr_images(self, image_paths: Sequence[Path]) -> list[str]:
+        futures = [self.submit(p) for p in image_paths]
+        return [f.result() for f in futures]
+
+    def ocr_image_path(self, image_path: Path) -> str:
+        return self.submit(image_path).result()
+
+    def queue_depth(self) -> int:
+        # Images waiting for the dispatcher (not yet handed to a worker process).
+        return self._requests.qsize()
+
+    def submit(self, image_path: Path) -> Future[str]:
+        if self._executor is None:
+            self.start(warm_up=False)
+        future: Future[str] = Future()
+        self._requests.put((str(image_path), future))
+        return future
+
+    def _dispatch(self) -> None:
+        while True:
+            first = self._requests.get()
+            if first is None:
+                return
+            batch = [first]
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    nxt = self._requests.get(timeout=self.max_wait_s)
+                except queue.Empty:
+                    break
+                if nxt is None:
+                    stop = True
+                    break
+                batch.append(nxt)
+            self._run_batch(batch)
+            if stop:
+                return
+
+    def _run_batch(self, batch: list[tuple[str, Future[str]]]) -> None:
+        assert self._executor is not None
+        paths = [path for path, _ in batch]
+        futures = [future for _, future in batch]
+
+        def resolve(done: Future[list[str | RuntimeError]]) -> None:
+            try:
+                results = done.result()
+            except BaseException as exc:  # noqa: BLE001 - handed to every waiting caller
+                for future in futures:
+                    future.set_exception(exc)
+                return
+            for future, result in zip(futures, results):
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+        self._executor.submit(_ocr_batch, paths, self.batch_size).add_done_callback(resolve)
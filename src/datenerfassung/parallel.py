@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import os
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Self
+
+from .engine import ReceiptEngine
+from .models import CanonicalReceipt
+from .rules.loader import RuleSet
+
+
+@dataclass(frozen=True, slots=True)
+class ParseJob:
+    text: str
+    source_type: str = "text"
+    ingest_event_id: str | None = None
+
+
+class ParseError(RuntimeError):
+    pass
+
+
+# Set once per worker process by _init_worker; the RuleSet (incl. compiled indexes) is never pickled.
+_worker_engine: ReceiptEngine | None = None
+
+
+def _init_worker(rules_dir: str, tz: str) -> None:
+    global _worker_engine
+    _worker_engine = ReceiptEngine(RuleSet.load_from_dir(Path(rules_dir)), tz=tz)
+
+
+def _parse_chunk(jobs: list[ParseJob]) -> list[CanonicalReceipt | ParseError]:
+    if _worker_engine is None:
+        raise RuntimeError("Worker process was not initialized with a RuleSet.")
+    return _parse_jobs(_worker_engine, jobs)
+
+
+def _parse_jobs(engine: ReceiptEngine, jobs: list[ParseJob]) -> list[CanonicalReceipt | ParseError]:
+    out: list[CanonicalReceipt | ParseError] = []
+    for job in jobs:
+        try:
+            out.append(
+                engine.parse_text(job.text, source_type=job.source_type, ingest_event_id=job.ingest_event_id)
+            )
+        except Exception as exc:  # noqa: BLE001 - one bad receipt must not fail its chunk
+            out.append(ParseError(f"{type(exc).__name__}: {exc}"))
+    return out
+
+
+class ReceiptEnginePool:
+    # Parses receipts on a process pool. Jobs are dispatched in chunks with a bounded number of
+    # chunks in flight, and results are yielded in input order. workers <= 1 parses in-process.
+    def __init__(
+        self,
+        rules_dir: Path,
+        *,
+        workers: int | None = None,
+        tz: str = "Europe/Berlin",
+        chunk_size: int = 64,
+        max_pending_chunks: int | None = None,
+    ) -> None:
+        self.rules_dir = rules_dir
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.tz = tz
+        self.chunk_size = max(1, chunk_size)
+        self.max_pending_chunks = max_pending_chunks or max(2, self.workers * 2)
+        self._executor: ProcessPoolExecutor | None = None
+        self._local: ReceiptEngine | None = None
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def parse_many(
+        self, jobs: Iterable[ParseJob | str], *, return_exceptions: bool = False
+    ) -> Iterator[CanonicalReceipt | ParseError]:
+        for result in self._results(_chunks(jobs, self.chunk_size)):
+            if isinstance(result, ParseError) and not return_exceptions:
+                raise result
+            yield result
+
+    def submit(self, jobs: list[ParseJob]) -> Future[list[CanonicalReceipt | ParseError]]:
+        # Parses one chunk on the pool; with workers <= 1 (or no jobs) the future is already done.
+        if self.workers > 1 and jobs:
+            return self._get_executor().submit(_parse_chunk, jobs)
+        future: Future[list[CanonicalReceipt | ParseError]] = Future()
+        future.set_result(_parse_jobs(self._local_engine(), jobs) if jobs else [])
+        return future
+
+    def _results(self, chunks: Iterator[list[ParseJob]]) -> Iterator[CanonicalReceipt | ParseError]:
+        if self.workers <= 1:
+            engine = self._local_engine()
+            for chunk in chunks:
+                yield from _parse_jobs(engine, chunk)
+            return
+
+        executor = self._get_executor()
+        pending: deque[Future[list[CanonicalReceipt | ParseError]]] = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_parse_chunk, chunk))
+            if len(pending) >= self.max_pending_chunks:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+    def _local_engine(self) -> ReceiptEngine:
+        if self._local is None:
+            self._local = ReceiptEngine(RuleSet.load_from_dir(self.rules_dir), tz=self.tz)
+        return self._local
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(str(self.rules_dir), self.tz),
+            )
+        return self._executor
+
+
+def _chunks(jobs: Iterable[ParseJob | str], size: int) -> Iterator[list[ParseJob]]:
+    chunk: list[ParseJob] = []
+    for job in jobs:
+        chunk.append(job if isinstance(job, ParseJob) else ParseJob(text=job))
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
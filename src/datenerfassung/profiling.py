@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import os
+import random
+import time
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+PROFILE_HEADER = "X-Datenerfassung-Profile"
+PROFILE_DIR = "profiles"
+
+
+@dataclass(frozen=True, slots=True)
+class ProfilingConfig:
+    # sample_percent of ingests are profiled; allow_header lets a request ask for a profile itself.
+    sample_percent: float = 0.0
+    allow_header: bool = True
+    slowest_lines: int = 10
+
+    @classmethod
+    def from_env(cls) -> ProfilingConfig:
+        return cls(
+            sample_percent=float(os.getenv("INGEST_PROFILE_SAMPLE_PERCENT", "0")),
+            allow_header=os.getenv("INGEST_PROFILE_HEADER", "1") not in {"0", "false", "False"},
+            slowest_lines=int(os.getenv("INGEST_PROFILE_SLOWEST_LINES", "10")),
+        )
+
+    def wants(self, requested: bool | None) -> bool:
+        # requested: True/False from the request (header), None to leave it to sampling.
+        if requested is not None and self.allow_header:
+            return requested
+        return self.sample_percent > 0 and random.random() * 100 < self.sample_percent
+
+
+class RequestProfile:
+    # Time breakdown of one ingest: pipeline stages, every category rule that was evaluated and the
+    # slowest line items. Written as JSON next to the ingest event (data/raw/profiles/<id>.json).
+    __slots__ = (
+        "_keep", "_seq", "_t0", "ingest_event_id", "lines", "rules", "rules_hash", "source_type", "stages",
+        "started_at",
+    )
+
+    def __init__(self, ingest_event_id: str, *, source_type: str, slowest_lines: int = 10) -> None:
+        self.ingest_event_id = ingest_event_id
+        self.source_type = source_type
+        self.started_at = datetime.now(UTC).isoformat()
+        self.rules_hash: str | None = None
+        self.stages: dict[str, float] = {}
+        # rule id -> [evaluations, matches, seconds]
+        self.rules: dict[str, list] = {}
+        # min-heap of (seconds, seq, line dict) keeping the slowest lines
+        self.lines: list[tuple[float, int, dict]] = []
+        self._t0 = time.perf_counter()
+        self._keep = max(0, slowest_lines)
+        self._seq = itertools.count()
+
+    def add_stage(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def add_rule(self, rule_id: str, seconds: float, *, matched: bool) -> None:
+        entry = self.rules.get(rule_id)
+        if entry is None:
+            entry = self.rules[rule_id] = [0, 0, 0.0]
+        entry[0] += 1
+        entry[1] += int(matched)
+        entry[2] += seconds
+
+    def add_line(self, name_raw: str, *, normalize_s: float, categorize_s: float, rule_id: str | None) -> None:
+        if not self._keep:
+            return
+        total = normalize_s + categorize_s
+        line = {
+            "name_raw": name_raw,
+            "normalize_ms": _ms(normalize_s),
+            "categorize_ms": _ms(categorize_s),
+            "rule_id": rule_id,
+        }
+        item = (total, next(self._seq), line)
+        if len(self.lines) < self._keep:
+            heapq.heappush(self.lines, item)
+        elif total > self.lines[0][0]:
+            heapq.heapreplace(self.lines, item)
+
+    def to_dict(self) -> dict:
+        rules = sorted(self.rules.items(), key=lambda item: item[1][2], reverse=True)
+        return {
+            "ingest_event_id": self.ingest_event_id,
+            "source_type": self.source_type,
+            "started_at": self.started_at,
+            "rules_hash": self.rules_hash,
+            "total_ms": _ms(time.perf_counter() - self._t0),
+            "stages_ms": {stage: _ms(seconds) for stage, seconds in self.stages.items()},
+            "rules": [
+                {"rule_id": rule_id, "evaluations": evaluations, "matches": matches, "total_ms": _ms(seconds)}
+                for rule_id, (evaluations, matches, seconds) in rules
+            ],
+            "slowest_lines": [line for _, _, line in sorted(self.lines, key=lambda item: item[0], reverse=True)],
+        }
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
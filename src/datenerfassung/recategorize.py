@@ -0,0 +1,333 @@
+from __future__ import annotations
+
+import json
+from collections import Counter, deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .models import CanonicalReceipt
+from .rules.categorization import CompiledCategories, compile_categories
+from .rules.loader import CategoryRule, RuleSet
+from .storage import write_json_atomic
+
+if TYPE_CHECKING:
+    from .receipt_index import ReceiptIndex
+
+SNAPSHOT_DIR = "rule_snapshots"
+STATE_DIR = "recategorize"
+DEFAULT_CHUNK_RECEIPTS = 256
+NO_RULE = "other"
+
+
+def save_rules_snapshot(canonical_dir: Path, ruleset: RuleSet) -> Path | None:
+    # Category rules keyed by RuleSet.hash, so a later run can diff against the exact rules a stored
+    # receipt was categorized with (Provenance.rules_hash).
+    if not ruleset.hash:
+        return None
+    path = canonical_dir / SNAPSHOT_DIR / f"{ruleset.hash}.json"
+    if not path.exists():
+        rules = [
+            {"id": r.id, "priority": r.priority, "when_any": r.when_any, "then": r.then}
+            for r in ruleset.categories.rules
+        ]
+        write_json_atomic(path, {"hash": ruleset.hash, "version": ruleset.version, "rules": rules})
+    return path
+
+
+def load_rules_snapshot(canonical_dir: Path, rules_hash: str | None) -> list[CategoryRule] | None:
+    if not rules_hash:
+        return None
+    path = canonical_dir / SNAPSHOT_DIR / f"{rules_hash}.json"
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return [
+        CategoryRule(id=r["id"], priority=r["priority"], when_any=list(r["when_any"]), then=dict(r["then"]))
+        for r in data.get("rules") or []
+    ]
+
+
+@dataclass(frozen=True, slots=True)
+class RuleDiff:
+    added: frozenset[str]
+    removed: frozenset[str]
+    changed: frozenset[str]
+    # Unchanged rules now win in a different order (e.g. equal priorities moved in the file).
+    reordered: bool = False
+
+    @property
+    def empty(self) -> bool:
+        return not (self.added or self.removed or self.changed or self.reordered)
+
+
+def diff_rules(old: list[CategoryRule], new: list[CategoryRule]) -> RuleDiff:
+    old_by_id = {r.id: r for r in old}
+    new_by_id = {r.id: r for r in new}
+    added = frozenset(new_by_id.keys() - old_by_id.keys())
+    removed = frozenset(old_by_id.keys() - new_by_id.keys())
+    changed = frozenset(
+        rid for rid in old_by_id.keys() & new_by_id.keys() if _rule_key(old_by_id[rid]) != _rule_key(new_by_id[rid])
+    )
+    stable = (old_by_id.keys() & new_by_id.keys()) - changed
+    reordered = [r.id for r in old if r.id in stable] != [r.id for r in new if r.id in stable]
+    return RuleDiff(added=added, removed=removed, changed=changed, reordered=reordered)
+
+
+def _rule_key(rule: CategoryRule) -> str:
+    return json.dumps([rule.priority, rule.when_any, rule.then], sort_keys=True, ensure_ascii=False)
+
+
+@dataclass(frozen=True, slots=True)
+class _Plan:
+    # Which stored items one old ruleset -> current ruleset transition can affect. An item's result
+    # can only change if its current rule was removed/changed, or an added/changed rule matches it.
+    full: bool
+    stale_rule_ids: frozenset[str] = frozenset()
+    candidates: CompiledCategories | None = None
+
+    def affects(self, item: dict) -> bool:
+        if self.full:
+            return True
+        classification = item.get("classification") or {}
+        if classification.get("rule_id") in self.stale_rule_ids:
+            return True
+        if self.candidates is None:
+            return False
+        _, rule_id, _, _ = self.candidates.categorize(item.get("name_clean") or "", item.get("tokens") or [])
+        return rule_id is not None
+
+
+def build_plan(old: list[CategoryRule] | None, new: list[CategoryRule]) -> _Plan | None:
+    # None: nothing to do. Without a snapshot of the old rules every item is re-evaluated.
+    if old is None:
+        return _Plan(full=True)
+    diff = diff_rules(old, new)
+    if diff.empty:
+        return None
+    if diff.reordered:
+        return _Plan(full=True)
+    touched = diff.added | diff.changed
+    candidates = [r for r in new if r.id in touched]
+    return _Plan(
+        full=False,
+        stale_rule_ids=diff.removed | diff.changed,
+        candidates=compile_categories(candidates) if candidates else None,
+    )
+
+
+@dataclass(slots=True)
+class RecategorizeStats:
+    receipts_scanned: int = 0
+    receipts_changed: int = 0
+    receipts_full: int = 0
+    items_evaluated: int = 0
+    items_changed: int = 0
+    changed_by_rule: Counter = field(default_factory=Counter)
+    changed_paths: list[str] = field(default_factory=list)
+    failed: list[tuple[str, str]] = field(default_factory=list)
+
+    def merge(self, other: RecategorizeStats) -> None:
+        self.receipts_scanned += other.receipts_scanned
+        self.receipts_changed += other.receipts_changed
+        self.receipts_full += other.receipts_full
+        self.items_evaluated += other.items_evaluated
+        self.items_changed += other.items_changed
+        self.changed_by_rule.update(other.changed_by_rule)
+        self.changed_paths.extend(other.changed_paths)
+        self.failed.extend(other.failed)
+
+
+@dataclass(frozen=True, slots=True)
+class RecategorizeResult:
+    rules_hash: str
+    receipts_scanned: int
+    receipts_changed: int
+    receipts_resumed: int
+    receipts_full: int
+    items_evaluated: int
+    items_changed: int
+    # Changed items per rule that now categorizes them ("other" = no rule matches any more).
+    changed_by_rule: dict[str, int]
+    failed: list[str]
+
+
+class _Recategorizer:
+    # Per-process state: the target rules plus one plan per old rules hash seen in the data.
+    def __init__(self, canonical_dir: Path, ruleset: RuleSet) -> None:
+        self.canonical_dir = canonical_dir
+        self.ruleset = ruleset
+        self.rules = list(ruleset.categories.rules)
+        self.compiled = ruleset.categories.compiled or compile_categories(self.rules)
+        self._plans: dict[str | None, _Plan | None] = {}
+
+    def run(self, rels: list[str]) -> RecategorizeStats:
+        stats = RecategorizeStats()
+        receipts_dir = self.canonical_dir / "receipts"
+        for rel in rels:
+            try:
+                self._recategorize(receipts_dir / rel, rel, stats)
+            except (OSError, ValueError, KeyError, TypeError) as exc:
+                stats.failed.append((rel, f"{type(exc).__name__}: {exc}"))
+        return stats
+
+    def _recategorize(self, path: Path, rel: str, stats: RecategorizeStats) -> None:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        stats.receipts_scanned += 1
+        provenance = data.get("provenance") or {}
+        plan = self._plan(provenance.get("rules_hash"))
+        if plan is None:
+            return
+        stats.receipts_full += plan.full
+
+        changed = 0
+        for item in data.get("line_items") or []:
+            classification = item.get("classification") or {}
+            if classification.get("engine", "rules") != "rules" or not plan.affects(item):
+                continue
+            stats.items_evaluated += 1
+            category, rule_id, confidence, tags = self.compiled.categorize(
+                item.get("name_clean") or "", item.get("tokens") or []
+            )
+            if (
+                item.get("category") == category
+                and classification.get("rule_id") == rule_id
+                and classification.get("confidence") == confidence
+                and (item.get("tags") or []) == tags
+            ):
+                continue
+            item["category"] = category
+            item["tags"] = tags
+            item["classification"] = {**classification, "engine": "rules", "rule_id": rule_id, "confidence": confidence}
+            stats.changed_by_rule[rule_id or NO_RULE] += 1
+            changed += 1
+
+        if changed:
+            provenance["rules_version"] = self.ruleset.version or None
+            provenance["rules_hash"] = self.ruleset.hash or None
+            data["provenance"] = provenance
+            write_json_atomic(path, data)
+            stats.items_changed += changed
+            stats.receipts_changed += 1
+            stats.changed_paths.append(rel)
+
+    def _plan(self, rules_hash: str | None) -> _Plan | None:
+        if rules_hash not in self._plans:
+            if rules_hash and rules_hash == self.ruleset.hash:
+                self._plans[rules_hash] = None
+            else:
+                self._plans[rules_hash] = build_plan(load_rules_snapshot(self.canonical_dir, rules_hash), self.rules)
+        return self._plans[rules_hash]
+
+
+# Set once per worker process by _init_worker, like the parse pool in parallel.py.
+_worker: _Recategorizer | None = None
+
+
+def _init_worker(rules_dir: str, canonical_dir: str, rules_hash: str) -> None:
+    global _worker
+    ruleset = RuleSet.load_from_dir(Path(rules_dir))
+    if ruleset.hash != rules_hash:
+        raise RuntimeError(f"Rules in {rules_dir} changed during the run ({rules_hash} -> {ruleset.hash}).")
+    _worker = _Recategorizer(Path(canonical_dir), ruleset)
+
+
+def _run_chunk(rels: list[str]) -> RecategorizeStats:
+    if _worker is None:
+        raise RuntimeError("Worker process was not initialized.")
+    return _worker.run(rels)
+
+
+def recategorize_receipts(
+    canonical_dir: Path,
+    ruleset: RuleSet,
+    *,
+    rules_dir: Path,
+    workers: int = 1,
+    chunk_receipts: int = DEFAULT_CHUNK_RECEIPTS,
+    resume: bool = True,
+    index: ReceiptIndex | None = None,
+) -> RecategorizeResult:
+    # Re-applies the category rules to stored canonical receipts in place. Only items the rule diff
+    # (per receipt, against the snapshot of the rules recorded in its provenance) can affect are
+    # re-evaluated. Finished chunks are recorded in recategorize/<rules hash>.done, so an interrupted
+    # run continues where it stopped; resume=False starts over.
+    save_rules_snapshot(canonical_dir, ruleset)
+    receipts_dir = canonical_dir / "receipts"
+    state = canonical_dir / STATE_DIR / f"{ruleset.hash or 'unversioned'}.done"
+    if not resume and state.exists():
+        state.unlink()
+    done = _read_state(state)
+
+    rels = [p.relative_to(receipts_dir).as_posix() for p in sorted(receipts_dir.rglob("*.json"))]
+    pending = [rel for rel in rels if rel not in done]
+    chunks = [pending[i : i + max(1, chunk_receipts)] for i in range(0, len(pending), max(1, chunk_receipts))]
+
+    total = RecategorizeStats()
+    for rels_done, stats in _chunk_results(canonical_dir, ruleset, rules_dir, chunks, workers):
+        if index is not None and stats.changed_paths:
+            index.upsert_many(
+                (
+                    CanonicalReceipt.model_validate_json((receipts_dir / rel).read_text(encoding="utf-8")),
+                    receipts_dir / rel,
+                )
+                for rel in stats.changed_paths
+            )
+        # Failed receipts stay pending so the next run retries them.
+        failed = {rel for rel, _ in stats.failed}
+        _append_state(state, (rel for rel in rels_done if rel not in failed))
+        total.merge(stats)
+
+    return RecategorizeResult(
+        rules_hash=ruleset.hash,
+        receipts_scanned=total.receipts_scanned,
+        receipts_changed=total.receipts_changed,
+        receipts_resumed=len(rels) - len(pending),
+        receipts_full=total.receipts_full,
+        items_evaluated=total.items_evaluated,
+        items_changed=total.items_changed,
+        changed_by_rule=dict(total.changed_by_rule.most_common()),
+        failed=[f"{rel}: {error}" for rel, error in total.failed],
+    )
+
+
+def _chunk_results(
+    canonical_dir: Path, ruleset: RuleSet, rules_dir: Path, chunks: list[list[str]], workers: int
+) -> Iterator[tuple[list[str], RecategorizeStats]]:
+    if workers <= 1 or len(chunks) <= 1:
+        local = _Recategorizer(canonical_dir, ruleset)
+        for chunk in chunks:
+            yield chunk, local.run(chunk)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(str(rules_dir), str(canonical_dir), ruleset.hash),
+    ) as executor:
+        pending: deque[tuple[list[str], Future[RecategorizeStats]]] = deque()
+        for chunk in chunks:
+            pending.append((chunk, executor.submit(_run_chunk, chunk)))
+            if len(pending) >= workers * 2:
+                chunk_done, future = pending.popleft()
+                yield chunk_done, future.result()
+        while pending:
+            chunk_done, future = pending.popleft()
+            yield chunk_done, future.result()
+
+
+def _read_state(state: Path) -> set[str]:
+    if not state.exists():
+        return set()
+    return {line for line in state.read_text(encoding="utf-8").splitlines() if line}
+
+
+def _append_state(state: Path, rels: Iterable[str]) -> None:
+    lines = "".join(f"{rel}\n" for rel in rels)
+    if lines:
+        state.parent.mkdir(parents=True, exist_ok=True)
+        with state.open("a", encoding="utf-8") as fh:
+            fh.write(lines)
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
 import re
+from collections.abc import Iterable, Iterator
 from dataclasses import dataclass
 from datetime import datetime
 from datetime import timezone
 from zoneinfo import ZoneInfo
 
+PARSER_NAME = "de_receipt_v1"
+# Bump whenever parse output can change for the same text; `datenerfassung reparse` uses it to
+# find receipts that need regenerating.
+PARSER_VERSION = "1"
+
 
 @dataclass(frozen=True, slots=True)
 class ParsedLine:
@@ -25,37 +31,66 @@ class ParsedReceipt:
 _DATE = re.compile(r"\b(\d{2})[./-](\d{2})[./-](\d{4})\b")
 _TIME = re.compile(r"\b(\d{2}):(\d{2})\b")
 _PRICE = re.compile(r"(?P<price>\d+[\.,]\d{2})\s*$")
+_QTY = re.compile(r"\b(?P<qty>\d+(?:[\.,]\d+)?)\s*[x\*]\s*$")
 
+_NOISE_MARKERS = ("summe", "gesamt", "total", "mwst", "ust", "steuern", "bar", "karte", "ec", "visa")
+# One alternation over the casefolded line instead of a substring scan per marker.
+_NOISE = re.compile("|".join(map(re.escape, _NOISE_MARKERS)))
 
-def parse_receipt_text(text: str, *, tz: str = "Europe/Berlin") -> ParsedReceipt:
-    lines = [ln.strip() for ln in text.splitlines()]
-    lines = [ln for ln in lines if ln]
 
-    dt_hint = _parse_datetime_hint(text, tz=tz)
+def parse_receipt_text(text: str | Iterable[str], *, tz: str = "Europe/Berlin") -> ParsedReceipt:
+    # Single pass over the lines: date/time hints, merchant hint and line items are collected as each
+    # line goes by. Accepts the whole text or any iterable of lines (e.g. streamed OCR output).
+    lines: Iterable[str] = text.splitlines() if isinstance(text, str) else _split_lines(text)
 
+    date_groups: tuple[str, ...] | None = None
+    time_groups: tuple[str, ...] | None = None
     merchant_hint = None
-    if lines:
-        merchant_hint = lines[0][:80]
-
     parsed_lines: list[ParsedLine] = []
-    for ln in lines:
-        if _is_noise_line(ln):
+    append = parsed_lines.append
+
+    for raw in lines:
+        # Hints are searched on every line, noise included, exactly like a search over the whole text.
+        if date_groups is None:
+            date_match = _DATE.search(raw)
+            if date_match is not None:
+                date_groups = date_match.groups()
+        if time_groups is None:
+            time_match = _TIME.search(raw)
+            if time_match is not None:
+                time_groups = time_match.groups()
+
+        line = raw.strip()
+        if not line:
             continue
-        parsed_lines.append(_parse_line(ln))
+        if merchant_hint is None:
+            merchant_hint = line[:80]
+        if _is_noise_line(line):
+            continue
+        append(_parse_line(line))
 
-    return ParsedReceipt(merchant_name_hint=merchant_hint, datetime_hint=dt_hint, lines=parsed_lines)
+    return ParsedReceipt(
+        merchant_name_hint=merchant_hint,
+        datetime_hint=_datetime_hint(date_groups, time_groups, tz=tz),
+        lines=parsed_lines,
+    )
 
 
-def _parse_datetime_hint(text: str, *, tz: str) -> datetime | None:
-    date_match = _DATE.search(text)
-    if not date_match:
+def _split_lines(lines: Iterable[str]) -> Iterator[str]:
+    for chunk in lines:
+        yield from chunk.splitlines()
+
+
+def _datetime_hint(
+    date_groups: tuple[str, ...] | None, time_groups: tuple[str, ...] | None, *, tz: str
+) -> datetime | None:
+    if date_groups is None:
         return None
 
-    day, month, year = map(int, date_match.groups())
-    time_match = _TIME.search(text)
+    day, month, year = map(int, date_groups)
     hour, minute = (0, 0)
-    if time_match:
-        hour, minute = map(int, time_match.groups())
+    if time_groups is not None:
+        hour, minute = map(int, time_groups)
 
     try:
         zone = ZoneInfo(tz)
@@ -65,22 +100,7 @@ def _parse_datetime_hint(text: str, *, tz: str) -> datetime | None:
 
 
 def _is_noise_line(line: str) -> bool:
-    lower = line.casefold()
-    return any(
-        marker in lower
-        for marker in [
-            "summe",
-            "gesamt",
-            "total",
-            "mwst",
-            "ust",
-            "steuern",
-            "bar",
-            "karte",
-            "ec",
-            "visa",
-        ]
-    )
+    return _NOISE.search(line.casefold()) is not None
 
 
 def _parse_line(line: str) -> ParsedLine:
@@ -91,7 +111,7 @@ def _parse_line(line: str) -> ParsedLine:
     price = _parse_price(m.group("price"))
     name_part = line[: m.start("price")].strip()
 
-    qty_m = re.search(r"\b(?P<qty>\d+(?:[\.,]\d+)?)\s*[x\*]\s*$", name_part)
+    qty_m = _QTY.search(name_part)
     if qty_m:
         qty = _parse_number(qty_m.group("qty"))
         name_part = name_part[: qty_m.start()].strip()
@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from collections.abc import Iterable
+from datetime import datetime
+from pathlib import Path
+
+from .models import CanonicalReceipt
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS receipts (
+    receipt_id TEXT PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    merchant_id TEXT,
+    merchant_name TEXT,
+    merchant_key TEXT,
+    datetime TEXT NOT NULL,
+    date TEXT NOT NULL,
+    month TEXT NOT NULL,
+    currency TEXT,
+    total REAL,
+    item_count INTEGER NOT NULL,
+    source_type TEXT,
+    ingest_event_id TEXT
+);
+CREATE INDEX IF NOT EXISTS receipts_date ON receipts (date);
+CREATE INDEX IF NOT EXISTS receipts_merchant_date ON receipts (merchant_key, date);
+
+-- date/month/merchant_key are denormalized so the rollup triggers never need a join.
+CREATE TABLE IF NOT EXISTS line_items (
+    line_id TEXT PRIMARY KEY,
+    receipt_id TEXT NOT NULL REFERENCES receipts (receipt_id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name_raw TEXT NOT NULL,
+    name_norm TEXT,
+    category TEXT,
+    rule_id TEXT,
+    quantity REAL,
+    unit_price REAL,
+    total REAL,
+    date TEXT NOT NULL,
+    month TEXT NOT NULL,
+    merchant_key TEXT
+);
+CREATE INDEX IF NOT EXISTS line_items_receipt ON line_items (receipt_id);
+
+-- Per day/merchant/category rollup kept in sync by triggers: category statistics scan this instead
+-- of every line item.
+CREATE TABLE IF NOT EXISTS category_daily (
+    date TEXT NOT NULL,
+    month TEXT NOT NULL,
+    merchant_key TEXT NOT NULL,
+    category TEXT NOT NULL,
+    items INTEGER NOT NULL,
+    total REAL NOT NULL,
+    PRIMARY KEY (date, merchant_key, category)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS category_daily_merchant ON category_daily (merchant_key, date);
+
+CREATE TRIGGER IF NOT EXISTS line_items_rollup_insert AFTER INSERT ON line_items BEGIN
+    INSERT INTO category_daily (date, month, merchant_key, category, items, total)
+    VALUES (
+        NEW.date, NEW.month, COALESCE(NEW.merchant_key, ''), COALESCE(NEW.category, 'other'), 1,
+        COALESCE(NEW.total, 0)
+    )
+    ON CONFLICT (date, merchant_key, category) DO UPDATE
+    SET items = items + 1, total = total + excluded.total;
+END;
+
+CREATE TRIGGER IF NOT EXISTS line_items_rollup_delete AFTER DELETE ON line_items BEGIN
+    UPDATE category_daily
+    SET items = items - 1, total = total - COALESCE(OLD.total, 0)
+    WHERE date = OLD.date
+      AND merchant_key = COALESCE(OLD.merchant_key, '')
+      AND category = COALESCE(OLD.category, 'other');
+    DELETE FROM category_daily
+    WHERE date = OLD.date
+      AND merchant_key = COALESCE(OLD.merchant_key, '')
+      AND category = COALESCE(OLD.category, 'other')
+      AND items <= 0;
+END;
+"""
+
+
+def _merchant_key(value: str | None) -> str | None:
+    return value.casefold().strip() if value else None
+
+
+class ReceiptIndex:
+    # SQLite index next to the canonical JSON tree. The JSON files stay the source of truth; the index
+    # is updated on every persist and can be rebuilt from data/canonical/receipts/ at any time.
+    def __init__(self, db_path: Path, *, root: Path) -> None:
+        self.db_path = db_path
+        self.root = root
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30.0)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(_SCHEMA)
+            self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM receipts").fetchone()[0])
+
+    def upsert(self, receipt: CanonicalReceipt, path: Path) -> None:
+        with self._lock, self._conn:
+            self._upsert(receipt, path)
+
+    def upsert_many(self, items: Iterable[tuple[CanonicalReceipt, Path]]) -> int:
+        # One transaction for the whole batch; used for backfills.
+        count = 0
+        with self._lock, self._conn:
+            for receipt, path in items:
+                self._upsert(receipt, path)
+                count += 1
+        return count
+
+    def remove(self, path: Path) -> None:
+        with self._lock, self._conn:
+            self._delete("path = ?", (self._rel(path),))
+
+    def rebuild(self, canonical_dir: Path) -> int:
+        count = 0
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM line_items")
+            self._conn.execute("DELETE FROM receipts")
+            self._conn.execute("DELETE FROM category_daily")
+            for path in sorted((canonical_dir / "receipts").rglob("*.json")):
+                try:
+                    receipt = CanonicalReceipt.model_validate_json(path.read_text(encoding="utf-8"))
+                except ValueError:
+                    continue
+                self._upsert(receipt, path)
+                count += 1
+        return count
+
+    def query_receipts(
+        self,
+        *,
+        merchant: str | None = None,
+        date_from: str | None = None,
+        date_to: str | None = None,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> list[dict]:
+        where, params = self._filters(merchant=merchant, date_from=date_from, date_to=date_to)
+        sql = (
+            "SELECT receipt_id, path, merchant_id, merchant_name, datetime, currency, total, item_count, "
+            f"source_type, ingest_event_id FROM receipts {where} ORDER BY datetime DESC, receipt_id "
+            "LIMIT ? OFFSET ?"
+        )
+        with self._lock:
+            rows = self._conn.execute(sql, (*params, limit, offset)).fetchall()
+        return [dict(row) for row in rows]
+
+    def category_stats(
+        self,
+        *,
+        merchant: str | None = None,
+        date_from: str | None = None,
+        date_to: str | None = None,
+        by_month: bool = True,
+    ) -> list[dict]:
+        where, params = self._filters(merchant=merchant, date_from=date_from, date_to=date_to)
+        group = "month, category" if by_month else "category"
+        select = "month, " if by_month else ""
+        sql = (
+            f"SELECT {select}category, SUM(items) AS items, ROUND(SUM(total), 2) AS total "
+            f"FROM category_daily {where} GROUP BY {group} ORDER BY {group}"
+        )
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def _filters(
+        self, *, merchant: str | None, date_from: str | None, date_to: str | None
+    ) -> tuple[str, tuple]:
+        clauses: list[str] = []
+        params: list[object] = []
+        if merchant:
+            clauses.append("merchant_key = ?")
+            params.append(_merchant_key(merchant))
+        if date_from:
+            clauses.append("date >= ?")
+            params.append(date_from[:10])
+        if date_to:
+            clauses.append("date <= ?")
+            params.append(date_to[:10])
+        return ("WHERE " + " AND ".join(clauses)) if clauses else "", tuple(params)
+
+    def _upsert(self, receipt: CanonicalReceipt, path: Path) -> None:
+        info = receipt.receipt
+        dt = datetime.fromisoformat(info.datetime)
+        date = dt.date().isoformat()
+        month = date[:7]
+        rel = self._rel(path)
+        # Merchant filter matches the rule id when known, otherwise the printed name.
+        merchant_key = _merchant_key(info.merchant.id or info.merchant.name)
+
+        self._delete("receipt_id = ? OR path = ?", (info.id, rel))
+        self._conn.execute(
+            "INSERT INTO receipts (receipt_id, path, merchant_id, merchant_name, merchant_key, datetime, date, "
+            "month, currency, total, item_count, source_type, ingest_event_id) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                info.id,
+                rel,
+                info.merchant.id,
+                info.merchant.name,
+                merchant_key,
+                info.datetime,
+                date,
+                month,
+                info.currency,
+                receipt.totals.total,
+                len(receipt.line_items),
+                receipt.provenance.source_type,
+                receipt.provenance.ingest_event_id,
+            ),
+        )
+        self._conn.executemany(
+            "INSERT INTO line_items (line_id, receipt_id, position, name_raw, name_norm, category, rule_id, "
+            "quantity, unit_price, total, date, month, merchant_key) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    li.line_id,
+                    info.id,
+                    position,
+                    li.name_raw,
+                    li.name_norm,
+                    li.category,
+                    li.classification.rule_id if li.classification else None,
+                    li.quantity,
+                    li.unit_price,
+                    li.total,
+                    date,
+                    month,
+                    merchant_key,
+                )
+                for position, li in enumerate(receipt.line_items)
+            ],
+        )
+
+    def _delete(self, where: str, params: tuple) -> None:
+        # Line items first and explicitly, so the rollup triggers see every removed row.
+        self._conn.execute(
+            f"DELETE FROM line_items WHERE receipt_id IN (SELECT receipt_id FROM receipts WHERE {where})",
+            params,
+        )
+        self._conn.execute(f"DELETE FROM receipts WHERE {where}", params)
+
+    def _rel(self, path: Path) -> str:
+        try:
+            return path.relative_to(self.root).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+
+def open_receipt_index(canonical_dir: Path, *, root: Path) -> ReceiptIndex:
+    db_path = canonical_dir / "index.sqlite3"
+    fresh = not db_path.exists()
+    index = ReceiptIndex(db_path, root=root)
+    if fresh:
+        index.rebuild(canonical_dir)
+    return index
+
+
+def receipt_index_enabled_from_env() -> bool:
+    value = os.getenv("DATENERFASSUNG_RECEIPT_INDEX", "1").strip().casefold()
+    return value not in {"", "0", "off", "false", "no"}
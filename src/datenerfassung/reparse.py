@@ -0,0 +1,346 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from collections import Counter, deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .dedup import DuplicateIndex, receipt_fingerprint
+from .engine import ReceiptEngine
+from .event_store import EVENT_LOG_DIR, EVENTS_DIR, EventLog
+from .models import CanonicalReceipt
+from .receipt.parser_de_v1 import PARSER_VERSION
+from .rules.loader import RuleSet
+from .storage import canonical_receipt_path, write_json_atomic
+
+if TYPE_CHECKING:
+    from .receipt_index import ReceiptIndex
+
+STATE_FILE = "reparse/state.tsv"
+DEFAULT_CHUNK_EVENTS = 512
+REPARSE_SOURCE_TYPES = ("text", "image")
+
+
+def content_hash(text: str, *, parser_version: str, rules_hash: str) -> str:
+    digest = hashlib.sha256()
+    for part in (parser_version, rules_hash, text):
+        digest.update(part.encode("utf-8") + b"\0")
+    return digest.hexdigest()[:32]
+
+
+@dataclass(frozen=True, slots=True)
+class _Job:
+    ingest_event_id: str
+    # Per-file events are read by the worker; events from the event log travel with the job.
+    event_path: str | None
+    # Canonical path (relative to root) and content hash from the last run, if any.
+    canonical_rel: str | None = None
+    last_hash: str | None = None
+    event: dict | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class _Outcome:
+    ingest_event_id: str
+    status: str  # changed | unchanged | up_to_date | skipped | failed
+    content_hash: str | None = None
+    canonical_rel: str | None = None
+    previous_rel: str | None = None
+    previous_fingerprint: str | None = None
+    error: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class ReparseResult:
+    parser_version: str
+    rules_hash: str
+    events_scanned: int
+    changed: int
+    unchanged: int
+    up_to_date: int
+    skipped: int
+    failed: list[str] = field(default_factory=list)
+
+
+class _Reparser:
+    # Per-process worker state. Canonical files are rewritten here; the index updates and the state
+    # file are left to the coordinating process.
+    def __init__(self, root: Path, canonical_dir: Path, engine: ReceiptEngine) -> None:
+        self.root = root
+        self.canonical_dir = canonical_dir
+        self.engine = engine
+        self.rules_hash = engine.ruleset.hash
+
+    def run(self, jobs: list[_Job]) -> list[_Outcome]:
+        out = []
+        for job in jobs:
+            try:
+                out.append(self._reparse(job))
+            except (OSError, ValueError, KeyError, TypeError) as exc:
+                out.append(_Outcome(job.ingest_event_id, "failed", error=f"{type(exc).__name__}: {exc}"))
+        return out
+
+    def _reparse(self, job: _Job) -> _Outcome:
+        event = job.event
+        if event is None:
+            if job.event_path is None:
+                raise ValueError("job carries neither an event nor an event path")
+            event = json.loads(Path(job.event_path).read_text(encoding="utf-8"))
+        source_type = event.get("source_type")
+        canonical_rel = job.canonical_rel or event.get("canonical_receipt_path")
+        # Only events that produced their own canonical receipt from text are regenerated.
+        if (
+            source_type not in REPARSE_SOURCE_TYPES
+            or not event.get("raw_text_path")
+            or not canonical_rel
+            or event.get("duplicate_of")
+        ):
+            return _Outcome(job.ingest_event_id, "skipped")
+        old_path = self._resolve(canonical_rel)
+        if not old_path.exists():
+            return _Outcome(job.ingest_event_id, "skipped")
+
+        text = self._resolve(event["raw_text_path"]).read_text(encoding="utf-8")
+        digest = content_hash(text, parser_version=PARSER_VERSION, rules_hash=self.rules_hash)
+        if digest == job.last_hash:
+            return _Outcome(job.ingest_event_id, "up_to_date", digest, canonical_rel)
+
+        old = json.loads(old_path.read_text(encoding="utf-8"))
+        new = self.engine.parse_text(text, source_type=source_type, ingest_event_id=job.ingest_event_id)
+        data = _carry_over(old, new.model_dump(mode="json"))
+        if _comparable(data) == _comparable(old):
+            return _Outcome(job.ingest_event_id, "unchanged", digest, canonical_rel)
+
+        previous_fingerprint = receipt_fingerprint(CanonicalReceipt.model_validate(old))
+        new_path = canonical_receipt_path(self.canonical_dir, CanonicalReceipt.model_validate(data))
+        write_json_atomic(new_path, data)
+        if new_path != old_path:
+            old_path.unlink(missing_ok=True)
+        return _Outcome(
+            job.ingest_event_id,
+            "changed",
+            digest,
+            self._rel(new_path),
+            previous_rel=canonical_rel,
+            previous_fingerprint=previous_fingerprint,
+        )
+
+    def _resolve(self, rel: str) -> Path:
+        path = Path(rel)
+        return path if path.is_absolute() else self.root / path
+
+    def _rel(self, path: Path) -> str:
+        try:
+            return path.relative_to(self.root).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+
+def _carry_over(old: dict, new: dict) -> dict:
+    # Keep identities stable across versions: the receipt id, line ids of lines that still read the
+    # same at the same position, and what only the original ingest knew (OCR engine, and the ingest
+    # time that stands in for the datetime when the text has no date).
+    new["receipt"]["id"] = old["receipt"]["id"]
+    if new["receipt"].get("datetime_source") == "ingest":
+        new["receipt"]["datetime"] = old["receipt"].get("datetime")
+        new["receipt"]["datetime_source"] = old["receipt"].get("datetime_source", "ingest")
+    old_items = old.get("line_items") or []
+    for position, item in enumerate(new["line_items"]):
+        if position < len(old_items) and old_items[position].get("name_raw") == item["name_raw"]:
+            item["line_id"] = old_items[position]["line_id"]
+    new["provenance"]["ocr_engine"] = (old.get("provenance") or {}).get("ocr_engine")
+    return new
+
+
+def _comparable(receipt: dict) -> dict:
+    provenance = {
+        k: v
+        for k, v in (receipt.get("provenance") or {}).items()
+        if k not in {"created_at", "parser_version", "rules_version", "rules_hash"}
+    }
+    return {**receipt, "provenance": provenance}
+
+
+# Set once per worker process by _init_worker, like the parse pool in parallel.py.
+_worker: _Reparser | None = None
+
+
+def _init_worker(root: str, canonical_dir: str, rules_dir: str, rules_hash: str, tz: str) -> None:
+    global _worker
+    ruleset = RuleSet.load_from_dir(Path(rules_dir))
+    if ruleset.hash != rules_hash:
+        raise RuntimeError(f"Rules in {rules_dir} changed during the run ({rules_hash} -> {ruleset.hash}).")
+    _worker = _Reparser(Path(root), Path(canonical_dir), ReceiptEngine(ruleset, tz=tz))
+
+
+def _run_chunk(jobs: list[_Job]) -> list[_Outcome]:
+    if _worker is None:
+        raise RuntimeError("Worker process was not initialized.")
+    return _worker.run(jobs)
+
+
+def reparse_events(
+    root: Path,
+    raw_dir: Path,
+    canonical_dir: Path,
+    engine: ReceiptEngine,
+    *,
+    rules_dir: Path,
+    workers: int = 1,
+    chunk_events: int = DEFAULT_CHUNK_EVENTS,
+    restart: bool = False,
+    index: ReceiptIndex | None = None,
+    duplicates: DuplicateIndex | None = None,
+) -> ReparseResult:
+    # Regenerates canonical receipts from data/raw/ocr_text via their ingest events with the current
+    # parser and rules. canonical/reparse/state.tsv records (event, content hash, canonical path)
+    # after every chunk; events whose hash of (raw text, parser version, rules hash) is unchanged are
+    # skipped without parsing, which also makes an interrupted run resume where it stopped.
+    # restart=True re-parses everything but keeps the recorded canonical paths.
+    state_path = canonical_dir / STATE_FILE
+    state = _read_state(state_path)
+    if restart:
+        state = {event_id: ("", rel) for event_id, (_, rel) in state.items()}
+
+    counts: Counter = Counter()
+    failed: list[str] = []
+    jobs = _iter_jobs(raw_dir, state)
+    for outcomes in _chunk_results(root, canonical_dir, engine, rules_dir, _chunks(jobs, chunk_events), workers):
+        lines = []
+        for outcome in outcomes:
+            counts[outcome.status] += 1
+            if outcome.status == "failed":
+                failed.append(f"{outcome.ingest_event_id}: {outcome.error}")
+                continue
+            if outcome.status == "changed":
+                _reindex(root, outcome, index=index, duplicates=duplicates)
+            if outcome.status in {"changed", "unchanged"}:
+                lines.append(f"{outcome.ingest_event_id}\t{outcome.content_hash}\t{outcome.canonical_rel}\n")
+        _append_state(state_path, lines)
+
+    return ReparseResult(
+        parser_version=PARSER_VERSION,
+        rules_hash=engine.ruleset.hash,
+        events_scanned=sum(counts.values()),
+        changed=counts["changed"],
+        unchanged=counts["unchanged"],
+        up_to_date=counts["up_to_date"],
+        skipped=counts["skipped"],
+        failed=failed,
+    )
+
+
+def _reindex(
+    root: Path, outcome: _Outcome, *, index: ReceiptIndex | None, duplicates: DuplicateIndex | None
+) -> None:
+    if (index is None and duplicates is None) or outcome.canonical_rel is None:
+        return
+    path = root / outcome.canonical_rel
+    receipt = CanonicalReceipt.model_validate_json(path.read_text(encoding="utf-8"))
+    if index is not None:
+        if outcome.previous_rel and outcome.previous_rel != outcome.canonical_rel:
+            index.remove(root / outcome.previous_rel)
+        index.upsert(receipt, path)
+    if duplicates is not None:
+        fingerprint = receipt_fingerprint(receipt)
+        if outcome.previous_fingerprint and outcome.previous_fingerprint != fingerprint and outcome.previous_rel:
+            # The old content no longer exists; a new ingest of it must not be linked to this receipt.
+            duplicates.forget(outcome.previous_fingerprint, root / outcome.previous_rel)
+        if fingerprint is not None:
+            duplicates.record(fingerprint, path)
+
+
+def _iter_jobs(raw_dir: Path, state: dict[str, tuple[str, str]]) -> Iterator[_Job]:
+    # Events from the event log first (append order; the latest record of an id wins), then per-file
+    # events that were not migrated into it.
+    seen: set[str] = set()
+    log_dir = raw_dir / EVENT_LOG_DIR
+    if log_dir.exists():
+        latest: dict[str, dict] = {}
+        with EventLog(log_dir, readonly=True) as log:
+            for _, event in log.replay():
+                latest[str(event["ingest_event_id"])] = event
+        for ingest_event_id, event in latest.items():
+            seen.add(ingest_event_id)
+            last_hash, canonical_rel = state.get(ingest_event_id, (None, None))
+            yield _Job(
+                ingest_event_id, None, canonical_rel=canonical_rel, last_hash=last_hash or None, event=event
+            )
+
+    events_dir = raw_dir / EVENTS_DIR
+    if not events_dir.exists():
+        return
+    # Names only (no stat per entry) and sorted, so runs visit events in a stable order.
+    names = sorted(entry.name for entry in os.scandir(events_dir) if entry.name.endswith(".json"))
+    for name in names:
+        ingest_event_id = name[: -len(".json")]
+        if ingest_event_id in seen:
+            continue
+        last_hash, canonical_rel = state.get(ingest_event_id, (None, None))
+        yield _Job(ingest_event_id, str(events_dir / name), canonical_rel=canonical_rel, last_hash=last_hash or None)
+
+
+def _chunk_results(
+    root: Path,
+    canonical_dir: Path,
+    engine: ReceiptEngine,
+    rules_dir: Path,
+    chunks: Iterator[list[_Job]],
+    workers: int,
+) -> Iterator[list[_Outcome]]:
+    if workers <= 1:
+        local = _Reparser(root, canonical_dir, engine)
+        for chunk in chunks:
+            yield local.run(chunk)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(str(root), str(canonical_dir), str(rules_dir), engine.ruleset.hash, engine.tz),
+    ) as executor:
+        # Results are consumed in submission order so the state file only ever records a prefix of
+        # finished chunks; at most workers * 2 chunks are in flight.
+        pending: deque[Future[list[_Outcome]]] = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_run_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _chunks(jobs: Iterable[_Job], size: int) -> Iterator[list[_Job]]:
+    chunk: list[_Job] = []
+    for job in jobs:
+        chunk.append(job)
+        if len(chunk) >= max(1, size):
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _read_state(path: Path) -> dict[str, tuple[str, str]]:
+    state: dict[str, tuple[str, str]] = {}
+    if not path.exists():
+        return state
+    with path.open(encoding="utf-8") as fh:
+        for line in fh:
+            parts = line.rstrip("\n").split("\t")
+            if len(parts) == 3:
+                # Later lines win.
+                state[parts[0]] = (parts[1], parts[2])
+    return state
+
+
+def _append_state(path: Path, lines: list[str]) -> None:
+    if lines:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a", encoding="utf-8") as fh:
+            fh.write("".join(lines))
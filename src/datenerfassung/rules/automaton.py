@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterable, Iterator
+
+
+# Aho-Corasick automaton: finds all occurrences of many patterns in a single pass over the text.
+class AhoCorasick:
+    __slots__ = ("_fail", "_goto", "_out", "patterns")
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self.patterns: list[str] = []
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[tuple[int, ...]] = [()]
+
+        seen: dict[str, int] = {}
+        for pattern in patterns:
+            if not pattern or pattern in seen:
+                continue
+            seen[pattern] = len(self.patterns)
+            self.patterns.append(pattern)
+            self._insert(pattern, seen[pattern])
+        self._build_failure_links()
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def _insert(self, pattern: str, pattern_id: int) -> None:
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = nxt
+        self._out[state] = (*self._out[state], pattern_id)
+
+    def _build_failure_links(self) -> None:
+        queue: deque[int] = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(ch, 0)
+                if self._out[self._fail[nxt]]:
+                    self._out[nxt] = (*self._out[nxt], *self._out[self._fail[nxt]])
+
+    def iter_matches(self, text: str) -> Iterator[tuple[int, int]]:
+        # Yields (start, pattern_id) for every occurrence, ordered by end offset.
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        patterns = self.patterns
+        state = 0
+        for end, ch in enumerate(text, start=1):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                for pattern_id in out[state]:
+                    yield end - len(patterns[pattern_id]), pattern_id
+
+    def matched_ids(self, text: str) -> set[int]:
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        found: set[int] = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
@@ -1,20 +1,55 @@
 from __future__ import annotations
 
 import re
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
 
-from .loader import CategoriesRules, CategoryRule
+from .automaton import AhoCorasick
 
+if TYPE_CHECKING:
+    from ..profiling import RequestProfile
+    from .loader import CategoriesRules, CategoryRule
 
-def categorize(name_clean: str, tokens: list[str], rules: CategoriesRules) -> tuple[str, str | None, float | None, list[str]]:
+
+CategoryResult = tuple[str, str | None, float | None, list[str]]
+
+
+def categorize(
+    name_clean: str, tokens: list[str], rules: CategoriesRules, *, profile: RequestProfile | None = None
+) -> tuple[str, str | None, float | None, list[str]]:
+    if profile is not None:
+        return _categorize_profiled(name_clean, tokens, rules, profile)
+    if rules.compiled is not None:
+        return rules.compiled.categorize(name_clean, tokens)
     for rule in rules.rules:
         if _matches(rule, name_clean, tokens):
-            category = str(rule.then.get("category") or "other")
-            confidence = rule.then.get("confidence")
-            tags_add = list(rule.then.get("tags_add") or [])
-            return category, rule.id, float(confidence) if confidence is not None else None, tags_add
+            return _rule_result(rule)
+    return "other", None, None, []
+
+
+def _categorize_profiled(
+    name_clean: str, tokens: list[str], rules: CategoriesRules, profile: RequestProfile
+) -> CategoryResult:
+    # Same result as categorize(), with the time charged to the rules that were evaluated.
+    if rules.compiled is not None:
+        return rules.compiled.categorize_profiled(name_clean, tokens, profile)
+    for rule in rules.rules:
+        started = time.perf_counter()
+        matched = _matches(rule, name_clean, tokens)
+        profile.add_rule(rule.id, time.perf_counter() - started, matched=matched)
+        if matched:
+            return _rule_result(rule)
     return "other", None, None, []
 
 
+def _rule_result(rule: CategoryRule) -> CategoryResult:
+    category = str(rule.then.get("category") or "other")
+    confidence = rule.then.get("confidence")
+    tags_add = list(rule.then.get("tags_add") or [])
+    return category, rule.id, float(confidence) if confidence is not None else None, tags_add
+
+
 def _matches(rule: CategoryRule, name_clean: str, tokens: list[str]) -> bool:
     for condition in rule.when_any:
         if "regex" in condition and _matches_regex(str(condition["regex"]), name_clean):
@@ -38,3 +73,98 @@ def _matches_contains_any(values: list[str], name_clean: str, tokens: list[str])
             return True
     return False
 
+
+@dataclass(frozen=True, slots=True)
+class CompiledCategories:
+    # Rules are addressed by their position in the priority-sorted list; the first match wins,
+    # so every index only needs to remember the smallest rule position per key.
+    rules: tuple[CategoryRule, ...]
+    results: tuple[CategoryResult, ...]
+    token_index: dict[str, int]
+    substrings: AhoCorasick
+    substring_rule: tuple[int, ...]
+    regexes: tuple[tuple[int, re.Pattern[str]], ...]
+
+    def categorize(self, name_clean: str, tokens: list[str]) -> CategoryResult:
+        best = len(self.rules)
+
+        token_index = self.token_index
+        for token in tokens:
+            idx = token_index.get(token)
+            if idx is not None and idx < best:
+                best = idx
+
+        if best and self.substring_rule:
+            substring_rule = self.substring_rule
+            for pattern_id in self.substrings.matched_ids(name_clean):
+                best = min(best, substring_rule[pattern_id])
+
+        for idx, regex in self.regexes:
+            if idx >= best:
+                break
+            if regex.search(name_clean) is not None:
+                best = idx
+                break
+
+        if best == len(self.rules):
+            return "other", None, None, []
+        category, rule_id, confidence, tags_add = self.results[best]
+        return category, rule_id, confidence, list(tags_add)
+
+    def categorize_profiled(self, name_clean: str, tokens: list[str], profile: RequestProfile) -> CategoryResult:
+        # Mirrors categorize(). Token and substring lookups cover all rules at once and are recorded
+        # as stages; regexes run per rule, so each evaluation is charged to its rule id.
+        started = time.perf_counter()
+        best = len(self.rules)
+        for token in tokens:
+            idx = self.token_index.get(token)
+            if idx is not None and idx < best:
+                best = idx
+        if best and self.substring_rule:
+            for pattern_id in self.substrings.matched_ids(name_clean):
+                best = min(best, self.substring_rule[pattern_id])
+        profile.add_stage("parse.categorize.index", time.perf_counter() - started)
+
+        for idx, regex in self.regexes:
+            if idx >= best:
+                break
+            started = time.perf_counter()
+            matched = regex.search(name_clean) is not None
+            profile.add_rule(self.rules[idx].id, time.perf_counter() - started, matched=matched)
+            if matched:
+                best = idx
+                break
+
+        if best == len(self.rules):
+            return "other", None, None, []
+        category, rule_id, confidence, tags_add = self.results[best]
+        return category, rule_id, confidence, list(tags_add)
+
+
+def compile_categories(rules: list[CategoryRule]) -> CompiledCategories:
+    token_index: dict[str, int] = {}
+    substring_min: dict[str, int] = {}
+    regexes: list[tuple[int, re.Pattern[str]]] = []
+
+    for idx, rule in enumerate(rules):
+        for condition in rule.when_any:
+            if "regex" in condition:
+                regexes.append((idx, re.compile(str(condition["regex"]))))
+            if "contains_any" in condition:
+                for value in list(condition["contains_any"]):
+                    v = str(value)
+                    token_index.setdefault(v, idx)
+                    if v:
+                        substring_min.setdefault(v, idx)
+
+    regexes.sort(key=lambda item: item[0])
+
+    substrings = AhoCorasick(substring_min)
+    return CompiledCategories(
+        rules=tuple(rules),
+        results=tuple(_rule_result(rule) for rule in rules),
+        token_index=token_index,
+        substrings=substrings,
+        substring_rule=tuple(substring_min[p] for p in substrings.patterns),
+        regexes=tuple(regexes),
+    )
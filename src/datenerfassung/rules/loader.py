@@ -1,15 +1,23 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import hashlib
+from dataclasses import dataclass, field
 from pathlib import Path
 
 import yaml
 
+from .categorization import CompiledCategories, compile_categories
+from .merchants import MerchantIndex
+from .normalization import CompiledNormalization, compile_normalization
+
+RULE_FILES = ("normalization.yml", "merchants.yml", "categories.yml")
+
 
 @dataclass(frozen=True, slots=True)
 class NormalizationRules:
     stopwords: set[str]
     synonyms: dict[str, str]
+    compiled: CompiledNormalization | None = field(default=None, compare=False, repr=False)
 
 
 @dataclass(frozen=True, slots=True)
@@ -21,6 +29,7 @@ class Merchant:
 @dataclass(frozen=True, slots=True)
 class MerchantsRules:
     merchants: list[Merchant]
+    compiled: MerchantIndex | None = field(default=None, compare=False, repr=False)
 
 
 @dataclass(frozen=True, slots=True)
@@ -34,6 +43,7 @@ class CategoryRule:
 @dataclass(frozen=True, slots=True)
 class CategoriesRules:
     rules: list[CategoryRule]
+    compiled: CompiledCategories | None = field(default=None, compare=False, repr=False)
 
 
 @dataclass(frozen=True, slots=True)
@@ -41,24 +51,30 @@ class RuleSet:
     normalization: NormalizationRules
     merchants: MerchantsRules
     categories: CategoriesRules
+    # `version` keys of the three files and a content hash over them, recorded in Provenance.
+    version: str = ""
+    hash: str = ""
 
     @classmethod
     def load_from_dir(cls, rules_dir: Path) -> "RuleSet":
-        normalization = _load_yaml(rules_dir / "normalization.yml")
-        merchants = _load_yaml(rules_dir / "merchants.yml")
-        categories = _load_yaml(rules_dir / "categories.yml")
+        sources = {name: _read_rule_file(rules_dir / name) for name in RULE_FILES}
+        normalization = _parse_yaml(rules_dir / "normalization.yml", sources["normalization.yml"])
+        merchants = _parse_yaml(rules_dir / "merchants.yml", sources["merchants.yml"])
+        categories = _parse_yaml(rules_dir / "categories.yml", sources["categories.yml"])
 
+        stopwords = set((normalization or {}).get("stopwords") or [])
+        synonyms = dict((normalization or {}).get("synonyms") or {})
         normalization_rules = NormalizationRules(
-            stopwords=set((normalization or {}).get("stopwords") or []),
-            synonyms=dict((normalization or {}).get("synonyms") or {}),
+            stopwords=stopwords,
+            synonyms=synonyms,
+            compiled=compile_normalization(NormalizationRules(stopwords=stopwords, synonyms=synonyms)),
         )
 
-        merchants_rules = MerchantsRules(
-            merchants=[
-                Merchant(id=str(m["id"]), names=[str(n) for n in (m.get("names") or [])])
-                for m in ((merchants or {}).get("merchants") or [])
-            ]
-        )
+        merchant_list = [
+            Merchant(id=str(m["id"]), names=[str(n) for n in (m.get("names") or [])])
+            for m in ((merchants or {}).get("merchants") or [])
+        ]
+        merchants_rules = MerchantsRules(merchants=merchant_list, compiled=MerchantIndex(merchant_list))
 
         category_rules = []
         for rule in ((categories or {}).get("rules") or []):
@@ -72,19 +88,50 @@ class RuleSet:
             )
         category_rules.sort(key=lambda r: r.priority, reverse=True)
 
-        categories_rules = CategoriesRules(rules=category_rules)
+        categories_rules = CategoriesRules(
+            rules=category_rules, compiled=compile_categories(category_rules)
+        )
 
         return cls(
             normalization=normalization_rules,
             merchants=merchants_rules,
             categories=categories_rules,
+            version=",".join(
+                f"{name.removesuffix('.yml')}={(data or {}).get('version', '')}"
+                for name, data in zip(RULE_FILES, (normalization, merchants, categories))
+            ),
+            hash=rules_hash(sources),
         )
 
 
-def _load_yaml(path: Path) -> dict | None:
+def rules_hash(sources: dict[str, bytes]) -> str:
+    digest = hashlib.sha256()
+    for name in sorted(sources):
+        digest.update(name.encode("utf-8") + b"\0" + sources[name] + b"\0")
+    return digest.hexdigest()[:16]
+
+
+def rules_stamp(rules_dir: Path) -> tuple:
+    # Cheap change check for polling: (mtime_ns, size) per rule file, None for a missing file.
+    stamp: list[tuple[int, int] | None] = []
+    for name in RULE_FILES:
+        try:
+            stat = (rules_dir / name).stat()
+        except FileNotFoundError:
+            stamp.append(None)
+        else:
+            stamp.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(stamp)
+
+
+def _read_rule_file(path: Path) -> bytes:
     if not path.exists():
         raise FileNotFoundError(str(path))
-    data = yaml.safe_load(path.read_text(encoding="utf-8"))
+    return path.read_bytes()
+
+
+def _parse_yaml(path: Path, source: bytes) -> dict | None:
+    data = yaml.safe_load(source.decode("utf-8"))
     if data is None:
         return None
     if not isinstance(data, dict):
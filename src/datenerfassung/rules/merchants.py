@@ -1,14 +1,83 @@
 from __future__ import annotations
 
-from .loader import Merchant, MerchantsRules
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from .automaton import AhoCorasick
 from .normalization import clean_text
 
+if TYPE_CHECKING:
+    from .loader import Merchant, MerchantsRules
+
+
+@dataclass(frozen=True, slots=True)
+class MerchantMatch:
+    merchant: Merchant
+    name: str
+    # Offset of the match in the cleaned text (clean_text output), not in the raw input.
+    start: int
+
 
 def detect_merchant(text: str, rules: MerchantsRules) -> Merchant | None:
-    haystack = clean_text(text)
+    match = match_merchant(clean_text(text), rules)
+    return match.merchant if match else None
+
+
+def match_merchant(haystack: str, rules: MerchantsRules) -> MerchantMatch | None:
+    # `haystack` must already be cleaned; callers that cleaned the text anyway can skip a second pass.
+    if rules.compiled is not None:
+        return rules.compiled.match(haystack)
     for merchant in rules.merchants:
         for name in merchant.names:
-            if clean_text(name) and clean_text(name) in haystack:
-                return merchant
+            needle = clean_text(name)
+            if not needle:
+                continue
+            start = haystack.find(needle)
+            if start >= 0:
+                return MerchantMatch(merchant=merchant, name=needle, start=start)
     return None
 
+
+class MerchantIndex:
+    # All cleaned merchant names in one automaton. Ties are resolved like the linear scan: the
+    # merchant listed first in merchants.yml wins, regardless of where in the text it occurs.
+    __slots__ = ("_names", "_owner", "merchants")
+
+    def __init__(self, merchants: list[Merchant]) -> None:
+        self.merchants = list(merchants)
+        owner: dict[str, int] = {}
+        for idx, merchant in enumerate(self.merchants):
+            for name in merchant.names:
+                needle = clean_text(name)
+                if needle:
+                    owner.setdefault(needle, idx)
+        self._names = AhoCorasick(owner)
+        self._owner = tuple(owner[p] for p in self._names.patterns)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def match(self, haystack: str) -> MerchantMatch | None:
+        best: tuple[int, int, int] | None = None
+        for start, pattern_id in self._names.iter_matches(haystack):
+            candidate = (self._owner[pattern_id], start, pattern_id)
+            if best is None or candidate < best:
+                best = candidate
+        if best is None:
+            return None
+        merchant_idx, start, pattern_id = best
+        return MerchantMatch(
+            merchant=self.merchants[merchant_idx], name=self._names.patterns[pattern_id], start=start
+        )
+
+    def match_all(self, haystack: str) -> list[MerchantMatch]:
+        matches = [
+            MerchantMatch(
+                merchant=self.merchants[self._owner[pattern_id]],
+                name=self._names.patterns[pattern_id],
+                start=start,
+            )
+            for start, pattern_id in self._names.iter_matches(haystack)
+        ]
+        matches.sort(key=lambda m: m.start)
+        return matches
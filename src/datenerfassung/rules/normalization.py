@@ -1,22 +1,56 @@
 from __future__ import annotations
 
+import heapq
 import re
 import unicodedata
+from functools import lru_cache
+from typing import TYPE_CHECKING
 
-from .loader import NormalizationRules
+if TYPE_CHECKING:
+    from .loader import NormalizationRules
 
 
 _NON_ALNUM = re.compile(r"[^0-9a-zA-Z]+")
 _WS = re.compile(r"\s+")
 
+NORMALIZE_CACHE_SIZE = 8192
+# Item names and rule keys are short and repeat a lot; whole receipt texts are not worth caching.
+CLEAN_CACHE_SIZE = 16384
+CLEAN_CACHE_MAX_LEN = 64
+
 
 def clean_text(value: str) -> str:
-    value = value.casefold()
-    value = unicodedata.normalize("NFKD", value)
-    value = "".join(ch for ch in value if not unicodedata.combining(ch))
-    value = _NON_ALNUM.sub(" ", value)
-    value = _WS.sub(" ", value).strip()
-    return value
+    # casefold -> NFKD -> drop combining marks -> non-alphanumerics to single spaces.
+    if len(value) <= CLEAN_CACHE_MAX_LEN:
+        return _clean_text_cached(value)
+    return _clean_text(value)
+
+
+def _clean_text(value: str) -> str:
+    if value.isascii():
+        # casefold is lower() on ASCII and NFKD/combining marks are no-ops.
+        return _NON_ALNUM.sub(" ", value.lower()).strip()
+    # Every step before the final substitution works character by character, so the per-character
+    # result can be looked up in a table; its output is [0-9a-zA-Z ] only.
+    return " ".join(value.translate(_FOLD_TABLE).split())
+
+
+_clean_text_cached = lru_cache(maxsize=CLEAN_CACHE_SIZE)(_clean_text)
+
+
+class _FoldTable(dict):
+    # str.translate table filled on first use of a character: casefold, NFKD and combining-mark
+    # removal of that character, with anything but ASCII letters/digits turned into a space (the
+    # final substitution treats all separators alike). Grows with the distinct characters seen.
+    def __missing__(self, char: int) -> str:
+        value = unicodedata.normalize("NFKD", chr(char).casefold())
+        value = "".join(ch for ch in value if not unicodedata.combining(ch))
+        folded = _NON_ALNUM.sub(" ", value)
+        self[char] = folded
+        return folded
+
+
+_FOLD_TABLE = _FoldTable()
 
 
 def tokenize(clean_value: str) -> list[str]:
@@ -26,6 +60,9 @@ def tokenize(clean_value: str) -> list[str]:
 
 
 def normalize_name(name_raw: str, rules: NormalizationRules) -> tuple[str, list[str], str]:
+    if rules.compiled is not None:
+        return rules.compiled.normalize(name_raw)
+
     name_clean = clean_text(name_raw)
     name_clean = _apply_synonyms(name_clean, rules)
     tokens = tokenize(name_clean)
@@ -51,3 +88,79 @@ def _apply_synonyms(name_clean: str, rules: NormalizationRules) -> str:
         out = re.sub(pattern, value, out)
     out = _WS.sub(" ", out).strip()
     return out
+
+
+class SynonymRewriter:
+    # Applies synonyms in file order, exactly like _apply_synonyms, but only visits entries whose
+    # first key token is present. Cleaned keys only ever match whole tokens, so a synonym can only
+    # fire if its first token is in the input or was introduced by an earlier replacement.
+    __slots__ = ("_by_first_token", "_entries")
+
+    def __init__(self, synonyms: dict[str, str]) -> None:
+        self._entries: list[tuple[re.Pattern[str], str, tuple[str, ...]]] = []
+        self._by_first_token: dict[str, list[int]] = {}
+        for raw_key, raw_value in synonyms.items():
+            key = clean_text(str(raw_key))
+            value = clean_text(str(raw_value))
+            if not key or not value:
+                continue
+            key_parts = [p for p in key.split(" ") if p]
+            if not key_parts:
+                continue
+            sep = r"\s+"
+            pattern = re.compile(rf"\b{sep.join(re.escape(p) for p in key_parts)}\b")
+            self._by_first_token.setdefault(key_parts[0], []).append(len(self._entries))
+            self._entries.append((pattern, value, tuple(tokenize(value))))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def rewrite(self, name_clean: str) -> str:
+        by_first_token = self._by_first_token
+        pending = [idx for token in set(name_clean.split()) for idx in by_first_token.get(token, ())]
+        if not pending:
+            return _WS.sub(" ", name_clean).strip()
+
+        heapq.heapify(pending)
+        out = name_clean
+        last = -1
+        while pending:
+            idx = heapq.heappop(pending)
+            if idx <= last:
+                continue
+            last = idx
+            pattern, value, value_tokens = self._entries[idx]
+            replaced = pattern.sub(value, out)
+            if replaced == out:
+                continue
+            out = replaced
+            for token in value_tokens:
+                for follow in by_first_token.get(token, ()):
+                    if follow > idx:
+                        heapq.heappush(pending, follow)
+        return _WS.sub(" ", out).strip()
+
+
+class CompiledNormalization:
+    __slots__ = ("_cached", "rewriter", "stopwords")
+
+    def __init__(self, rules: NormalizationRules, *, cache_size: int = NORMALIZE_CACHE_SIZE) -> None:
+        self.stopwords = frozenset(rules.stopwords)
+        self.rewriter = SynonymRewriter(rules.synonyms)
+        self._cached = lru_cache(maxsize=cache_size)(self._normalize)
+
+    def normalize(self, name_raw: str) -> tuple[str, list[str], str]:
+        name_clean, tokens, name_norm = self._cached(name_raw)
+        return name_clean, list(tokens), name_norm
+
+    def cache_info(self):
+        return self._cached.cache_info()
+
+    def _normalize(self, name_raw: str) -> tuple[str, tuple[str, ...], str]:
+        name_clean = self.rewriter.rewrite(clean_text(name_raw))
+        tokens = tuple(t for t in tokenize(name_clean) if t not in self.stopwords)
+        return name_clean, tokens, "_".join(tokens)
+
+
+def compile_normalization(rules: NormalizationRules) -> CompiledNormalization:
+    return CompiledNormalization(rules)
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .loader import RuleSet, rules_stamp
+
+if TYPE_CHECKING:
+    from ..engine import ReceiptEngine
+
+DEFAULT_POLL_INTERVAL_S = 2.0
+
+
+@dataclass(frozen=True, slots=True)
+class ReloadResult:
+    status: str  # "reloaded" | "unchanged" | "failed"
+    version: str
+    hash: str
+    previous_hash: str | None = None
+    error: str | None = None
+    duration_ms: float = 0.0
+
+
+class RuleReloader:
+    # Reloads the rule files into a running ReceiptEngine. The new RuleSet (YAML + compiled indexes)
+    # is built completely on the calling thread and only then swapped in with one assignment, so
+    # requests in flight finish on the rules they started with. Broken rule files leave the current
+    # rules in place. Triggered by mtime polling (start/stop) or explicitly via reload().
+    def __init__(
+        self,
+        engine: ReceiptEngine,
+        rules_dir: Path,
+        *,
+        poll_interval_s: float = DEFAULT_POLL_INTERVAL_S,
+        on_reload: Callable[[RuleSet, RuleSet], None] | None = None,
+    ) -> None:
+        self.engine = engine
+        self.rules_dir = rules_dir
+        self.poll_interval_s = poll_interval_s
+        self.on_reload = on_reload
+        self.loaded_at = datetime.now(UTC).isoformat()
+        self.last_result: ReloadResult | None = None
+        self._stamp = rules_stamp(rules_dir)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def status(self) -> dict:
+        ruleset = self.engine.ruleset
+        last = self.last_result
+        return {
+            "version": ruleset.version,
+            "hash": ruleset.hash,
+            "loaded_at": self.loaded_at,
+            "last_error": last.error if last is not None else None,
+        }
+
+    def reload(self, *, force: bool = False) -> ReloadResult:
+        with self._lock:
+            started = time.perf_counter()
+            current = self.engine.ruleset
+            # Taken before reading so an edit during the load is picked up by the next poll.
+            stamp = rules_stamp(self.rules_dir)
+            try:
+                ruleset = RuleSet.load_from_dir(self.rules_dir)
+            except Exception as exc:  # noqa: BLE001 - a broken rules edit must not take the service down
+                self._stamp = stamp
+                result = ReloadResult(
+                    status="failed",
+                    version=current.version,
+                    hash=current.hash,
+                    error=f"{type(exc).__name__}: {exc}",
+                    duration_ms=_ms(started),
+                )
+                self.last_result = result
+                return result
+
+            self._stamp = stamp
+            if ruleset.hash == current.hash and not force:
+                result = ReloadResult(
+                    status="unchanged", version=current.version, hash=current.hash, duration_ms=_ms(started)
+                )
+            else:
+                self.engine.swap_ruleset(ruleset)
+                self.loaded_at = datetime.now(UTC).isoformat()
+                result = ReloadResult(
+                    status="reloaded",
+                    version=ruleset.version,
+                    hash=ruleset.hash,
+                    previous_hash=current.hash,
+                    duration_ms=_ms(started),
+                )
+                if self.on_reload is not None:
+                    self.on_reload(current, ruleset)
+            self.last_result = result
+            return result
+
+    def check(self) -> ReloadResult | None:
+        # One polling step: reloads only when a rule file's mtime or size changed.
+        if rules_stamp(self.rules_dir) == self._stamp:
+            return None
+        return self.reload()
+
+    def start(self) -> None:
+        if self._thread is not None or self.poll_interval_s <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._poll, name="rules-reload", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _poll(self) -> None:
+        while not self._stop.wait(self.poll_interval_s):
+            try:
+                self.check()
+            except OSError:
+                # Rules dir temporarily unreadable (e.g. mid-deploy); try again next interval.
+                continue
+
+
+def rules_poll_interval_from_env() -> float:
+    # DATENERFASSUNG_RULES_POLL_S: seconds between mtime checks; 0 disables polling.
+    return float(os.getenv("DATENERFASSUNG_RULES_POLL_S", str(DEFAULT_POLL_INTERVAL_S)))
+
+
+def _ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
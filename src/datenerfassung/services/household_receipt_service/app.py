@@ -1,13 +1,24 @@
 from __future__ import annotations
 
-from fastapi import FastAPI
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import asdict
+from pathlib import Path
+from typing import Annotated
+
+from fastapi import Depends, FastAPI, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel, Field
 
-from ...models import CanonicalReceipt
-from ...project_paths import ProjectPaths
-from ...rules.loader import RuleSet
+from ...app_context import AppContext, get_app_context
+from ...dedup import PersistOutcome
 from ...engine import ReceiptEngine
-from ...storage import persist_canonical_receipt
+from ...metrics import CONTENT_TYPE, REGISTRY, count_result, stage_timer
+from ...models import CanonicalReceipt
+from ...receipt_index import ReceiptIndex
+from ...recategorize import recategorize_receipts
+from ...storage import close_storage, persist_canonical_receipt
 
 
 class ParseTextRequest(BaseModel):
@@ -17,32 +28,173 @@ class ParseTextRequest(BaseModel):
 
 
 class ReceiptIngestResponse(BaseModel):
-    canonical_receipt_path: str
-    receipt: CanonicalReceipt
+    status: str = "ok"
+    canonical_receipt_path: str | None = None
+    receipt: CanonicalReceipt | None = None
+    duplicate_of: str | None = None
+
+
+class ReceiptSummary(BaseModel):
+    receipt_id: str
+    path: str
+    merchant_id: str | None = None
+    merchant_name: str | None = None
+    datetime: str
+    currency: str | None = None
+    total: float | None = None
+    item_count: int
+    source_type: str | None = None
+    ingest_event_id: str | None = None
+
+
+class CategoryStat(BaseModel):
+    month: str | None = None
+    category: str
+    items: int
+    total: float
+
 
+def get_context() -> AppContext:
+    return get_app_context()
 
-app = FastAPI(title="Datenerfassung Household Receipt Service", version="0.1.0")
-paths = ProjectPaths.detect()
-ruleset = RuleSet.load_from_dir(paths.rules_dir)
-engine = ReceiptEngine(ruleset)
+
+def get_receipt_engine() -> ReceiptEngine:
+    return get_context().receipt_engine
+
+
+def get_receipt_index() -> ReceiptIndex:
+    receipt_index = get_context().receipt_index
+    if receipt_index is None:
+        raise HTTPException(status_code=404, detail="Receipt index is disabled (DATENERFASSUNG_RECEIPT_INDEX).")
+    return receipt_index
+
+
+ContextDep = Annotated[AppContext, Depends(get_context)]
+ReceiptEngineDep = Annotated[ReceiptEngine, Depends(get_receipt_engine)]
+ReceiptIndexDep = Annotated[ReceiptIndex, Depends(get_receipt_index)]
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    context = get_context()
+    # Rules, duplicate index and query index are built here instead of on the first request.
+    with context.timed("startup"):
+        await run_in_threadpool(context.preload)
+    context.rule_reloader.start()
+    try:
+        yield
+    finally:
+        context.rule_reloader.stop()
+        await run_in_threadpool(close_storage)
+
+
+app = FastAPI(title="Datenerfassung Household Receipt Service", version="0.1.0", lifespan=lifespan)
 
 
 @app.get("/healthz")
-def healthz() -> dict:
-    return {"status": "ok"}
+def healthz(context: ContextDep) -> dict:
+    return {"status": "ok", "timings_ms": context.timings}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    if not REGISTRY.enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled (DATENERFASSUNG_METRICS=0).")
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+@app.get("/admin/rules")
+def rules_status(context: ContextDep) -> dict:
+    return context.rule_reloader.status()
+
+
+@app.post("/admin/rules/reload")
+def reload_rules(context: ContextDep, force: bool = False) -> dict:
+    result = context.rule_reloader.reload(force=force)
+    if result.status == "failed":
+        raise HTTPException(status_code=422, detail=f"Rules not reloaded: {result.error}")
+    return asdict(result)
+
+
+@app.post("/admin/recategorize")
+def recategorize(
+    context: ContextDep,
+    workers: int = Query(default=1, ge=1),
+    resume: bool = True,
+) -> dict:
+    # Runs to completion in this request; an interrupted run resumes from its checkpoint.
+    result = recategorize_receipts(
+        context.paths.canonical_dir,
+        context.ruleset,
+        rules_dir=context.paths.rules_dir,
+        workers=workers,
+        resume=resume,
+        index=context.receipt_index,
+    )
+    return asdict(result)
 
 
 @app.post("/receipts/parse_text", response_model=CanonicalReceipt)
-def parse_text(req: ParseTextRequest) -> CanonicalReceipt:
-    return engine.parse_text(req.text, source_type=req.source_type, ingest_event_id=req.ingest_event_id)
+def parse_text(req: ParseTextRequest, engine: ReceiptEngineDep) -> CanonicalReceipt:
+    with stage_timer("parse"):
+        return engine.parse_text(req.text, source_type=req.source_type, ingest_event_id=req.ingest_event_id)
 
 
 @app.post("/receipts/ingest_text", response_model=ReceiptIngestResponse)
-def ingest_text(req: ParseTextRequest) -> ReceiptIngestResponse:
-    receipt = engine.parse_text(req.text, source_type=req.source_type, ingest_event_id=req.ingest_event_id)
-    canonical_path = persist_canonical_receipt(paths.canonical_dir, receipt)
+def ingest_text(req: ParseTextRequest, context: ContextDep) -> ReceiptIngestResponse:
+    with stage_timer("parse"):
+        receipt = context.receipt_engine.parse_text(
+            req.text, source_type=req.source_type, ingest_event_id=req.ingest_event_id
+        )
+    canonical_dir = context.paths.canonical_dir
+    with stage_timer("persist"):
+        if context.duplicates is not None and context.duplicate_policy is not None:
+            outcome = context.duplicates.persist(
+                canonical_dir, receipt, policy=context.duplicate_policy, index=context.receipt_index
+            )
+        else:
+            path = persist_canonical_receipt(canonical_dir, receipt, index=context.receipt_index)
+            outcome = PersistOutcome(path=path, status="ok")
+    count_result(req.source_type, outcome.status)
+    return ReceiptIngestResponse(
+        status=outcome.status,
+        canonical_receipt_path=_rel(outcome.path, context.paths.root) if outcome.path else None,
+        receipt=receipt if outcome.status == "ok" else None,
+        duplicate_of=_rel(outcome.duplicate_of, context.paths.root) if outcome.duplicate_of else None,
+    )
+
+
+@app.get("/receipts", response_model=list[ReceiptSummary])
+def list_receipts(
+    receipt_index: ReceiptIndexDep,
+    merchant: str | None = None,
+    date_from: str | None = Query(default=None, alias="from"),
+    date_to: str | None = Query(default=None, alias="to"),
+    limit: int = Query(default=100, ge=1, le=1000),
+    offset: int = Query(default=0, ge=0),
+) -> list[ReceiptSummary]:
+    rows = receipt_index.query_receipts(
+        merchant=merchant, date_from=date_from, date_to=date_to, limit=limit, offset=offset
+    )
+    return [ReceiptSummary(**row) for row in rows]
+
+
+@app.get("/stats/categories", response_model=list[CategoryStat])
+def category_stats(
+    receipt_index: ReceiptIndexDep,
+    merchant: str | None = None,
+    date_from: str | None = Query(default=None, alias="from"),
+    date_to: str | None = Query(default=None, alias="to"),
+    by_month: bool = True,
+) -> list[CategoryStat]:
+    rows = receipt_index.category_stats(
+        merchant=merchant, date_from=date_from, date_to=date_to, by_month=by_month
+    )
+    return [CategoryStat(**row) for row in rows]
+
+
+def _rel(path: Path, root: Path) -> str:
     try:
-        rel = canonical_path.relative_to(paths.root).as_posix()
+        return path.relative_to(root).as_posix()
     except Exception:
-        rel = canonical_path.as_posix()
-    return ReceiptIngestResponse(canonical_receipt_path=rel, receipt=receipt)
+        return path.as_posix()
@@ -1,10 +1,27 @@
 from __future__ import annotations
 
-from fastapi import FastAPI, File, Form, UploadFile
+import json
+import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import asdict
+from functools import lru_cache
+from typing import Annotated, Any
+
+from fastapi import Depends, FastAPI, File, Form, Header, HTTPException, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel, Field
 
-from ...engine import IngestEngine
-from ...models import IngestResult
+from ...app_context import AppContext, get_app_context
+from ...metrics import CONTENT_TYPE, REGISTRY, counter_family, gauge_family
+from ...models import BatchIngestResult, IngestResult
+from ...ocr.paddleocr_backend import PaddleOcrConfig
+from ...ocr.pool import OcrWorkerPool
+from ...profiling import PROFILE_HEADER
+from ...storage import StreamTooLargeError, close_storage, get_storage
+from .async_orchestrator import AsyncIngestOrchestrator
+from .jobs import ImageJobQueue, IngestJob, QueueFullError
 from .orchestrator import IngestOrchestrator
 
 
@@ -18,36 +35,283 @@ class IngestReceiptJsonRequest(BaseModel):
     source_name: str | None = None
 
 
-app = FastAPI(title="Datenerfassung Ingest Service", version="0.1.0")
-engine = IngestEngine()
-orchestrator = IngestOrchestrator.detect()
+class IngestBatchRequest(BaseModel):
+    # Items stay untyped here (even non-objects) so one malformed entry is reported per item instead
+    # of failing the batch.
+    items: list[Any]
+    source_name: str | None = None
+
+
+# Everything below is built on first use (normally by the lifespan), from one shared AppContext, so
+# importing this module stays cheap and the rules are parsed once per process. PaddleOCR itself is
+# only imported when OCR runs or INGEST_OCR_WARMUP asks for it.
+def get_context() -> AppContext:
+    return get_app_context()
+
+
+@lru_cache(maxsize=1)
+def get_ocr_pool() -> OcrWorkerPool | None:
+    processes = int(os.getenv("INGEST_OCR_PROCESSES", "0"))
+    if processes <= 0:
+        return None
+    return OcrWorkerPool(
+        workers=processes,
+        config=PaddleOcrConfig(lang="german", use_angle_cls=True),
+        batch_size=int(os.getenv("INGEST_OCR_BATCH_SIZE", "4")),
+    )
+
+
+@lru_cache(maxsize=1)
+def get_orchestrator() -> IngestOrchestrator:
+    return IngestOrchestrator.from_context(get_context(), ocr_pool=get_ocr_pool())
+
+
+@lru_cache(maxsize=1)
+def get_async_orchestrator() -> AsyncIngestOrchestrator | None:
+    # INGEST_ASYNC=1 serves /ingest/text and synchronous /ingest/image on the event loop (async
+    # routing, I/O and OCR/parsing in executors) instead of one threadpool thread per request.
+    if os.getenv("INGEST_ASYNC", "0") in {"0", "false", "False"}:
+        return None
+    return AsyncIngestOrchestrator(get_orchestrator(), io_workers=int(os.getenv("INGEST_IO_WORKERS", "8")))
+
+
+@lru_cache(maxsize=1)
+def get_job_queue() -> ImageJobQueue:
+    return ImageJobQueue(
+        get_orchestrator(),
+        workers=int(os.getenv("INGEST_OCR_WORKERS", "1")),
+        max_pending=int(os.getenv("INGEST_QUEUE_MAX_PENDING", "32")),
+    )
+
+
+ContextDep = Annotated[AppContext, Depends(get_context)]
+OrchestratorDep = Annotated[IngestOrchestrator, Depends(get_orchestrator)]
+AsyncOrchestratorDep = Annotated[AsyncIngestOrchestrator | None, Depends(get_async_orchestrator)]
+JobQueueDep = Annotated[ImageJobQueue, Depends(get_job_queue)]
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    context = get_context()
+    with context.timed("startup"):
+        orchestrator = await run_in_threadpool(get_orchestrator)
+        async_orchestrator = get_async_orchestrator()
+        warm = os.getenv("INGEST_OCR_WARMUP", "0") not in {"0", "false", "False"}
+        ocr_pool = get_ocr_pool()
+        if ocr_pool is not None:
+            with context.timed("ocr_pool_start"):
+                await run_in_threadpool(ocr_pool.start, warm_up=warm)
+        elif warm:
+            await run_in_threadpool(context.preload_ocr)
+        job_queue = get_job_queue()
+        job_queue.start()
+        context.rule_reloader.start()
+        REGISTRY.register_collector("ingest", _collector(orchestrator, job_queue, ocr_pool))
+    try:
+        yield
+    finally:
+        REGISTRY.unregister_collector("ingest")
+        context.rule_reloader.stop()
+        job_queue.stop()
+        if ocr_pool is not None:
+            ocr_pool.close()
+        if async_orchestrator is not None:
+            await async_orchestrator.aclose()
+        orchestrator.close()
+        # Writes still queued by a write-behind backend land before the process exits.
+        await run_in_threadpool(close_storage)
+
+
+def _collector(orchestrator: IngestOrchestrator, job_queue: ImageJobQueue, ocr_pool: OcrWorkerPool | None):
+    # Queue depths and OCR cache stats are read from their owners at scrape time only.
+    def collect():
+        yield gauge_family("datenerfassung_ingest_jobs_pending", "Queued or running image jobs.", job_queue.pending)
+        if ocr_pool is not None:
+            yield gauge_family(
+                "datenerfassung_ocr_pool_queue_depth", "Images waiting for an OCR worker.", ocr_pool.queue_depth()
+            )
+        cache = orchestrator.ocr_cache
+        if cache is not None:
+            stats = cache.stats()
+            yield gauge_family("datenerfassung_ocr_cache_entries", "Entries in the OCR text cache.", stats.entries)
+            yield counter_family("datenerfassung_ocr_cache_hits", "OCR cache hits.", stats.hits)
+            yield counter_family("datenerfassung_ocr_cache_misses", "OCR cache misses.", stats.misses)
+            yield gauge_family("datenerfassung_ocr_cache_hit_ratio", "OCR cache hits per lookup.", stats.hit_rate)
+        storage = get_storage()
+        yield gauge_family("datenerfassung_storage_pending_writes", "Files queued but not yet written.", storage.pending())
+        yield counter_family(
+            "datenerfassung_storage_failed_writes", "Write-behind files that could not be written.", storage.failed_writes
+        )
+
+    return collect
+
+
+app = FastAPI(title="Datenerfassung Ingest Service", version="0.1.0", lifespan=lifespan)
 
 
 @app.get("/healthz")
-def healthz() -> dict:
-    return {"status": "ok"}
+def healthz(context: ContextDep) -> dict:
+    return {"status": "ok", "timings_ms": context.timings}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    if not REGISTRY.enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled (DATENERFASSUNG_METRICS=0).")
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+@app.get("/admin/rules")
+def rules_status(context: ContextDep) -> dict:
+    return context.rule_reloader.status()
+
+
+@app.post("/admin/rules/reload")
+def reload_rules(context: ContextDep, force: bool = False) -> dict:
+    result = context.rule_reloader.reload(force=force)
+    if result.status == "failed":
+        raise HTTPException(status_code=422, detail=f"Rules not reloaded: {result.error}")
+    return asdict(result)
 
 
 @app.post("/ingest/text", response_model=IngestResult)
-def ingest_text(req: IngestTextRequest) -> IngestResult:
-    return orchestrator.ingest_text(req.text, source_name=req.source_name)
+async def ingest_text(
+    req: IngestTextRequest,
+    orchestrator: OrchestratorDep,
+    async_orchestrator: AsyncOrchestratorDep,
+    profile_header: str | None = Header(None, alias=PROFILE_HEADER),
+) -> IngestResult:
+    profile = _profile_requested(profile_header)
+    if async_orchestrator is not None:
+        return await async_orchestrator.ingest_text(req.text, source_name=req.source_name, profile=profile)
+    return await run_in_threadpool(
+        orchestrator.ingest_text, req.text, source_name=req.source_name, profile=profile
+    )
 
 
 @app.post("/ingest/receipt_json", response_model=IngestResult)
-def ingest_receipt_json(req: IngestReceiptJsonRequest) -> IngestResult:
-    return engine.ingest_receipt_json(req.receipt, source_name=req.source_name)
+def ingest_receipt_json(req: IngestReceiptJsonRequest, orchestrator: OrchestratorDep) -> IngestResult:
+    return orchestrator.ingest_receipt_json(req.receipt, source_name=req.source_name)
 
 
 @app.post("/ingest/image", response_model=IngestResult)
 async def ingest_image(
+    orchestrator: OrchestratorDep,
+    async_orchestrator: AsyncOrchestratorDep,
+    job_queue: JobQueueDep,
     image: UploadFile = File(...),
     ocr_text: str | None = Form(None),
     source_name: str | None = Form(None),
+    mode: str | None = Form(None),
+    profile_header: str | None = Header(None, alias=PROFILE_HEADER),
 ) -> IngestResult:
-    content = await image.read()
-    return orchestrator.ingest_image(
-        content,
-        filename=image.filename,
-        ocr_text=ocr_text,
-        source_name=source_name,
+    # The upload is never read into memory: its spool is copied to data/raw/images/ in chunks
+    # (INGEST_UPLOAD_CHUNK_KB) and OCR reads the stored file. Queued jobs are only profiled by
+    # sampling; the header applies to synchronous ingests.
+    max_bytes = orchestrator.uploads.max_bytes
+    if max_bytes and image.size is not None and image.size > max_bytes:
+        raise _upload_too_large(max_bytes)
+    if (mode or os.getenv("INGEST_IMAGE_MODE", "sync")) == "queue":
+        if job_queue.is_full():
+            raise _queue_full(job_queue.max_pending)
+        try:
+            job = await run_in_threadpool(
+                job_queue.submit,
+                image.file,
+                filename=image.filename,
+                ocr_text=ocr_text,
+                source_name=source_name,
+            )
+        except QueueFullError:
+            raise _queue_full(job_queue.max_pending) from None
+        except StreamTooLargeError:
+            raise _upload_too_large(max_bytes) from None
+        return IngestResult(
+            ingest_event_id=job.ingest_event_id,
+            status="queued",
+            raw_image_path=job.raw_image_path,
+            ingest_event_path=orchestrator._rel(orchestrator.events.event_path(job.ingest_event_id)),
+        )
+
+    profile = _profile_requested(profile_header)
+    try:
+        if async_orchestrator is not None:
+            return await async_orchestrator.ingest_upload(
+                image.file, filename=image.filename, ocr_text=ocr_text, source_name=source_name, profile=profile
+            )
+        return await run_in_threadpool(
+            orchestrator.ingest_upload,
+            image.file,
+            filename=image.filename,
+            ocr_text=ocr_text,
+            source_name=source_name,
+            profile=profile,
+        )
+    except StreamTooLargeError:
+        raise _upload_too_large(max_bytes) from None
+
+
+@app.get("/ingest/jobs/{ingest_event_id}", response_model=IngestJob)
+def get_ingest_job(ingest_event_id: str, job_queue: JobQueueDep) -> IngestJob:
+    job = job_queue.get(ingest_event_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown ingest job: {ingest_event_id}")
+    return job
+
+
+def _profile_requested(value: str | None) -> bool | None:
+    # Header absent: leave it to sampling. "0"/"false" opts a request out of sampling.
+    if value is None:
+        return None
+    return value.strip() not in {"0", "false", "False", ""}
+
+
+def _upload_too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"Image upload exceeds {max_bytes} bytes (INGEST_MAX_UPLOAD_MB).",
+    )
+
+
+def _queue_full(max_pending: int) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail=f"Ingest queue is full ({max_pending} pending jobs), retry later.",
+        headers={"Retry-After": "5"},
     )
+
+
+@app.post("/ingest/batch", response_model=BatchIngestResult)
+async def ingest_batch(request: Request, orchestrator: OrchestratorDep) -> BatchIngestResult:
+    body = await request.body()
+    req = _parse_batch_body(body, content_type=request.headers.get("content-type", ""))
+    return await run_in_threadpool(orchestrator.ingest_many, req.items, source_name=req.source_name)
+
+
+def _parse_batch_body(body: bytes, *, content_type: str) -> IngestBatchRequest:
+    try:
+        text = body.decode("utf-8")
+    except UnicodeDecodeError as exc:
+        raise HTTPException(status_code=400, detail=f"Body is not valid UTF-8: {exc.reason}") from exc
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        items = []
+        for lineno, line in enumerate(text.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except json.JSONDecodeError as exc:
+                raise HTTPException(status_code=400, detail=f"Invalid JSON on line {lineno}: {exc.msg}") from exc
+        data: object = {"items": items}
+    else:
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as exc:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON body: {exc.msg}") from exc
+        if isinstance(data, list):
+            data = {"items": data}
+
+    try:
+        return IngestBatchRequest.model_validate(data)
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
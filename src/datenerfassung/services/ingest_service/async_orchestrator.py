@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import uuid
+from collections.abc import Callable
+from concurrent.futures import Executor, ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, TypeVar
+
+from ...classification.receipt_detector import ReceiptDetection, detect_receipt
+from ...http_client import AsyncPooledHttpClient, CircuitBreaker, HttpRequestError
+from ...metrics import count_route_error, stage_timer
+from ...models import IngestResult
+from ...ocr.paddleocr_backend import OcrNotAvailableError
+from ...profiling import RequestProfile
+from ...storage import write_text
+from .orchestrator import RECEIPT_ROUTE, IngestOrchestrator, RouteOutcome, _now, route_payload
+
+T = TypeVar("T")
+
+
+class AsyncIngestOrchestrator:
+    # Async front of IngestOrchestrator for the event loop: file writes go to a small I/O thread pool,
+    # OCR/detection/parsing to `cpu_executor` (a thread pool, default: the loop's), and routing uses an
+    # asyncio HTTP client, so no request thread is parked on the receipt service. Results and files
+    # are identical to the sync path, which it delegates every step to.
+    def __init__(
+        self,
+        orchestrator: IngestOrchestrator,
+        *,
+        io_workers: int = 8,
+        cpu_executor: Executor | None = None,
+        client: AsyncPooledHttpClient | None = None,
+    ) -> None:
+        self.sync = orchestrator
+        self._io = ThreadPoolExecutor(max_workers=max(1, io_workers), thread_name_prefix="ingest-io")
+        self._cpu = cpu_executor
+        routing = orchestrator.routing
+        if client is None and routing.receipt_service_url:
+            client = AsyncPooledHttpClient(
+                routing.receipt_service_url,
+                timeout_s=routing.timeout_s,
+                max_connections=routing.max_connections,
+                breaker=CircuitBreaker(
+                    failure_threshold=routing.breaker_failures, reset_after_s=routing.breaker_reset_s
+                ),
+            )
+        self.client = client
+
+    async def aclose(self) -> None:
+        if self.client is not None:
+            await self.client.aclose()
+        self._io.shutdown(wait=True)
+
+    async def ingest_text(
+        self, text: str, *, source_name: str | None = None, profile: bool | None = None
+    ) -> IngestResult:
+        ingest_event_id = str(uuid.uuid4())
+        received_at = _now(self.sync.tz).isoformat()
+        request_profile = self.sync._start_profile(ingest_event_id, source_type="text", requested=profile)
+        raw_text_path = self.sync.paths.raw_dir / "ocr_text" / f"{ingest_event_id}.txt"
+
+        detection = await self._run_io(self._stage_text, raw_text_path, text, profile=request_profile)
+        return await self._finish(
+            self.sync._complete_text,
+            text=text,
+            source_type="text",
+            detection=detection,
+            ingest_event_id=ingest_event_id,
+            received_at=received_at,
+            source_name=source_name,
+            raw_text_path=raw_text_path,
+            profile=request_profile,
+        )
+
+    async def ingest_image(
+        self,
+        image_bytes: bytes,
+        *,
+        filename: str | None = None,
+        ocr_text: str | None = None,
+        source_name: str | None = None,
+        profile: bool | None = None,
+    ) -> IngestResult:
+        ingest_event_id, received_at, raw_image_path = await self._run_io(
+            self.sync.store_image, image_bytes, filename=filename
+        )
+        return await self.process_image(
+            raw_image_path,
+            ingest_event_id=ingest_event_id,
+            received_at=received_at,
+            ocr_text=ocr_text,
+            source_name=source_name,
+            profile=profile,
+        )
+
+    async def ingest_upload(
+        self,
+        stream: BinaryIO,
+        *,
+        filename: str | None = None,
+        ocr_text: str | None = None,
+        source_name: str | None = None,
+        profile: bool | None = None,
+    ) -> IngestResult:
+        # The chunked copy (and hashing) of the upload runs in the I/O pool.
+        ingest_event_id, received_at, raw_image_path, image_sha256 = await self._run_io(
+            self.sync.store_upload, stream, filename=filename
+        )
+        return await self.process_image(
+            raw_image_path,
+            ingest_event_id=ingest_event_id,
+            received_at=received_at,
+            ocr_text=ocr_text,
+            source_name=source_name,
+            profile=profile,
+            image_sha256=image_sha256,
+        )
+
+    async def process_image(
+        self,
+        raw_image_path: Path,
+        *,
+        ingest_event_id: str,
+        received_at: str,
+        ocr_text: str | None = None,
+        source_name: str | None = None,
+        profile: bool | None = None,
+        image_sha256: str | None = None,
+    ) -> IngestResult:
+        request_profile = self.sync._start_profile(ingest_event_id, source_type="image", requested=profile)
+        ocr_engine = None
+        if ocr_text is None:
+            try:
+                ocr_text, ocr_engine = await self._ocr(
+                    raw_image_path, image_sha256=image_sha256, profile=request_profile
+                )
+            except (OcrNotAvailableError, RuntimeError) as exc:
+                status = "stored_raw_image" if isinstance(exc, OcrNotAvailableError) else "ocr_failed"
+                return await self._run_io(
+                    self.sync._image_failure,
+                    raw_image_path,
+                    ingest_event_id=ingest_event_id,
+                    received_at=received_at,
+                    source_name=source_name,
+                    status=status,
+                    error=str(exc),
+                    profile=request_profile,
+                )
+
+        raw_text_path = self.sync.paths.raw_dir / "ocr_text" / f"{ingest_event_id}.txt"
+        detection = await self._run_io(self._stage_text, raw_text_path, ocr_text, profile=request_profile)
+        return await self._finish(
+            functools.partial(self.sync._complete_image, raw_image_path),
+            text=ocr_text,
+            source_type="image",
+            detection=detection,
+            ingest_event_id=ingest_event_id,
+            received_at=received_at,
+            source_name=source_name,
+            raw_text_path=raw_text_path,
+            ocr_engine=ocr_engine,
+            profile=request_profile,
+        )
+
+    async def _ocr(
+        self, image_path: Path, *, image_sha256: str | None = None, profile: RequestProfile | None = None
+    ) -> tuple[str, str]:
+        pool = self.sync.ocr_pool
+        if pool is None or self.sync.ocr_cache is not None:
+            # Cache lookups may hash the file, so the whole step runs off the loop.
+            return await self._run_cpu(self.sync._run_ocr, image_path, image_sha256=image_sha256, profile=profile)
+        # Warm worker processes: await the pool's future directly instead of parking a thread on it.
+        with stage_timer("ocr", profile):
+            text = await asyncio.wrap_future(pool.submit(image_path))
+        return text, "paddleocr"
+
+    async def _finish(
+        self,
+        complete: Callable[..., IngestResult],
+        *,
+        text: str,
+        source_type: str,
+        detection: ReceiptDetection,
+        ingest_event_id: str,
+        profile: RequestProfile | None = None,
+        **fields: object,
+    ) -> IngestResult:
+        # Every executor hop costs a thread handoff, so each path takes at most one more: the event
+        # write after remote routing, or local parse + persist + event write together.
+        routed = await self._route_remote(
+            text, ingest_event_id=ingest_event_id, source_type=source_type, detection=detection, profile=profile
+        )
+        if routed is not None:
+            return await self._run_io(
+                complete,
+                ingest_event_id=ingest_event_id,
+                detection=detection,
+                routed=routed,
+                profile=profile,
+                **fields,
+            )
+        return await self._run_cpu(
+            self._route_locally_and_complete,
+            complete,
+            text=text,
+            source_type=source_type,
+            detection=detection,
+            ingest_event_id=ingest_event_id,
+            profile=profile,
+            **fields,
+        )
+
+    async def _route_remote(
+        self,
+        text: str,
+        *,
+        ingest_event_id: str,
+        source_type: str,
+        detection: ReceiptDetection,
+        profile: RequestProfile | None = None,
+    ) -> RouteOutcome | None:
+        # None means "handle locally" (no service configured, or it failed and fallback is allowed).
+        if not detection.is_receipt:
+            return None, None, {"status": "non_receipt"}
+        if self.client is None:
+            return None
+        try:
+            with stage_timer("route", profile):
+                result = await self.client.post_json(
+                    RECEIPT_ROUTE, route_payload(text, source_type=source_type, ingest_event_id=ingest_event_id)
+                )
+            return self.sync._routed(result, routed_to=self.client.base_url)
+        except (HttpRequestError, Exception) as exc:  # noqa: BLE001 - same fallback as the sync path
+            count_route_error()
+            if not self.sync.routing.allow_fallback:
+                return None, None, {"status": "route_failed", "route_error": str(exc)}
+        return None
+
+    def _route_locally_and_complete(
+        self,
+        complete: Callable[..., IngestResult],
+        *,
+        text: str,
+        source_type: str,
+        detection: ReceiptDetection,
+        ingest_event_id: str,
+        profile: RequestProfile | None = None,
+        **fields: object,
+    ) -> IngestResult:
+        routed = self.sync._route_locally(
+            text, ingest_event_id=ingest_event_id, source_type=source_type, profile=profile, detection=detection
+        )
+        return complete(ingest_event_id=ingest_event_id, detection=detection, routed=routed, profile=profile, **fields)
+
+    def _stage_text(self, raw_text_path: Path, text: str, *, profile: RequestProfile | None = None) -> ReceiptDetection:
+        write_text(raw_text_path, text)
+        with stage_timer("detect", profile):
+            return detect_receipt(text, self.sync.receipt_engine.ruleset)
+
+    async def _run_io(self, fn: Callable[..., T], *args: object, **kwargs: object) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._io, functools.partial(fn, *args, **kwargs))
+
+    async def _run_cpu(self, fn: Callable[..., T], *args: object, **kwargs: object) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._cpu, functools.partial(fn, *args, **kwargs))
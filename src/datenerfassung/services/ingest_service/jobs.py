@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import json
+import queue
+import threading
+from pathlib import Path
+from typing import BinaryIO
+
+from pydantic import BaseModel
+
+from ...models import IngestResult
+from ...storage import write_json_atomic
+from .orchestrator import IngestOrchestrator, _now
+
+
+class QueueFullError(RuntimeError):
+    pass
+
+
+class IngestJob(BaseModel):
+    ingest_event_id: str
+    status: str  # queued | running | done | failed
+    received_at: str
+    updated_at: str
+    raw_image_path: str
+    raw_image_sha256: str | None = None
+    filename: str | None = None
+    ocr_text: str | None = None
+    source_name: str | None = None
+    attempts: int = 0
+    result: IngestResult | None = None
+    error: str | None = None
+
+
+class ImageJobQueue:
+    # Background OCR -> detection -> routing for uploaded images. The raw image is stored before a
+    # job is accepted and every state change is persisted under data/raw/jobs/, so queued and
+    # interrupted jobs are picked up again by start() after a restart. max_pending bounds the number
+    # of accepted-but-unfinished jobs; submit() raises QueueFullError beyond that.
+    def __init__(
+        self,
+        orchestrator: IngestOrchestrator,
+        *,
+        workers: int = 1,
+        max_pending: int = 32,
+        jobs_dir: Path | None = None,
+    ) -> None:
+        self.orchestrator = orchestrator
+        self.workers = max(1, workers)
+        self.max_pending = max(1, max_pending)
+        self.jobs_dir = jobs_dir or orchestrator.paths.raw_dir / "jobs"
+        self._queue: queue.Queue[str | None] = queue.Queue()
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._threads: list[threading.Thread] = []
+        self._stopping = threading.Event()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def is_full(self) -> bool:
+        return self._pending >= self.max_pending
+
+    def start(self) -> int:
+        if self._threads:
+            return 0
+        self._stopping.clear()
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        # Unfinished jobs are all on disk: start from an empty queue (dropping sentinels and ids a
+        # previous stop() left behind) and let _recover() queue and count them again.
+        with self._lock:
+            self._queue = queue.Queue()
+            self._pending = 0
+        recovered = self._recover()
+        for idx in range(self.workers):
+            thread = threading.Thread(
+                target=self._worker, args=(self._queue,), name=f"ingest-job-{idx}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        return recovered
+
+    def stop(self, *, wait: bool = True) -> None:
+        # Jobs still queued stay persisted as "queued" and are recovered by the next start().
+        self._stopping.set()
+        for _ in self._threads:
+            self._queue.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        self._threads = []
+
+    def submit(
+        self,
+        image: bytes | BinaryIO,
+        *,
+        filename: str | None = None,
+        ocr_text: str | None = None,
+        source_name: str | None = None,
+    ) -> IngestJob:
+        # image: the bytes, or a file object that is copied in chunks (see store_upload).
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise QueueFullError(f"Ingest queue is full ({self.max_pending} pending jobs).")
+            self._pending += 1
+
+        try:
+            image_sha256 = None
+            if isinstance(image, bytes):
+                ingest_event_id, received_at, raw_image_path = self.orchestrator.store_image(
+                    image, filename=filename
+                )
+            else:
+                ingest_event_id, received_at, raw_image_path, image_sha256 = self.orchestrator.store_upload(
+                    image, filename=filename
+                )
+            job = IngestJob(
+                ingest_event_id=ingest_event_id,
+                status="queued",
+                received_at=received_at,
+                updated_at=received_at,
+                raw_image_path=self.orchestrator._rel(raw_image_path),
+                raw_image_sha256=image_sha256,
+                filename=filename,
+                ocr_text=ocr_text,
+                source_name=source_name,
+            )
+            self._save(job)
+        except Exception:
+            self._release()
+            raise
+
+        self._queue.put(job.ingest_event_id)
+        return job
+
+    def get(self, ingest_event_id: str) -> IngestJob | None:
+        path = self._job_path(ingest_event_id)
+        if not path.exists():
+            return None
+        return IngestJob.model_validate(json.loads(path.read_text(encoding="utf-8")))
+
+    def _recover(self) -> int:
+        recovered = 0
+        for path in sorted(self.jobs_dir.glob("*.json")):
+            try:
+                job = IngestJob.model_validate(json.loads(path.read_text(encoding="utf-8")))
+            except ValueError:
+                continue
+            if job.status not in {"queued", "running"}:
+                continue
+            if job.status == "running":
+                self._save(job.model_copy(update={"status": "queued", "updated_at": self._now()}))
+            with self._lock:
+                self._pending += 1
+            self._queue.put(job.ingest_event_id)
+            recovered += 1
+        return recovered
+
+    def _worker(self, jobs: queue.Queue[str | None]) -> None:
+        while True:
+            ingest_event_id = jobs.get()
+            if ingest_event_id is None or self._stopping.is_set():
+                return
+            try:
+                self._run(ingest_event_id)
+            finally:
+                self._release()
+
+    def _run(self, ingest_event_id: str) -> None:
+        job = self.get(ingest_event_id)
+        if job is None or job.status not in {"queued", "running"}:
+            return
+
+        job = job.model_copy(
+            update={"status": "running", "attempts": job.attempts + 1, "updated_at": self._now()}
+        )
+        self._save(job)
+        try:
+            result = self.orchestrator.process_image(
+                self.orchestrator._abs_from_rel(job.raw_image_path),
+                ingest_event_id=job.ingest_event_id,
+                received_at=job.received_at,
+                ocr_text=job.ocr_text,
+                source_name=job.source_name,
+                image_sha256=job.raw_image_sha256,
+            )
+        except Exception as exc:  # noqa: BLE001 - recorded on the job, the worker carries on
+            self._save(job.model_copy(update={"status": "failed", "error": str(exc), "updated_at": self._now()}))
+            return
+        self._save(job.model_copy(update={"status": "done", "result": result, "updated_at": self._now()}))
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def _save(self, job: IngestJob) -> None:
+        write_json_atomic(self._job_path(job.ingest_event_id), job.model_dump(mode="json"))
+
+    def _job_path(self, ingest_event_id: str) -> Path:
+        return self.jobs_dir / f"{Path(ingest_event_id).name}.json"
+
+    def _now(self) -> str:
+        return _now(self.orchestrator.tz).isoformat()
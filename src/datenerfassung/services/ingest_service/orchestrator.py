@@ -2,19 +2,46 @@ from __future__ import annotations
 
 import os
 import uuid
-from dataclasses import dataclass
+from collections.abc import Iterable
+from dataclasses import InitVar, dataclass, field
 from datetime import datetime
 from pathlib import Path
+from typing import BinaryIO
 from zoneinfo import ZoneInfo
 
-from ...classification.receipt_detector import detect_receipt
-from ...engine import ReceiptEngine
-from ...http_client import HttpRequestError, post_json
-from ...models import CanonicalReceipt, IngestResult
+from ...app_context import AppContext
+from ...classification.receipt_detector import ReceiptDetection, detect_receipt
+from ...dedup import DuplicateIndex, DuplicatePolicy, PersistOutcome
+from ...engine import ReceiptEngine, run_batch
+from ...event_store import EventStore, open_event_store
+from ...http_client import CircuitBreaker, HttpRequestError, PooledHttpClient
+from ...metrics import count_result, count_route_error, stage_timer
+from ...models import BatchIngestItem, BatchIngestResult, CanonicalReceipt, IngestResult
+from ...ocr.cache import OcrCache, cache_key, hash_file
 from ...ocr.paddleocr_backend import OcrNotAvailableError, PaddleOcrConfig, ocr_image_path
+from ...ocr.pool import OcrWorkerPool
+from ...profiling import PROFILE_DIR, ProfilingConfig, RequestProfile
 from ...project_paths import ProjectPaths
+from ...receipt.structured_receipt_v1 import StructuredReceiptV1
+from ...receipt_index import ReceiptIndex
 from ...rules.loader import RuleSet
-from ...storage import persist_canonical_receipt, slug, write_json
+from ...storage import (
+    WriteBatch,
+    persist_canonical_receipt,
+    slug,
+    write_bytes_now,
+    write_json,
+    write_stream,
+)
+
+RECEIPT_ROUTE = "/receipts/ingest_text"
+
+# (receipt, canonical path, ingest event fields) of routing one receipt text.
+RouteOutcome = tuple[CanonicalReceipt | None, Path | None, dict]
+
+
+def route_payload(text: str, *, source_type: str, ingest_event_id: str) -> dict:
+    return {"text": text, "source_type": source_type, "ingest_event_id": ingest_event_id}
 
 
 def _now(tz: str = "Europe/Berlin") -> datetime:
@@ -25,40 +52,183 @@ def _now(tz: str = "Europe/Berlin") -> datetime:
     return datetime.now(tz=zone)
 
 
+@dataclass(frozen=True, slots=True)
+class RoutingConfig:
+    receipt_service_url: str = ""
+    allow_fallback: bool = True
+    timeout_s: float = 5.0
+    max_connections: int = 8
+    breaker_failures: int = 5
+    breaker_reset_s: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> RoutingConfig:
+        return cls(
+            receipt_service_url=os.getenv("HOUSEHOLD_RECEIPT_SERVICE_URL", "http://127.0.0.1:8001").rstrip("/"),
+            allow_fallback=os.getenv("INGEST_LOCAL_FALLBACK", "1") not in {"0", "false", "False"},
+            timeout_s=float(os.getenv("RECEIPT_SERVICE_TIMEOUT_S", "5")),
+            max_connections=int(os.getenv("RECEIPT_SERVICE_MAX_CONNECTIONS", "8")),
+            breaker_failures=int(os.getenv("RECEIPT_SERVICE_BREAKER_FAILURES", "5")),
+            breaker_reset_s=float(os.getenv("RECEIPT_SERVICE_BREAKER_RESET_S", "30")),
+        )
+
+    def build_client(self) -> PooledHttpClient | None:
+        if not self.receipt_service_url:
+            return None
+        return PooledHttpClient(
+            self.receipt_service_url,
+            timeout_s=self.timeout_s,
+            max_connections=self.max_connections,
+            breaker=CircuitBreaker(failure_threshold=self.breaker_failures, reset_after_s=self.breaker_reset_s),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class UploadConfig:
+    # Uploads are copied to data/raw/images/ chunk_bytes at a time, so one upload holds at most one
+    # chunk in memory; larger than max_bytes (0: no limit) is rejected.
+    max_bytes: int = 64 * 1024 * 1024
+    chunk_bytes: int = 1024 * 1024
+
+    @classmethod
+    def from_env(cls) -> UploadConfig:
+        return cls(
+            max_bytes=int(float(os.getenv("INGEST_MAX_UPLOAD_MB", "64")) * 1024 * 1024),
+            chunk_bytes=max(4096, int(os.getenv("INGEST_UPLOAD_CHUNK_KB", "1024")) * 1024),
+        )
+
+
 @dataclass(frozen=True, slots=True)
 class IngestOrchestrator:
     paths: ProjectPaths
+    # Rules at construction time; detection and parsing follow receipt_engine.ruleset, which rule
+    # reloads swap in place.
     ruleset: RuleSet
     receipt_engine: ReceiptEngine
     tz: str = "Europe/Berlin"
+    ocr_pool: OcrWorkerPool | None = None
+    ocr_cache: OcrCache | None = None
+    duplicates: DuplicateIndex | None = None
+    duplicate_policy: DuplicatePolicy = "link"
+    receipt_index: ReceiptIndex | None = None
+    # Resolved once from the environment when not given; the client is shared by all requests.
+    routing: RoutingConfig = field(default_factory=RoutingConfig.from_env)
+    receipt_client: PooledHttpClient | None = None
+    profiling: ProfilingConfig | None = None
+    # The event store depends on paths, so it cannot have a default factory: events is the given
+    # event_store, else the per-file events or the segmented event log (DATENERFASSUNG_EVENT_STORE).
+    event_store: InitVar[EventStore | None] = None
+    events: EventStore = field(init=False)
+    uploads: UploadConfig = field(default_factory=UploadConfig.from_env)
+
+    def __post_init__(self, event_store: EventStore | None) -> None:
+        if self.profiling is None:
+            object.__setattr__(self, "profiling", ProfilingConfig.from_env())
+        if event_store is None:
+            event_store = open_event_store(self.paths.raw_dir)
+        object.__setattr__(self, "events", event_store)
+        if self.receipt_client is None:
+            object.__setattr__(self, "receipt_client", self.routing.build_client())
+
+    def close(self) -> None:
+        if self.receipt_client is not None:
+            self.receipt_client.close()
+
+    @classmethod
+    def detect(
+        cls, *, tz: str = "Europe/Berlin", ocr_pool: OcrWorkerPool | None = None
+    ) -> IngestOrchestrator:
+        return cls.from_context(AppContext(tz=tz), ocr_pool=ocr_pool)
 
     @classmethod
-    def detect(cls, *, tz: str = "Europe/Berlin") -> "IngestOrchestrator":
-        paths = ProjectPaths.detect()
-        paths.ensure_dirs()
-        ruleset = RuleSet.load_from_dir(paths.rules_dir)
-        receipt_engine = ReceiptEngine(ruleset, tz=tz)
-        return cls(paths=paths, ruleset=ruleset, receipt_engine=receipt_engine, tz=tz)
-
-    def ingest_text(self, text: str, *, source_name: str | None = None) -> IngestResult:
+    def from_context(cls, context: AppContext, *, ocr_pool: OcrWorkerPool | None = None) -> IngestOrchestrator:
+        paths = context.paths
+        cache_entries = int(os.getenv("INGEST_OCR_CACHE_MAX_ENTRIES", "10000"))
+        ocr_cache = OcrCache(paths.data_dir / "ocr_cache", max_entries=cache_entries) if cache_entries > 0 else None
+        return cls(
+            paths=paths,
+            ruleset=context.ruleset,
+            receipt_engine=context.receipt_engine,
+            tz=context.tz,
+            ocr_pool=ocr_pool,
+            ocr_cache=ocr_cache,
+            duplicates=context.duplicates,
+            duplicate_policy=context.duplicate_policy or "link",
+            receipt_index=context.receipt_index,
+            event_store=context.events,
+        )
+
+    def ingest_text(self, text: str, *, source_name: str | None = None, profile: bool | None = None) -> IngestResult:
+        # profile: True/False overrides sampling for this request (see ProfilingConfig).
+        with WriteBatch() as batch:
+            return self._ingest_text(text, source_name=source_name, batch=batch, profile=profile)
+
+    def ingest_receipt_json(self, payload: dict, *, source_name: str | None = None) -> IngestResult:
+        with WriteBatch() as batch:
+            return self._ingest_receipt_json(payload, source_name=source_name, batch=batch)
+
+    def ingest_many(
+        self,
+        items: Iterable[BatchIngestItem | dict],
+        *,
+        source_name: str | None = None,
+        flush_every: int = 100,
+    ) -> BatchIngestResult:
+        return run_batch(items, self._ingest_item, source_name=source_name, flush_every=flush_every)
+
+    def _ingest_item(self, index: int, item: BatchIngestItem, batch: WriteBatch) -> IngestResult:
+        if item.text is not None:
+            return self._ingest_text(item.text, source_name=item.source_name, batch=batch)
+        return self._ingest_receipt_json(item.receipt or {}, source_name=item.source_name, batch=batch)
+
+    def _ingest_text(
+        self, text: str, *, source_name: str | None, batch: WriteBatch, profile: bool | None = None
+    ) -> IngestResult:
         ingest_event_id = str(uuid.uuid4())
         received_at = _now(self.tz).isoformat()
+        request_profile = self._start_profile(ingest_event_id, source_type="text", requested=profile)
 
         raw_text_path = self.paths.raw_dir / "ocr_text" / f"{ingest_event_id}.txt"
-        raw_text_path.write_text(text, encoding="utf-8")
+        batch.write_text(raw_text_path, text)
 
-        detection = detect_receipt(text, self.ruleset)
+        with stage_timer("detect", request_profile):
+            detection = detect_receipt(text, self.receipt_engine.ruleset)
 
         receipt, canonical_path, route_info = self._route_or_fallback(
             text=text,
             ingest_event_id=ingest_event_id,
             source_type="text",
             detection=detection,
+            batch=batch,
+            profile=request_profile,
+        )
+
+        return self._complete_text(
+            ingest_event_id=ingest_event_id,
+            received_at=received_at,
+            source_name=source_name,
+            raw_text_path=raw_text_path,
+            detection=detection,
+            routed=(receipt, canonical_path, route_info),
+            batch=batch,
+            profile=request_profile,
         )
 
-        ingest_event_path = self.paths.raw_dir / "ingest_events" / f"{ingest_event_id}.json"
-        write_json(
-            ingest_event_path,
+    def _complete_text(
+        self,
+        *,
+        ingest_event_id: str,
+        received_at: str,
+        source_name: str | None,
+        raw_text_path: Path,
+        detection: ReceiptDetection,
+        routed: RouteOutcome,
+        batch: WriteBatch | None = None,
+        profile: RequestProfile | None = None,
+    ) -> IngestResult:
+        receipt, canonical_path, route_info = routed
+        profile_info = self._write_profile(profile, batch=batch)
+        ingest_event_path = self.events.append(
             {
                 "ingest_event_id": ingest_event_id,
                 "received_at": received_at,
@@ -72,18 +242,59 @@ class IngestOrchestrator:
                     "reason": detection.reason,
                 },
                 **route_info,
+                **profile_info,
             },
+            batch=batch,
         )
 
+        status = route_info.get("status") or ("ok" if canonical_path else "stored_raw_text")
+        count_result("text", status)
         return IngestResult(
             ingest_event_id=ingest_event_id,
-            status=route_info.get("status") or ("ok" if canonical_path else "stored_raw_text"),
+            status=status,
             raw_text_path=self._rel(raw_text_path),
             ingest_event_path=self._rel(ingest_event_path),
             canonical_receipt_path=self._rel(canonical_path) if canonical_path else None,
             receipt=receipt,
         )
 
+    def _ingest_receipt_json(self, payload: dict, *, source_name: str | None, batch: WriteBatch) -> IngestResult:
+        ingest_event_id = str(uuid.uuid4())
+        received_at = _now(self.tz).isoformat()
+
+        raw_json_path = self.paths.raw_dir / "ocr_text" / f"{ingest_event_id}.json"
+        batch.write_json(raw_json_path, payload)
+
+        structured = StructuredReceiptV1.model_validate(payload)
+        with stage_timer("parse"):
+            receipt = self.receipt_engine.parse_structured(structured, ingest_event_id=ingest_event_id)
+        outcome = self._persist(receipt, batch=batch)
+        count_result("receipt_json", outcome.status)
+        canonical_path = outcome.path
+
+        ingest_event_path = self.events.append(
+            {
+                "ingest_event_id": ingest_event_id,
+                "received_at": received_at,
+                "source_type": "receipt_json",
+                "source_name": source_name,
+                "raw_receipt_json_path": self._rel(raw_json_path),
+                "canonical_receipt_path": self._rel(canonical_path) if canonical_path else None,
+                "structured_confidence": structured.confidence,
+                **self._duplicate_info(outcome),
+            },
+            batch=batch,
+        )
+
+        return IngestResult(
+            ingest_event_id=ingest_event_id,
+            status=outcome.status,
+            raw_receipt_json_path=self._rel(raw_json_path),
+            ingest_event_path=self._rel(ingest_event_path),
+            canonical_receipt_path=self._rel(canonical_path) if canonical_path else None,
+            receipt=receipt if outcome.status == "ok" else None,
+        )
+
     def ingest_image(
         self,
         image_bytes: bytes,
@@ -91,75 +302,211 @@ class IngestOrchestrator:
         filename: str | None = None,
         ocr_text: str | None = None,
         source_name: str | None = None,
+        profile: bool | None = None,
+    ) -> IngestResult:
+        ingest_event_id, received_at, raw_image_path = self.store_image(image_bytes, filename=filename)
+        return self.process_image(
+            raw_image_path,
+            ingest_event_id=ingest_event_id,
+            received_at=received_at,
+            ocr_text=ocr_text,
+            source_name=source_name,
+            profile=profile,
+        )
+
+    def ingest_upload(
+        self,
+        stream: BinaryIO,
+        *,
+        filename: str | None = None,
+        ocr_text: str | None = None,
+        source_name: str | None = None,
+        profile: bool | None = None,
     ) -> IngestResult:
+        # Like ingest_image, for a file object (e.g. an UploadFile's spool) that is never read whole.
+        ingest_event_id, received_at, raw_image_path, image_sha256 = self.store_upload(stream, filename=filename)
+        return self.process_image(
+            raw_image_path,
+            ingest_event_id=ingest_event_id,
+            received_at=received_at,
+            ocr_text=ocr_text,
+            source_name=source_name,
+            profile=profile,
+            image_sha256=image_sha256,
+        )
+
+    def store_upload(self, stream: BinaryIO, *, filename: str | None = None) -> tuple[str, str, Path, str]:
+        # Returns the content hash as well, so the OCR cache does not read the file again.
+        # Raises StreamTooLargeError beyond uploads.max_bytes.
         ingest_event_id = str(uuid.uuid4())
         received_at = _now(self.tz).isoformat()
+        raw_image_path = self.raw_image_path(ingest_event_id, filename)
+        with stage_timer("store_image"):
+            image_sha256, _ = write_stream(
+                raw_image_path,
+                stream,
+                max_bytes=self.uploads.max_bytes or None,
+                chunk_size=self.uploads.chunk_bytes,
+            )
+        return ingest_event_id, received_at, raw_image_path, image_sha256
 
+    def store_image(self, image_bytes: bytes, *, filename: str | None = None) -> tuple[str, str, Path]:
+        ingest_event_id = str(uuid.uuid4())
+        received_at = _now(self.tz).isoformat()
+        raw_image_path = self.raw_image_path(ingest_event_id, filename)
+        # Written before returning: OCR reads the file right after.
+        write_bytes_now(raw_image_path, image_bytes)
+        return ingest_event_id, received_at, raw_image_path
+
+    def raw_image_path(self, ingest_event_id: str, filename: str | None) -> Path:
         original = Path(filename or "image.jpg")
         safe_stem = slug(original.stem or "image")
         suffix = original.suffix if original.suffix else ".jpg"
-        raw_image_path = self.paths.raw_dir / "images" / f"{ingest_event_id}_{safe_stem}{suffix}"
-        raw_image_path.write_bytes(image_bytes)
+        return self.paths.raw_dir / "images" / f"{ingest_event_id}_{safe_stem}{suffix}"
 
+    def process_image(
+        self,
+        raw_image_path: Path,
+        *,
+        ingest_event_id: str,
+        received_at: str,
+        ocr_text: str | None = None,
+        source_name: str | None = None,
+        profile: bool | None = None,
+        image_sha256: str | None = None,
+    ) -> IngestResult:
+        # image_sha256: the stored file's hash when already known (see store_upload).
+        with WriteBatch() as batch:
+            return self._process_image(
+                raw_image_path,
+                ingest_event_id=ingest_event_id,
+                received_at=received_at,
+                ocr_text=ocr_text,
+                source_name=source_name,
+                batch=batch,
+                profile=profile,
+                image_sha256=image_sha256,
+            )
+
+    def _process_image(
+        self,
+        raw_image_path: Path,
+        *,
+        ingest_event_id: str,
+        received_at: str,
+        ocr_text: str | None,
+        source_name: str | None,
+        batch: WriteBatch,
+        profile: bool | None,
+        image_sha256: str | None = None,
+    ) -> IngestResult:
+        request_profile = self._start_profile(ingest_event_id, source_type="image", requested=profile)
         ocr_engine = None
         if ocr_text is None:
             try:
-                ocr_text, ocr_engine = self._run_ocr(raw_image_path)
-            except OcrNotAvailableError as exc:
-                ingest_event_path = self.paths.raw_dir / "ingest_events" / f"{ingest_event_id}.json"
-                write_json(
-                    ingest_event_path,
-                    {
-                        "ingest_event_id": ingest_event_id,
-                        "received_at": received_at,
-                        "source_type": "image",
-                        "source_name": source_name,
-                        "raw_image_path": self._rel(raw_image_path),
-                        "status": "stored_raw_image",
-                        "error": str(exc),
-                    },
+                ocr_text, ocr_engine = self._run_ocr(
+                    raw_image_path, image_sha256=image_sha256, profile=request_profile
                 )
-                return IngestResult(
+            except OcrNotAvailableError as exc:
+                return self._image_failure(
+                    raw_image_path,
                     ingest_event_id=ingest_event_id,
+                    received_at=received_at,
+                    source_name=source_name,
                     status="stored_raw_image",
-                    raw_image_path=self._rel(raw_image_path),
-                    ingest_event_path=self._rel(ingest_event_path),
+                    error=str(exc),
+                    batch=batch,
+                    profile=request_profile,
                 )
             except RuntimeError as exc:
-                ingest_event_path = self.paths.raw_dir / "ingest_events" / f"{ingest_event_id}.json"
-                write_json(
-                    ingest_event_path,
-                    {
-                        "ingest_event_id": ingest_event_id,
-                        "received_at": received_at,
-                        "source_type": "image",
-                        "source_name": source_name,
-                        "raw_image_path": self._rel(raw_image_path),
-                        "status": "ocr_failed",
-                        "error": str(exc),
-                    },
-                )
-                return IngestResult(
+                return self._image_failure(
+                    raw_image_path,
                     ingest_event_id=ingest_event_id,
+                    received_at=received_at,
+                    source_name=source_name,
                     status="ocr_failed",
-                    raw_image_path=self._rel(raw_image_path),
-                    ingest_event_path=self._rel(ingest_event_path),
+                    error=str(exc),
+                    batch=batch,
+                    profile=request_profile,
                 )
 
         raw_text_path = self.paths.raw_dir / "ocr_text" / f"{ingest_event_id}.txt"
-        raw_text_path.write_text(ocr_text, encoding="utf-8")
+        batch.write_text(raw_text_path, ocr_text)
 
-        detection = detect_receipt(ocr_text, self.ruleset)
-        receipt, canonical_path, route_info = self._route_or_fallback(
+        with stage_timer("detect", request_profile):
+            detection = detect_receipt(ocr_text, self.receipt_engine.ruleset)
+        routed = self._route_or_fallback(
             text=ocr_text,
             ingest_event_id=ingest_event_id,
             source_type="image",
             detection=detection,
+            batch=batch,
+            profile=request_profile,
+        )
+        return self._complete_image(
+            raw_image_path,
+            ingest_event_id=ingest_event_id,
+            received_at=received_at,
+            source_name=source_name,
+            raw_text_path=raw_text_path,
+            ocr_engine=ocr_engine,
+            detection=detection,
+            routed=routed,
+            batch=batch,
+            profile=request_profile,
         )
 
-        ingest_event_path = self.paths.raw_dir / "ingest_events" / f"{ingest_event_id}.json"
-        write_json(
-            ingest_event_path,
+    def _image_failure(
+        self,
+        raw_image_path: Path,
+        *,
+        ingest_event_id: str,
+        received_at: str,
+        source_name: str | None,
+        status: str,
+        error: str,
+        batch: WriteBatch | None = None,
+        profile: RequestProfile | None = None,
+    ) -> IngestResult:
+        profile_info = self._write_profile(profile, batch=batch)
+        ingest_event_path = self.events.append(
+            {
+                "ingest_event_id": ingest_event_id,
+                "received_at": received_at,
+                "source_type": "image",
+                "source_name": source_name,
+                "raw_image_path": self._rel(raw_image_path),
+                "status": status,
+                "error": error,
+                **profile_info,
+            },
+            batch=batch,
+        )
+        count_result("image", status)
+        return IngestResult(
+            ingest_event_id=ingest_event_id,
+            status=status,
+            raw_image_path=self._rel(raw_image_path),
+            ingest_event_path=self._rel(ingest_event_path),
+        )
+
+    def _complete_image(
+        self,
+        raw_image_path: Path,
+        *,
+        ingest_event_id: str,
+        received_at: str,
+        source_name: str | None,
+        raw_text_path: Path,
+        ocr_engine: str | None,
+        detection: ReceiptDetection,
+        routed: RouteOutcome,
+        batch: WriteBatch | None = None,
+        profile: RequestProfile | None = None,
+    ) -> IngestResult:
+        receipt, canonical_path, route_info = routed
+        profile_info = self._write_profile(profile, batch=batch)
+        ingest_event_path = self.events.append(
             {
                 "ingest_event_id": ingest_event_id,
                 "received_at": received_at,
@@ -175,12 +522,16 @@ class IngestOrchestrator:
                     "reason": detection.reason,
                 },
                 **route_info,
+                **profile_info,
             },
+            batch=batch,
         )
 
+        status = route_info.get("status") or ("ok" if canonical_path else "ocr_done")
+        count_result("image", status)
         return IngestResult(
             ingest_event_id=ingest_event_id,
-            status=route_info.get("status") or ("ok" if canonical_path else "ocr_done"),
+            status=status,
             raw_text_path=self._rel(raw_text_path),
             raw_image_path=self._rel(raw_image_path),
             ingest_event_path=self._rel(ingest_event_path),
@@ -188,9 +539,31 @@ class IngestOrchestrator:
             receipt=receipt,
         )
 
-    def _run_ocr(self, image_path: Path) -> tuple[str, str]:
-        cfg = PaddleOcrConfig(lang="german", use_angle_cls=True)
-        text = ocr_image_path(image_path, config=cfg)
+    def _run_ocr(
+        self, image_path: Path, *, image_sha256: str | None = None, profile: RequestProfile | None = None
+    ) -> tuple[str, str]:
+        cfg = self.ocr_pool.config if self.ocr_pool is not None else PaddleOcrConfig(lang="german", use_angle_cls=True)
+
+        key = None
+        if self.ocr_cache is not None:
+            with stage_timer("ocr_cache", profile):
+                key = cache_key(image_sha256 or hash_file(image_path), cfg)
+                cached = self.ocr_cache.get(key)
+            if cached is not None:
+                return cached, "paddleocr"
+
+        with stage_timer("ocr", profile):
+            if self.ocr_pool is not None:
+                text = self.ocr_pool.ocr_image_path(image_path)
+            else:
+                text = ocr_image_path(image_path, config=cfg)
+
+        if key is not None and self.ocr_cache is not None:
+            try:
+                self.ocr_cache.put(key, text)
+            except OSError:
+                # The text is already there; a cache that cannot be written only costs a later OCR run.
+                pass
         return text, "paddleocr"
 
     def _route_or_fallback(
@@ -199,32 +572,104 @@ class IngestOrchestrator:
         text: str,
         ingest_event_id: str,
         source_type: str,
-        detection,
-    ) -> tuple[CanonicalReceipt | None, Path | None, dict]:
+        detection: ReceiptDetection,
+        batch: WriteBatch | None = None,
+        profile: RequestProfile | None = None,
+    ) -> RouteOutcome:
         if not detection.is_receipt:
             return None, None, {"status": "non_receipt"}
 
-        receipt_service_url = os.getenv("HOUSEHOLD_RECEIPT_SERVICE_URL", "http://127.0.0.1:8001").rstrip("/")
-        allow_fallback = os.getenv("INGEST_LOCAL_FALLBACK", "1") not in {"0", "false", "False"}
-
-        if receipt_service_url:
+        client = self.receipt_client
+        if client is not None:
             try:
-                result = post_json(
-                    f"{receipt_service_url}/receipts/ingest_text",
-                    {"text": text, "source_type": source_type, "ingest_event_id": ingest_event_id},
-                    timeout_s=float(os.getenv("RECEIPT_SERVICE_TIMEOUT_S", "5")),
-                )
-                canonical_receipt_path = result.get("canonical_receipt_path")
-                receipt = CanonicalReceipt.model_validate(result.get("receipt") or {})
-                canonical_path = self._abs_from_rel(str(canonical_receipt_path))
-                return receipt, canonical_path, {"status": "ok", "routed_to": receipt_service_url}
+                with stage_timer("route", profile):
+                    result = client.post_json(
+                        RECEIPT_ROUTE, route_payload(text, source_type=source_type, ingest_event_id=ingest_event_id)
+                    )
+                return self._routed(result, routed_to=client.base_url)
             except (HttpRequestError, Exception) as exc:
-                if not allow_fallback:
+                count_route_error()
+                if not self.routing.allow_fallback:
                     return None, None, {"status": "route_failed", "route_error": str(exc)}
 
-        receipt = self.receipt_engine.parse_text(text, source_type=source_type, ingest_event_id=ingest_event_id)
-        canonical_path = persist_canonical_receipt(self.paths.canonical_dir, receipt)
-        return receipt, canonical_path, {"status": "ok_local"}
+        return self._route_locally(
+            text,
+            ingest_event_id=ingest_event_id,
+            source_type=source_type,
+            batch=batch,
+            profile=profile,
+            detection=detection,
+        )
+
+    def _routed(self, result: dict, *, routed_to: str) -> RouteOutcome:
+        canonical_receipt_path = result.get("canonical_receipt_path")
+        if result.get("status") == "duplicate":
+            return (
+                None,
+                self._abs_from_rel(str(canonical_receipt_path)) if canonical_receipt_path else None,
+                {"status": "duplicate", "routed_to": routed_to, "duplicate_of": result.get("duplicate_of")},
+            )
+        receipt = CanonicalReceipt.model_validate(result.get("receipt") or {})
+        canonical_path = self._abs_from_rel(str(canonical_receipt_path))
+        return receipt, canonical_path, {"status": "ok", "routed_to": routed_to}
+
+    def _route_locally(
+        self,
+        text: str,
+        *,
+        ingest_event_id: str,
+        source_type: str,
+        batch: WriteBatch | None = None,
+        profile: RequestProfile | None = None,
+        detection: ReceiptDetection | None = None,
+    ) -> RouteOutcome:
+        with stage_timer("parse", profile):
+            receipt = self.receipt_engine.parse_text(
+                text, source_type=source_type, ingest_event_id=ingest_event_id, profile=profile, detection=detection
+            )
+        outcome = self._persist(receipt, batch=batch, profile=profile)
+        if outcome.status != "ok":
+            return None, outcome.path, {"status": outcome.status, **self._duplicate_info(outcome)}
+        return receipt, outcome.path, {"status": "ok_local", **self._duplicate_info(outcome)}
+
+    def _persist(
+        self, receipt: CanonicalReceipt, *, batch: WriteBatch | None = None, profile: RequestProfile | None = None
+    ) -> PersistOutcome:
+        # With a batch, the file writes themselves land in the "write" stage when it is flushed.
+        with stage_timer("persist", profile):
+            if self.duplicates is None:
+                path = persist_canonical_receipt(
+                    self.paths.canonical_dir, receipt, batch=batch, index=self.receipt_index
+                )
+                return PersistOutcome(path=path, status="ok")
+            return self.duplicates.persist(
+                self.paths.canonical_dir,
+                receipt,
+                policy=self.duplicate_policy,
+                batch=batch,
+                index=self.receipt_index,
+            )
+
+    def _start_profile(
+        self, ingest_event_id: str, *, source_type: str, requested: bool | None
+    ) -> RequestProfile | None:
+        cfg = self.profiling
+        if cfg is None or not cfg.wants(requested):
+            return None
+        return RequestProfile(ingest_event_id, source_type=source_type, slowest_lines=cfg.slowest_lines)
+
+    def _write_profile(self, profile: RequestProfile | None, *, batch: WriteBatch | None = None) -> dict:
+        # Returns the ingest event fields pointing at the written profile (none for unprofiled requests).
+        if profile is None:
+            return {}
+        profile_path = self.paths.raw_dir / PROFILE_DIR / f"{profile.ingest_event_id}.json"
+        (batch.write_json if batch is not None else write_json)(profile_path, profile.to_dict())
+        return {"profile_path": self._rel(profile_path)}
+
+    def _duplicate_info(self, outcome: PersistOutcome) -> dict:
+        if outcome.duplicate_of is None:
+            return {}
+        return {"duplicate_of": self._rel(outcome.duplicate_of), "duplicate_policy": self.duplicate_policy}
 
     def _abs_from_rel(self, rel_or_abs: str) -> Path:
         p = Path(rel_or_abs)
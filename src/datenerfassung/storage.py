@@ -1,11 +1,33 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import os
+import queue
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Self
 
+from .metrics import stage_timer
 from .models import CanonicalReceipt
 
+if TYPE_CHECKING:
+    from .receipt_index import ReceiptIndex
+
+FileWrite = tuple[Path, bytes]
+# Called with None once a commit's writes are done, or with the error that stopped them.
+OnDone = Callable[[BaseException | None], None]
+DURABILITY_LEVELS = ("none", "written", "fsync")
+STREAM_CHUNK_BYTES = 1 << 20
+
+
+class StreamTooLargeError(ValueError):
+    pass
+
 
 def slug(value: str) -> str:
     out = []
@@ -30,12 +52,464 @@ def canonical_receipt_path(canonical_dir: Path, receipt: CanonicalReceipt) -> Pa
 
 
 def write_json(path: Path, data: object) -> None:
+    # Goes through the process storage backend (see StorageConfig); use a WriteBatch to group writes.
+    storage = get_storage()
+    storage.commit([(path, storage.dump_json(data))])
+
+
+def write_text(path: Path, text: str) -> None:
+    get_storage().commit([(path, text.encode("utf-8"))])
+
+
+def write_bytes_now(path: Path, data: bytes) -> None:
+    # For files that are read back right away (e.g. an image handed to OCR): returns once written.
+    get_storage().commit([(path, data)], wait=True)
+
+
+def write_stream(
+    path: Path, stream: BinaryIO, *, max_bytes: int | None = None, chunk_size: int = STREAM_CHUNK_BYTES
+) -> tuple[str, int]:
+    # Copies a file object to `path` one chunk at a time and returns (sha256, size), so at most one
+    # chunk is held in memory. Written to a sibling temp file and renamed once complete (synced first
+    # with durability=fsync); returns once written, like write_bytes_now. More than max_bytes raises
+    # StreamTooLargeError and leaves nothing behind.
+    fsync = get_storage().durability == "fsync"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.part")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with tmp_path.open("wb") as fh:
+            while chunk := stream.read(chunk_size):
+                size += len(chunk)
+                if max_bytes is not None and size > max_bytes:
+                    raise StreamTooLargeError(f"{path.name} exceeds {max_bytes} bytes.")
+                digest.update(chunk)
+                fh.write(chunk)
+            if fsync:
+                fh.flush()
+                _fdatasync(fh.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    if fsync:
+        _fsync_dir(path.parent)
+    return digest.hexdigest(), size
+
+
+def write_json_atomic(path: Path, data: object) -> None:
+    # Readers never see a half-written file: write a sibling temp file, then rename over the target.
+    # Serialised like the storage backend (compact_json) and synced with durability=fsync, but written
+    # right away in the calling thread, bypassing any write-behind queue.
+    storage = get_storage()
+    fsync = storage.durability == "fsync"
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    fd = _write_file(tmp_path, storage.dump_json(data), keep_open=fsync)
+    if fd is not None:
+        try:
+            _fdatasync(fd)
+        finally:
+            os.close(fd)
+    os.replace(tmp_path, path)
+    if fsync:
+        _fsync_dir(path.parent)
 
 
-def persist_canonical_receipt(canonical_dir: Path, receipt: CanonicalReceipt) -> Path:
+def persist_canonical_receipt(
+    canonical_dir: Path,
+    receipt: CanonicalReceipt,
+    *,
+    batch: WriteBatch | None = None,
+    index: ReceiptIndex | None = None,
+) -> Path:
+    # The index row is added once the file is written (with a batch: after its flush).
     path = canonical_receipt_path(canonical_dir, receipt)
-    write_json(path, receipt.model_dump(mode="json"))
+    if batch is not None:
+        batch.write_json(path, receipt.model_dump(mode="json"))
+        if index is not None:
+            batch.after_flush(lambda: index.upsert(receipt, path))
+    else:
+        write_json(path, receipt.model_dump(mode="json"))
+        if index is not None:
+            index.upsert(receipt, path)
     return path
 
+
+class WriteBatch:
+    # Collects the file writes of one request and hands them to the storage backend as one group.
+    # Used as a context manager; pending writes are flushed on exit even if the body raised, so raw
+    # inputs are never lost because a later step failed.
+    def __init__(self, storage: StorageBackend | None = None) -> None:
+        self._pending: list[FileWrite] = []
+        self._callbacks: list[tuple[Callable[[], None], Callable[[BaseException], None] | None]] = []
+        self._storage = storage
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.flush()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    @property
+    def storage(self) -> StorageBackend:
+        return self._storage if self._storage is not None else get_storage()
+
+    def write_bytes(self, path: Path, data: bytes) -> None:
+        self._pending.append((path, data))
+
+    def write_text(self, path: Path, text: str) -> None:
+        self._pending.append((path, text.encode("utf-8")))
+
+    def write_json(self, path: Path, data: object) -> None:
+        self._pending.append((path, self.storage.dump_json(data)))
+
+    def after_flush(
+        self, callback: Callable[[], None], *, on_error: Callable[[BaseException], None] | None = None
+    ) -> None:
+        # For bookkeeping that must only point at written files (indexes, the event log): runs in
+        # registration order once the next flush's writes are on disk; if they fail, on_error runs
+        # instead. With write-behind storage and durability=none that happens on the writer thread,
+        # after flush() has returned.
+        self._callbacks.append((callback, on_error))
+
+    def flush(self) -> None:
+        pending, self._pending = self._pending, []
+        callbacks, self._callbacks = self._callbacks, []
+        if not pending:
+            _run_callbacks(callbacks, None)
+            return
+        with stage_timer("write"):
+            if callbacks:
+                self.storage.commit(pending, on_done=lambda error: _run_callbacks(callbacks, error))
+            else:
+                self.storage.commit(pending)
+
+
+def _run_callbacks(
+    callbacks: list[tuple[Callable[[], None], Callable[[BaseException], None] | None]],
+    error: BaseException | None,
+) -> None:
+    if error is not None:
+        for _, on_error in callbacks:
+            if on_error is not None:
+                on_error(error)
+        return
+    # Every callback runs even if one fails; the first error is raised afterwards.
+    first: Exception | None = None
+    for callback, _ in callbacks:
+        try:
+            callback()
+        except Exception as exc:  # noqa: BLE001 - re-raised once the others have run
+            first = first or exc
+    if first is not None:
+        raise first
+
+
+@dataclass(frozen=True, slots=True)
+class StorageConfig:
+    # mode: "direct" writes in the calling thread, "write_behind" queues writes for one background
+    # writer that commits everything queued at that point as a single group.
+    # durability: "none" returns before the data is written (write-behind only), "written" once it is
+    # handed to the OS, "fsync" once the files and their directories are fsynced (once per group).
+    mode: str = "direct"
+    durability: str = "written"
+    compact_json: bool = False
+    group_max_writes: int = 512
+    group_delay_ms: float = 0.0
+
+    @classmethod
+    def from_env(cls) -> StorageConfig:
+        config = cls(
+            mode=os.getenv("DATENERFASSUNG_STORAGE_MODE", "direct"),
+            durability=os.getenv("DATENERFASSUNG_STORAGE_DURABILITY", "written"),
+            compact_json=os.getenv("DATENERFASSUNG_JSON_COMPACT", "0") not in {"0", "false", "False"},
+            group_max_writes=int(os.getenv("DATENERFASSUNG_STORAGE_GROUP_MAX_WRITES", "512")),
+            group_delay_ms=float(os.getenv("DATENERFASSUNG_STORAGE_GROUP_DELAY_MS", "0")),
+        )
+        if config.mode not in {"direct", "write_behind"}:
+            raise ValueError(f"DATENERFASSUNG_STORAGE_MODE must be direct or write_behind, not {config.mode!r}")
+        if config.durability not in DURABILITY_LEVELS:
+            raise ValueError(
+                f"DATENERFASSUNG_STORAGE_DURABILITY must be one of {', '.join(DURABILITY_LEVELS)}, "
+                f"not {config.durability!r}"
+            )
+        return config
+
+    def build(self) -> StorageBackend:
+        if self.mode == "write_behind":
+            return WriteBehindStorage(
+                durability=self.durability,
+                compact_json=self.compact_json,
+                group_max_writes=self.group_max_writes,
+                group_delay_s=self.group_delay_ms / 1000,
+            )
+        return DirectStorage(durability=self.durability, compact_json=self.compact_json)
+
+
+class _DirCache:
+    # Directories known to exist, so each is created (and, for fsync, synced) only once per process.
+    def __init__(self) -> None:
+        self._known: set[Path] = set()
+
+    def write_group(self, writes: list[FileWrite], *, fsync: bool) -> None:
+        # With fsync, every file of the group is written first and then synced, so the filesystem can
+        # fold the group into as few journal commits as possible; each directory is synced once.
+        synced: list[int] = []
+        parents: set[Path] = set()
+        try:
+            for path, data in writes:
+                parent = path.parent
+                if parent not in self._known:
+                    parent.mkdir(parents=True, exist_ok=True)
+                    self._known.add(parent)
+                try:
+                    fd = _write_file(path, data, keep_open=fsync)
+                except FileNotFoundError:
+                    # The directory was removed behind our back: create it again.
+                    parent.mkdir(parents=True, exist_ok=True)
+                    fd = _write_file(path, data, keep_open=fsync)
+                if fd is not None:
+                    synced.append(fd)
+                    parents.add(parent)
+            for fd in synced:
+                _fdatasync(fd)
+        finally:
+            for fd in synced:
+                os.close(fd)
+        # New directory entries are only durable once their directory is synced.
+        for parent in parents:
+            _fsync_dir(parent)
+
+
+class DirectStorage:
+    # Writes in the calling thread; every commit is one group (one fsync round with durability=fsync).
+    def __init__(self, *, durability: str = "written", compact_json: bool = False) -> None:
+        self.durability = durability
+        self.compact_json = compact_json
+        self._dirs = _DirCache()
+        # Always 0: failed writes raise in the caller. Kept for parity with WriteBehindStorage.
+        self.failed_writes = 0
+
+    def dump_json(self, data: object) -> bytes:
+        return _dump_json(data, compact=self.compact_json)
+
+    def commit(self, writes: list[FileWrite], *, wait: bool = False, on_done: OnDone | None = None) -> None:
+        _write_now(self._dirs, writes, fsync=self.durability == "fsync", on_done=on_done)
+
+    def pending(self) -> int:
+        return 0
+
+    def close(self) -> None:
+        pass
+
+
+def _write_now(dirs: _DirCache, writes: list[FileWrite], *, fsync: bool, on_done: OnDone | None) -> None:
+    try:
+        dirs.write_group(writes, fsync=fsync)
+    except BaseException as exc:
+        if on_done is not None:
+            on_done(exc)
+        raise
+    if on_done is not None:
+        on_done(None)
+
+
+class _Commit:
+    __slots__ = ("done", "error", "on_done", "writes")
+
+    def __init__(self, writes: list[FileWrite], *, wait: bool, on_done: OnDone | None) -> None:
+        self.writes = writes
+        self.done = threading.Event() if wait else None
+        self.error: BaseException | None = None
+        self.on_done = on_done
+
+
+class WriteBehindStorage:
+    # One writer thread drains the queue: whatever commits are waiting when it wakes up (up to
+    # group_max_writes files) are written as one group and share one fsync round, so concurrent
+    # requests on slow disks or network mounts pay for a sync once instead of once per file.
+    def __init__(
+        self,
+        *,
+        durability: str = "written",
+        compact_json: bool = False,
+        group_max_writes: int = 512,
+        group_delay_s: float = 0.0,
+    ) -> None:
+        self.durability = durability
+        self.compact_json = compact_json
+        self.group_max_writes = max(1, group_max_writes)
+        # Optional pause before writing a group, to let more commits join it.
+        self.group_delay_s = max(0.0, group_delay_s)
+        self._dirs = _DirCache()
+        self._queue: queue.SimpleQueue[_Commit | None] = queue.SimpleQueue()
+        self._pending = 0
+        # Writes nobody waited for cannot raise in the caller; they are counted here instead.
+        self.failed_writes = 0
+        self.last_error: str | None = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="storage-writer", daemon=True)
+        self._thread.start()
+
+    def dump_json(self, data: object) -> bytes:
+        return _dump_json(data, compact=self.compact_json)
+
+    def commit(self, writes: list[FileWrite], *, wait: bool = False, on_done: OnDone | None = None) -> None:
+        # wait=True returns only once the writes are done (fsynced with durability=fsync),
+        # whatever the configured durability. on_done(error) runs once the writes are done or
+        # failed, on the writer thread; with durability=none its errors only reach last_error.
+        if not writes:
+            return
+        with self._lock:
+            item = None
+            if not self._closed:
+                item = _Commit(writes, wait=wait or self.durability != "none", on_done=on_done)
+                self._pending += len(writes)
+                self._queue.put(item)
+        if item is None:
+            # After close(): write in the calling thread.
+            _write_now(self._dirs, writes, fsync=self.durability == "fsync", on_done=on_done)
+            return
+        if item.done is not None:
+            item.done.wait()
+            if item.error is not None:
+                raise item.error
+
+    def pending(self) -> int:
+        # Files queued but not yet written.
+        return self._pending
+
+    def close(self) -> None:
+        # Writes everything still queued, then stops the writer thread.
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is None:
+                return
+            if self.group_delay_s:
+                time.sleep(self.group_delay_s)
+            group = [first]
+            size = len(first.writes)
+            while size < self.group_max_writes:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                group.append(item)
+                size += len(item.writes)
+            self._write(group, size)
+
+    def _write(self, group: list[_Commit], size: int) -> None:
+        error: BaseException | None = None
+        with stage_timer("write_group"):
+            try:
+                self._dirs.write_group(
+                    [write for item in group for write in item.writes], fsync=self.durability == "fsync"
+                )
+            except BaseException as exc:  # noqa: BLE001 - handed to the waiting callers
+                error = exc
+        with self._lock:
+            self._pending -= size
+            if error is not None:
+                self.failed_writes += sum(len(item.writes) for item in group if item.done is None)
+                self.last_error = str(error)
+        for item in group:
+            item.error = error
+            if item.on_done is not None:
+                try:
+                    item.on_done(error)
+                except Exception as exc:  # noqa: BLE001 - raised in the waiting caller or recorded
+                    item.error = item.error or exc
+                    if item.done is None:
+                        with self._lock:
+                            self.last_error = str(exc)
+            if item.done is not None:
+                item.done.set()
+
+
+StorageBackend = DirectStorage | WriteBehindStorage
+
+_storage: StorageBackend | None = None
+_storage_lock = threading.Lock()
+
+
+def get_storage() -> StorageBackend:
+    # The process-wide backend, built from the environment on first use.
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = StorageConfig.from_env().build()
+    return _storage
+
+
+def set_storage(storage: StorageBackend | None) -> StorageBackend | None:
+    # Replaces the process-wide backend and returns the previous one (not closed).
+    global _storage
+    with _storage_lock:
+        previous, _storage = _storage, storage
+    return previous
+
+
+def close_storage() -> None:
+    # Flushes and stops the process-wide backend; the next write builds a new one.
+    storage = set_storage(None)
+    if storage is not None:
+        storage.close()
+
+
+def _dump_json(data: object, *, compact: bool) -> bytes:
+    if compact:
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def _write_file(path: Path, data: bytes, *, keep_open: bool) -> int | None:
+    # keep_open returns the descriptor so the caller can sync it later.
+    if not keep_open:
+        path.write_bytes(data)
+        return None
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    except BaseException:
+        os.close(fd)
+        raise
+    return fd
+
+
+# fdatasync skips timestamp-only metadata where the platform has it.
+_fdatasync = getattr(os, "fdatasync", os.fsync)
+
+
+def _fsync_dir(path: Path) -> None:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        # Not supported for directories on every platform/filesystem.
+        pass
+    finally:
+        os.close(fd)
@@ -1,5 +1,67 @@
 import sys
+from collections.abc import Callable
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import pytest
 
 sys.path.insert(0, str((Path(__file__).resolve().parents[1] / "src")))
 
+if TYPE_CHECKING:
+    from datenerfassung.project_paths import ProjectPaths
+    from datenerfassung.services.ingest_service.orchestrator import IngestOrchestrator
+
+RULES_DIR = Path(__file__).resolve().parents[1] / "data" / "rules"
+
+
+@pytest.fixture
+def make_paths() -> Callable[[Path], "ProjectPaths"]:
+    # A data tree under `root` that uses the repository's rules.
+    from datenerfassung.project_paths import ProjectPaths
+
+    def make(root: Path) -> ProjectPaths:
+        data_dir = root / "data"
+        paths = ProjectPaths(
+            root=root,
+            data_dir=data_dir,
+            raw_dir=data_dir / "raw",
+            canonical_dir=data_dir / "canonical",
+            rules_dir=RULES_DIR,
+            schema_dir=root / "schema",
+        )
+        paths.ensure_dirs()
+        return paths
+
+    return make
+
+
+@pytest.fixture
+def paths(tmp_path: Path, make_paths: Callable[[Path], "ProjectPaths"]) -> "ProjectPaths":
+    return make_paths(tmp_path)
+
+
+@pytest.fixture
+def make_orchestrator() -> Callable[..., "IngestOrchestrator"]:
+    # An ingest orchestrator over `paths` that parses locally; keyword arguments override its fields.
+    from datenerfassung.engine import ReceiptEngine
+    from datenerfassung.rules.loader import RuleSet
+    from datenerfassung.services.ingest_service.orchestrator import (
+        IngestOrchestrator,
+        RoutingConfig,
+    )
+
+    def make(paths: "ProjectPaths", **fields: Any) -> IngestOrchestrator:
+        ruleset = RuleSet.load_from_dir(paths.rules_dir)
+        fields.setdefault("routing", RoutingConfig(receipt_service_url=""))
+        return IngestOrchestrator(
+            paths=paths, ruleset=ruleset, receipt_engine=ReceiptEngine(ruleset), **fields
+        )
+
+    return make
+
+
+@pytest.fixture
+def orchestrator(
+    paths: "ProjectPaths", make_orchestrator: Callable[..., "IngestOrchestrator"]
+) -> "IngestOrchestrator":
+    return make_orchestrator(paths)
@@ -0,0 +1,37 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from datenerfassung.app_context import AppContext
+from datenerfassung.engine import IngestEngine
+from datenerfassung.project_paths import ProjectPaths
+from datenerfassung.services.ingest_service.orchestrator import IngestOrchestrator
+
+
+def test_components_share_one_lazily_built_ruleset(paths: ProjectPaths, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("HOUSEHOLD_RECEIPT_SERVICE_URL", "")
+    context = AppContext(paths)
+    assert "ruleset" not in context.timings
+
+    orchestrator = IngestOrchestrator.from_context(context)
+    engine = IngestEngine(context.paths, receipt_engine=context.receipt_engine)
+
+    assert orchestrator.receipt_engine is context.receipt_engine
+    assert engine.receipt_engine is context.receipt_engine
+    assert orchestrator.ruleset is engine.ruleset is context.ruleset
+    assert {"ruleset", "receipt_engine", "duplicates"} <= set(context.timings)
+    orchestrator.close()
+
+
+def test_service_import_does_not_load_ocr() -> None:
+    code = (
+        "import sys, datenerfassung.app_context, datenerfassung.services.ingest_service.orchestrator; "
+        "print(any(name.startswith('paddle') for name in sys.modules))"
+    )
+    src_dir = Path(__file__).resolve().parents[1] / "src"
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=src_dir
+    ).stdout
+    assert out.strip() == "False"
@@ -0,0 +1,54 @@
+import asyncio
+import json
+
+from datenerfassung.project_paths import ProjectPaths
+from datenerfassung.services.ingest_service.async_orchestrator import AsyncIngestOrchestrator
+from datenerfassung.services.ingest_service.orchestrator import IngestOrchestrator
+
+TEXT = "Kaufland\n29.12.2025 12:07\nFrosch Waschmittel 2,99\nPfand 0,25"
+
+
+def test_async_text_ingest_matches_sync_path(paths: ProjectPaths, orchestrator: IngestOrchestrator) -> None:
+
+    async def run() -> list:
+        async_orchestrator = AsyncIngestOrchestrator(orchestrator, io_workers=2)
+        try:
+            return list(
+                await asyncio.gather(
+                    async_orchestrator.ingest_text(TEXT, source_name="a"),
+                    async_orchestrator.ingest_text("Hallo Welt", source_name="b"),
+                )
+            )
+        finally:
+            await async_orchestrator.aclose()
+
+    receipt, other = asyncio.run(run())
+    assert receipt.status == "ok_local"
+    assert receipt.receipt is not None
+    assert (paths.root / receipt.canonical_receipt_path).exists()
+    assert other.status == "non_receipt"
+
+    event = json.loads((paths.root / receipt.ingest_event_path).read_text(encoding="utf-8"))
+    assert event["source_name"] == "a"
+    assert event["detection"]["is_receipt"] is True
+
+    sync_result = orchestrator.ingest_text(TEXT, source_name="a")
+    assert sync_result.status == receipt.status
+    assert [(li.name_norm, li.total) for li in sync_result.receipt.line_items] == [
+        (li.name_norm, li.total) for li in receipt.receipt.line_items
+    ]
+
+
+def test_async_image_ingest_with_provided_text(paths: ProjectPaths, orchestrator: IngestOrchestrator) -> None:
+
+    async def run():
+        async_orchestrator = AsyncIngestOrchestrator(orchestrator)
+        try:
+            return await async_orchestrator.ingest_image(b"fake-jpeg", filename="bon.jpg", ocr_text=TEXT)
+        finally:
+            await async_orchestrator.aclose()
+
+    result = asyncio.run(run())
+    assert result.status == "ok_local"
+    assert (paths.root / result.raw_image_path).read_bytes() == b"fake-jpeg"
+    assert (paths.root / result.raw_text_path).read_text(encoding="utf-8") == TEXT
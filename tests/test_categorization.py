@@ -1,4 +1,6 @@
-from datenerfassung.rules.categorization import categorize
+import random
+
+from datenerfassung.rules.categorization import categorize, compile_categories
 from datenerfassung.rules.loader import CategoriesRules, CategoryRule
 
 
@@ -21,3 +23,35 @@ def test_categorize_pfand_by_regex() -> None:
     assert confidence == 0.99
     assert tags_add == ["deposit"]
 
+
+
+def test_compiled_categories_match_linear_scan() -> None:
+    rng = random.Random(1234)
+    vocab = ["pfand", "milch", "bio", "wasch", "mittel", "reiniger", "frosch", "kase", "brot", "apfel", "saft"]
+
+    rules = []
+    for idx in range(60):
+        when_any: list[dict] = []
+        if rng.random() < 0.7:
+            when_any.append({"contains_any": rng.sample(vocab, k=rng.randint(1, 3))})
+        if rng.random() < 0.4:
+            a, b = rng.sample(vocab, k=2)
+            when_any.append({"regex": rf"\b{a}\b|{b}$"})
+        rules.append(
+            CategoryRule(
+                id=f"rule_{idx}",
+                priority=rng.randint(0, 5),
+                when_any=when_any,
+                then={"category": f"cat.{idx}", "tags_add": [f"t{idx}"], "confidence": 0.5},
+            )
+        )
+    rules.sort(key=lambda r: r.priority, reverse=True)
+
+    linear = CategoriesRules(rules=rules)
+    compiled = CategoriesRules(rules=rules, compiled=compile_categories(rules))
+
+    for _ in range(500):
+        words = rng.choices(vocab + ["x", "schoko", "flasche"], k=rng.randint(0, 4))
+        name_clean = " ".join(words)
+        tokens = [w for w in words if rng.random() < 0.8]
+        assert categorize(name_clean, tokens, compiled) == categorize(name_clean, tokens, linear)
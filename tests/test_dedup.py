@@ -0,0 +1,125 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from datenerfassung.dedup import open_duplicate_index, receipt_fingerprint
+from datenerfassung.engine import IngestEngine
+from datenerfassung.project_paths import ProjectPaths
+from datenerfassung.storage import DirectStorage, OnDone, WriteBatch
+
+TEXT = "Kaufland\n29.12.2025 12:07\nFrosch Waschmittel 2,99\nPfand 0,25"
+
+
+def _canonical_files(paths: ProjectPaths) -> list[Path]:
+    return sorted((paths.canonical_dir / "receipts").rglob("*.json"))
+
+
+def test_fingerprint_ignores_ids_and_provenance(paths: ProjectPaths) -> None:
+    engine = IngestEngine(paths, duplicate_policy=None)
+    first = engine.receipt_engine.parse_text(TEXT, source_type="text")
+    second = engine.receipt_engine.parse_text(TEXT, source_type="image")
+
+    assert first.receipt.id != second.receipt.id
+    assert receipt_fingerprint(first) == receipt_fingerprint(second)
+    third = engine.receipt_engine.parse_text(TEXT.replace("2,99", "3,99"), source_type="text")
+    assert receipt_fingerprint(third) != receipt_fingerprint(first)
+
+
+def test_link_policy_points_duplicates_at_existing_receipt(paths: ProjectPaths) -> None:
+    engine = IngestEngine(paths)
+
+    first = engine.ingest_text(TEXT)
+    second = engine.ingest_text(TEXT)
+
+    assert first.status == "ok"
+    assert second.status == "duplicate"
+    assert second.canonical_receipt_path == first.canonical_receipt_path
+    assert len(_canonical_files(paths)) == 1
+
+    # The index is persisted and picked up by a fresh engine.
+    assert IngestEngine(paths).ingest_text(TEXT).status == "duplicate"
+
+
+@pytest.mark.parametrize("policy", ["skip", "overwrite"])
+def test_skip_and_overwrite_policies(paths: ProjectPaths, policy: str) -> None:
+    engine = IngestEngine(paths, duplicate_policy=policy)
+
+    first = engine.ingest_text(TEXT)
+    second = engine.ingest_text(TEXT)
+
+    files = _canonical_files(paths)
+    assert len(files) == 1
+    if policy == "skip":
+        assert second.status == "duplicate"
+        assert second.canonical_receipt_path is None
+        assert files[0] == paths.root / first.canonical_receipt_path
+    else:
+        assert second.status == "ok"
+        assert files[0] == paths.root / second.canonical_receipt_path
+
+
+def test_index_is_rebuilt_from_existing_canonical_tree(paths: ProjectPaths) -> None:
+    IngestEngine(paths, duplicate_policy=None).ingest_text(TEXT)
+
+    index = open_duplicate_index(paths.canonical_dir, root=paths.root)
+
+    assert len(index) == 1
+    assert IngestEngine(paths).ingest_text(TEXT).status == "duplicate"
+
+
+def test_identical_undated_texts_are_both_stored(paths: ProjectPaths) -> None:
+    # The same order on two days: without a date on the receipt both purchases are kept.
+    engine = IngestEngine(paths)
+    undated = "Kaufland\nFrosch Waschmittel 2,99\nPfand 0,25"
+
+    first = engine.ingest_text(undated)
+    second = engine.ingest_text(undated)
+
+    assert first.receipt.receipt.datetime_source == "ingest"
+    assert receipt_fingerprint(first.receipt) is None
+    assert (first.status, second.status) == ("ok", "ok")
+    assert first.canonical_receipt_path != second.canonical_receipt_path
+    assert len(_canonical_files(paths)) == 2
+    assert engine.ingest_text(TEXT).receipt.receipt.datetime_source == "receipt"
+
+
+def test_concurrent_identical_persists_write_one_receipt(paths: ProjectPaths) -> None:
+    engine = IngestEngine(paths)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: engine.ingest_text(TEXT), range(16)))
+
+    assert sorted(r.status for r in results).count("ok") == 1
+    assert len(_canonical_files(paths)) == 1
+
+
+def test_failed_flush_does_not_record_fingerprint(paths: ProjectPaths) -> None:
+    index = open_duplicate_index(paths.canonical_dir, root=paths.root)
+    receipt = IngestEngine(paths, duplicate_policy=None).receipt_engine.parse_text(TEXT, source_type="text")
+    fingerprint = receipt_fingerprint(receipt)
+
+    class BrokenStorage(DirectStorage):
+        def commit(
+            self, writes: list[tuple[Path, bytes]], *, wait: bool = False, on_done: OnDone | None = None
+        ) -> None:
+            error = OSError("disk full")
+            if on_done is not None:
+                on_done(error)
+            raise error
+
+    batch = WriteBatch(BrokenStorage())
+    outcome = index.persist(paths.canonical_dir, receipt, policy="link", batch=batch)
+    assert outcome.status == "ok"
+    assert index.lookup(fingerprint) == outcome.path
+    with pytest.raises(OSError):
+        batch.flush()
+
+    assert index.lookup(fingerprint) is None
+    assert open_duplicate_index(paths.canonical_dir, root=paths.root).lookup(fingerprint) is None
+
+    with WriteBatch() as batch:
+        outcome = index.persist(paths.canonical_dir, receipt, policy="link", batch=batch)
+        assert not index.path.exists() or fingerprint not in index.path.read_text(encoding="utf-8")
+    assert outcome.path.exists()
+    assert index.lookup(fingerprint) == outcome.path
@@ -0,0 +1,153 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from datenerfassung.engine import IngestEngine
+from datenerfassung.event_store import (
+    EVENT_LOG_DIR,
+    EventFiles,
+    EventLog,
+    LogPosition,
+    migrate_event_files,
+)
+from datenerfassung.project_paths import ProjectPaths
+from datenerfassung.reparse import reparse_events
+from datenerfassung.storage import DirectStorage, OnDone, WriteBatch
+
+TEXTS = [
+    "Kaufland\n29.12.2025 12:07\nFrosch Waschmittel 2,99\nPfand 0,25",
+    "Kaufland\n30.12.2025 18:30\nFrosch Reiniger 1,99\nBananen 1,29",
+    "hallo welt",
+]
+
+
+def _event(i: int) -> dict:
+    return {"ingest_event_id": f"event-{i:04d}", "received_at": f"2025-12-29T12:{i % 60:02d}:00", "n": i}
+
+
+def test_lookup_and_replay_across_sealed_segments(tmp_path: Path) -> None:
+    log_dir = tmp_path / EVENT_LOG_DIR
+    with EventLog(log_dir, segment_max_bytes=2048) as log:
+        for i in range(300):
+            log.append(_event(i))
+        log.append({**_event(7), "n": "rewritten"})
+
+    with EventLog(log_dir, segment_max_bytes=2048) as log:
+        assert len(list(log_dir.glob("*.idx"))) > 2
+        assert log.get("event-0000")["n"] == 0
+        assert log.get("event-0299")["n"] == 299
+        assert log.get("event-0007")["n"] == "rewritten"
+        assert log.get("missing") is None
+
+        replayed = list(log.replay())
+        assert [event["n"] for _, event in replayed][:3] == [0, 1, 2]
+        assert len(replayed) == 301
+        resume_at = replayed[150][0]
+        assert [event["n"] for _, event in log.replay(resume_at)][:2] == [150, 151]
+        assert LogPosition.parse(str(resume_at)) == resume_at
+
+
+def test_torn_tail_is_cut_off_on_open(tmp_path: Path) -> None:
+    log_dir = tmp_path / EVENT_LOG_DIR
+    with EventLog(log_dir) as log:
+        log.append(_event(1))
+        segment = log.append(_event(2))
+    with segment.open("ab") as fh:
+        fh.write(b'{"ingest_event_id":"event-0003","n":')
+
+    with EventLog(log_dir) as log:
+        log.append(_event(4))
+        assert [event["n"] for _, event in log.replay()] == [1, 2, 4]
+
+
+def test_several_writers_share_a_log(tmp_path: Path) -> None:
+    log_dir = tmp_path / EVENT_LOG_DIR
+    with EventLog(log_dir, segment_max_bytes=2048) as first, EventLog(log_dir, segment_max_bytes=2048) as second:
+        for i in range(0, 200, 2):
+            first.append(_event(i))
+            second.append(_event(i + 1))
+        # Each writer finds what the other appended, across the segments either of them sealed.
+        assert first.get("event-0001")["n"] == 1
+        assert second.get("event-0198")["n"] == 198
+        with EventLog(log_dir, readonly=True) as reader:
+            assert reader.get("event-0199")["n"] == 199
+            second.append(_event(200))
+            assert reader.get("event-0200")["n"] == 200
+
+    with EventLog(log_dir, readonly=True) as reader:
+        assert [event["n"] for _, event in reader.replay()] == list(range(201))
+
+
+def _append_events(log_dir: str, first: int, count: int) -> None:
+    with EventLog(Path(log_dir), segment_max_bytes=4096) as log:
+        for i in range(first, first + count):
+            log.append(_event(i))
+
+
+def test_processes_append_concurrently(tmp_path: Path) -> None:
+    log_dir = tmp_path / EVENT_LOG_DIR
+    with ProcessPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(_append_events, str(log_dir), start, 150) for start in (0, 150, 300)]
+        for future in futures:
+            future.result()
+
+    with EventLog(log_dir, readonly=True) as reader:
+        assert sorted(event["n"] for _, event in reader.replay()) == list(range(450))
+        assert reader.get("event-0449")["n"] == 449
+
+
+def test_migration_from_event_files_and_reparse_from_the_log(paths: ProjectPaths) -> None:
+    engine = IngestEngine(paths)
+    results = [engine.ingest_text(text) for text in TEXTS]
+    before = {r.ingest_event_id: EventFiles(paths.raw_dir / "ingest_events").get(r.ingest_event_id) for r in results}
+
+    with EventLog(paths.raw_dir / EVENT_LOG_DIR) as log:
+        migrated = migrate_event_files(paths.raw_dir, log, delete=True)
+        assert (migrated.migrated, migrated.skipped, migrated.deleted) == (3, 0, 3)
+        assert EventFiles(paths.raw_dir / "ingest_events").ids() == []
+        for ingest_event_id, event in before.items():
+            assert log.get(ingest_event_id) == event
+        assert migrate_event_files(paths.raw_dir, log).migrated == 0
+
+    result = reparse_events(
+        paths.root, paths.raw_dir, paths.canonical_dir, engine.receipt_engine, rules_dir=paths.rules_dir
+    )
+    assert (result.events_scanned, result.failed) == (3, [])
+
+
+def test_engine_appends_to_the_event_log(paths: ProjectPaths, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("DATENERFASSUNG_EVENT_STORE", "log")
+    engine = IngestEngine(paths)
+    try:
+        result = engine.ingest_text(TEXTS[0], source_name="scan.txt")
+        assert result.ingest_event_path == "data/raw/event_log/000001.ndjson"
+        assert not list((paths.raw_dir / "ingest_events").iterdir())
+        event = engine.events.get(result.ingest_event_id)
+        assert event["source_name"] == "scan.txt"
+        assert event["canonical_receipt_path"] == result.canonical_receipt_path
+    finally:
+        engine.events.close()
+
+
+def test_batched_appends_wait_for_the_batch_owner_to_flush(tmp_path: Path) -> None:
+    commits: list[int] = []
+
+    class CountingStorage(DirectStorage):
+        def commit(
+            self, writes: list[tuple[Path, bytes]], *, wait: bool = False, on_done: OnDone | None = None
+        ) -> None:
+            commits.append(len(writes))
+            super().commit(writes, wait=wait, on_done=on_done)
+
+    with EventLog(tmp_path / EVENT_LOG_DIR) as log:
+        batch = WriteBatch(CountingStorage())
+        for i in range(3):
+            batch.write_text(tmp_path / "raw" / f"{i}.txt", "text")
+            log.append(_event(i), batch=batch)
+        assert "event-0000" not in log
+        assert commits == []
+
+        batch.flush()
+        assert commits == [3]
+        assert [event["n"] for _, event in log.replay()] == [0, 1, 2]
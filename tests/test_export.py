@@ -0,0 +1,42 @@
+from pathlib import Path
+
+import pytest
+
+from datenerfassung.engine import IngestEngine
+from datenerfassung.export import export_line_items, line_item_rows
+from datenerfassung.project_paths import ProjectPaths
+
+KAUFLAND = "Kaufland\n29.12.2025 12:07\nFrosch Waschmittel 2,99\nPfand 0,25"
+REWE = "REWE Markt\n03.01.2026 09:15\nVollmilch 1,19\nBrot 2,49"
+
+
+def test_line_item_rows_flatten_receipt(paths: ProjectPaths) -> None:
+    receipt = IngestEngine(paths).receipt_engine.parse_text(KAUFLAND, source_type="text")
+    rows = line_item_rows(receipt)
+
+    assert [r["line_id"] for r in rows] == [li.line_id for li in receipt.line_items]
+    assert {r["receipt_id"] for r in rows} == {receipt.receipt.id}
+    assert rows[0]["date"].isoformat() == "2025-12-29"
+    assert [r["position"] for r in rows] == list(range(len(rows)))
+
+
+def test_export_is_partitioned_and_incremental(tmp_path: Path, paths: ProjectPaths) -> None:
+    pq = pytest.importorskip("pyarrow.parquet")
+    engine = IngestEngine(paths)
+    out_dir = tmp_path / "export"
+
+    first = engine.ingest_text(KAUFLAND)
+    result = export_line_items(paths.canonical_dir, out_dir)
+    assert result.receipts == 1
+    assert all("year=2025" in f.as_posix() and "month=12" in f.as_posix() for f in result.files)
+
+    second = engine.ingest_text(REWE)
+    again = export_line_items(paths.canonical_dir, out_dir)
+    assert again.receipts == 1
+    assert all("year=2026" in f.as_posix() for f in again.files)
+    assert export_line_items(paths.canonical_dir, out_dir).receipts == 0
+
+    table = pq.read_table(out_dir)
+    expected = len(first.receipt.line_items) + len(second.receipt.line_items)
+    assert table.num_rows == expected
+    assert str(table.schema.field("category").type).startswith("dictionary")
@@ -0,0 +1,178 @@
+import asyncio
+import json
+import threading
+from collections.abc import Callable, Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from datenerfassung.classification.receipt_detector import ReceiptDetection
+from datenerfassung.http_client import (
+    AsyncPooledHttpClient,
+    CircuitBreaker,
+    CircuitOpenError,
+    HttpRequestError,
+    PooledHttpClient,
+)
+from datenerfassung.project_paths import ProjectPaths
+from datenerfassung.services.ingest_service.orchestrator import IngestOrchestrator, RoutingConfig
+
+
+class _StandIn(ThreadingHTTPServer):
+    daemon_threads = True
+    status = 200
+    connections = 0
+    requests = 0
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: _StandIn
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.connections += 1
+
+    def do_POST(self) -> None:
+        self.server.requests += 1
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        body = json.dumps({"echo": payload}).encode("utf-8")
+        self.send_response(self.server.status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+@pytest.fixture
+def server() -> Iterator[_StandIn]:
+    srv = _StandIn(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def _url(srv: _StandIn) -> str:
+    host, port = srv.server_address[:2]
+    return f"http://{host}:{port}"
+
+
+def test_client_reuses_keep_alive_connection(server: _StandIn) -> None:
+    with PooledHttpClient(_url(server)) as client:
+        for idx in range(5):
+            assert client.post_json("/echo", {"n": idx}) == {"echo": {"n": idx}}
+
+    assert server.requests == 5
+    assert server.connections == 1
+    assert client.connections_opened == 1
+
+
+def test_async_client_reuses_connections_under_concurrency(server: _StandIn) -> None:
+    async def run() -> tuple[list[dict], int]:
+        async with AsyncPooledHttpClient(_url(server), max_connections=4) as client:
+            results = await asyncio.gather(*(client.post_json("/echo", {"n": idx}) for idx in range(40)))
+            return list(results), client.connections_opened
+
+    results, opened = asyncio.run(run())
+
+    assert results == [{"echo": {"n": idx}} for idx in range(40)]
+    assert server.requests == 40
+    assert opened <= 4
+    assert server.connections == opened
+
+
+def test_circuit_opens_after_failures_and_recovers(server: _StandIn) -> None:
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, reset_after_s=10, clock=lambda: now[0])
+    client = PooledHttpClient(_url(server), breaker=breaker)
+    server.status = 503
+
+    for _ in range(2):
+        with pytest.raises(HttpRequestError):
+            client.post_json("/echo", {})
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        client.post_json("/echo", {})
+    assert server.requests == 2
+
+    now[0] = 11.0
+    server.status = 200
+    assert client.post_json("/echo", {"ok": True}) == {"echo": {"ok": True}}
+    assert breaker.state == "closed"
+    client.close()
+
+
+def test_probe_that_ends_unexpectedly_reopens_the_circuit(server: _StandIn) -> None:
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_after_s=10, clock=lambda: now[0])
+    breaker.record_failure()
+    now[0] = 11.0
+    client = PooledHttpClient(_url(server), breaker=breaker, max_connections=1)
+
+    def broken(method: str, path: str, body: bytes) -> tuple[int, bytes]:
+        raise RuntimeError("unexpected")
+
+    client._request = broken  # type: ignore[method-assign]
+    with pytest.raises(RuntimeError):
+        client.post_json("/echo", {})
+    assert breaker.state == "open"
+
+    del client._request
+    server.status = 200
+    # The slot was released: the refusal comes from the breaker, not from waiting for a connection.
+    with pytest.raises(CircuitOpenError):
+        client.post_json("/echo", {})
+    now[0] = 22.0
+    assert client.post_json("/echo", {"ok": True}) == {"echo": {"ok": True}}
+    assert breaker.state == "closed"
+    client.close()
+
+
+def test_cancelled_async_probe_reopens_the_circuit(server: _StandIn) -> None:
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_after_s=10, clock=lambda: now[0])
+    breaker.record_failure()
+    now[0] = 11.0
+
+    async def run() -> str:
+        async with AsyncPooledHttpClient(_url(server), breaker=breaker) as client:
+
+            async def hang(method: str, path: str, body: bytes) -> tuple[int, bytes]:
+                await asyncio.sleep(60)
+                return 200, b"{}"
+
+            client._request = hang  # type: ignore[method-assign]
+            probe = asyncio.create_task(client.post_json("/echo", {}))
+            await asyncio.sleep(0.01)
+            assert breaker.state == "half_open"
+            probe.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await probe
+            return breaker.state
+
+    assert asyncio.run(run()) == "open"
+
+
+def test_orchestrator_falls_back_locally_while_circuit_is_open(
+    paths: ProjectPaths, make_orchestrator: Callable[..., IngestOrchestrator]
+) -> None:
+    # Nothing listens on port 9 (discard); connection attempts fail fast.
+    routing = RoutingConfig(receipt_service_url="http://127.0.0.1:9", breaker_failures=1, timeout_s=0.5)
+    orchestrator = make_orchestrator(paths, routing=routing)
+    detection = ReceiptDetection(is_receipt=True, score=1.0, reason="test")
+    text = "Kaufland\n29.12.2025 12:07\nFrosch Waschmittel 2,99"
+
+    for idx in range(2):
+        _, path, info = orchestrator._route_or_fallback(
+            text=text, ingest_event_id=f"evt-{idx}", source_type="text", detection=detection
+        )
+        assert info["status"] in {"ok_local", "duplicate"}
+        assert path is not None
+    assert orchestrator.receipt_client is not None
+    assert orchestrator.receipt_client.breaker.state == "open"
+    assert orchestrator.receipt_client.connections_opened == 1
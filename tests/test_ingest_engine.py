@@ -1,7 +1,11 @@
+from dataclasses import replace
 from pathlib import Path
 
+import pytest
+
 from datenerfassung.engine import IngestEngine
 from datenerfassung.project_paths import ProjectPaths
+from datenerfassung.storage import DirectStorage, OnDone, set_storage
 
 
 def _write_rules(rules_dir: Path) -> None:
@@ -63,6 +67,14 @@ def _write_rules(rules_dir: Path) -> None:
     )
 
 
+@pytest.fixture
+def rules_paths(paths: ProjectPaths) -> ProjectPaths:
+    # The shared data tree with the test rules above instead of the repository's.
+    rules_dir = paths.data_dir / "rules"
+    _write_rules(rules_dir)
+    return replace(paths, rules_dir=rules_dir)
+
+
 def test_ingest_text_persists_raw_and_canonical(tmp_path: Path) -> None:
     data_dir = tmp_path / "data"
     rules_dir = data_dir / "rules"
@@ -141,3 +153,68 @@ def test_ingest_receipt_json_ingests_structured_payload(tmp_path: Path) -> None:
     assert result.receipt.receipt.merchant.store_id == "DE7450"
     assert any(li.category == "household.cleaning" for li in result.receipt.line_items)
     assert any(li.category == "groceries.deposit" for li in result.receipt.line_items)
+
+
+def test_ingest_many_reports_partial_failures(rules_paths: ProjectPaths) -> None:
+    engine = IngestEngine(rules_paths)
+
+    batch = engine.ingest_many(
+        [
+            {"text": "Kaufland\n29.12.2025 12:07\nWaschmittel 2,99"},
+            {"receipt": {"merchant": {"name": "Kaufland"}, "items": [{"name": "Pfandartikel", "total": 0.25}]}},
+            {"text": "Kaufland", "receipt": {}},
+            {"receipt": {"items": [{"name": ""}]}},
+        ],
+        source_name="pytest",
+    )
+
+    assert batch.ok == 2
+    assert batch.failed == 2
+    assert [item.status for item in batch.items] == ["ok", "ok", "failed", "failed"]
+    assert batch.items[2].error is not None
+
+    for item in batch.items[:2]:
+        assert item.result is not None
+        assert (rules_paths.root / item.result.ingest_event_path).exists()
+        assert (rules_paths.root / (item.result.canonical_receipt_path or "")).exists()
+    assert batch.items[1].result.receipt.line_items[0].category == "groceries.deposit"
+
+
+def test_ingest_many_reports_non_object_items_as_failed(paths: ProjectPaths) -> None:
+    batch = IngestEngine(paths).ingest_many(["Kaufland", {"text": "Kaufland\n29.12.2025 12:07\nWaschmittel 2,99"}, 5])
+
+    assert [item.status for item in batch.items] == ["failed", "ok", "failed"]
+    assert (batch.ok, batch.failed) == (1, 2)
+    assert "valid dictionary" in (batch.items[0].error or "")
+
+
+def test_ingest_many_flushes_per_items_and_reports_failed_flushes(rules_paths: ProjectPaths) -> None:
+    engine = IngestEngine(rules_paths)
+
+    class FlakyStorage(DirectStorage):
+        def __init__(self) -> None:
+            super().__init__()
+            self.commits = 0
+
+        def commit(self, writes: list, *, wait: bool = False, on_done: OnDone | None = None) -> None:
+            self.commits += 1
+            if self.commits == 2:
+                error = OSError("disk full")
+                if on_done is not None:
+                    on_done(error)
+                raise error
+            super().commit(writes, wait=wait, on_done=on_done)
+
+    storage = FlakyStorage()
+    previous = set_storage(storage)
+    try:
+        batch = engine.ingest_many(
+            [{"text": f"Kaufland\n29.12.2025 12:0{i}\nWaschmittel 2,9{i}"} for i in range(5)], flush_every=2
+        )
+    finally:
+        set_storage(previous)
+
+    assert storage.commits == 3
+    assert [item.status for item in batch.items] == ["ok", "ok", "failed", "failed", "ok"]
+    assert (batch.ok, batch.failed) == (3, 2)
+    assert batch.items[2].error == "write failed: disk full"
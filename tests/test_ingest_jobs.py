@@ -0,0 +1,99 @@
+import threading
+import time
+from typing import Any
+
+import pytest
+
+from datenerfassung.project_paths import ProjectPaths
+from datenerfassung.services.ingest_service.jobs import ImageJobQueue, QueueFullError
+from datenerfassung.services.ingest_service.orchestrator import IngestOrchestrator
+
+OCR_TEXT = "Kaufland\n29.12.2025 12:07\nFrosch Waschmittel 2,99\nPfand 0,25"
+
+
+def _wait_for(queue: ImageJobQueue, ingest_event_id: str, timeout_s: float = 10.0) -> str:
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        job = queue.get(ingest_event_id)
+        if job is not None and job.status in {"done", "failed"}:
+            return job.status
+        time.sleep(0.01)
+    raise AssertionError(f"job {ingest_event_id} did not finish")
+
+
+def test_job_queue_processes_image_in_background(
+    paths: ProjectPaths, orchestrator: IngestOrchestrator
+) -> None:
+    queue = ImageJobQueue(orchestrator, workers=2)
+    queue.start()
+    try:
+        job = queue.submit(b"fake-jpeg", filename="bon.jpg", ocr_text=OCR_TEXT)
+        assert job.status == "queued"
+        assert (paths.root / job.raw_image_path).read_bytes() == b"fake-jpeg"
+
+        assert _wait_for(queue, job.ingest_event_id) == "done"
+    finally:
+        queue.stop()
+
+    finished = queue.get(job.ingest_event_id)
+    assert finished is not None and finished.result is not None
+    assert finished.result.status == "ok_local"
+    assert (paths.root / finished.result.ingest_event_path).exists()
+    assert queue.pending == 0
+
+
+def test_job_queue_applies_backpressure(paths: ProjectPaths, orchestrator: IngestOrchestrator) -> None:
+    queue = ImageJobQueue(orchestrator, max_pending=2)
+
+    queue.submit(b"a", ocr_text=OCR_TEXT)
+    queue.submit(b"b", ocr_text=OCR_TEXT)
+    with pytest.raises(QueueFullError):
+        queue.submit(b"c", ocr_text=OCR_TEXT)
+    assert len(list((paths.raw_dir / "images").iterdir())) == 2
+
+
+def test_job_queue_recovers_persisted_jobs_after_restart(orchestrator: IngestOrchestrator) -> None:
+    job = ImageJobQueue(orchestrator).submit(b"fake-jpeg", ocr_text=OCR_TEXT)
+
+    restarted = ImageJobQueue(orchestrator)
+    assert restarted.start() == 1
+    try:
+        assert _wait_for(restarted, job.ingest_event_id) == "done"
+    finally:
+        restarted.stop()
+
+
+class _GatedOrchestrator:
+    # Holds every process_image call until the gate opens.
+    def __init__(self, orchestrator: IngestOrchestrator) -> None:
+        self._orchestrator = orchestrator
+        self.gate = threading.Event()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._orchestrator, name)
+
+    def process_image(self, *args: Any, **kwargs: Any) -> Any:
+        self.gate.wait(10)
+        return self._orchestrator.process_image(*args, **kwargs)
+
+
+def test_job_queue_restarts_after_stop_with_queued_jobs(orchestrator: IngestOrchestrator) -> None:
+    gated = _GatedOrchestrator(orchestrator)
+    queue = ImageJobQueue(gated, workers=1)  # type: ignore[arg-type]
+    queue.start()
+    first = queue.submit(b"a", ocr_text=OCR_TEXT)
+    time.sleep(0.05)  # the worker picks up `first` and waits at the gate
+    second = queue.submit(b"b", ocr_text=OCR_TEXT)
+    threading.Timer(0.05, gated.gate.set).start()
+    queue.stop()  # `second` and the stop sentinel are left in the old queue
+    stopped = queue.get(second.ingest_event_id)
+    assert stopped is not None and stopped.status == "queued"
+
+    assert queue.start() == 1
+    try:
+        third = queue.submit(b"c", ocr_text=OCR_TEXT)
+        for job in (first, second, third):
+            assert _wait_for(queue, job.ingest_event_id) == "done"
+    finally:
+        queue.stop()
+    assert queue.pending == 0
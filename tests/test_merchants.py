@@ -0,0 +1,66 @@
+from pathlib import Path
+
+import pytest
+
+from datenerfassung import engine as engine_module
+from datenerfassung.classification.receipt_detector import detect_receipt
+from datenerfassung.engine import ReceiptEngine
+from datenerfassung.rules.loader import Merchant, MerchantsRules, RuleSet
+from datenerfassung.rules.merchants import MerchantIndex, detect_merchant, match_merchant
+
+RULES_DIR = Path(__file__).resolve().parents[1] / "data" / "rules"
+
+
+def _merchants() -> list[Merchant]:
+    merchants = [
+        Merchant(id="kaufland", names=["Kaufland", "Kaufland Filiale 7450"]),
+        Merchant(id="rewe", names=["REWE", "Rewe Markt"]),
+        Merchant(id="dm", names=["dm-drogerie markt"]),
+        Merchant(id="empty", names=["", "---"]),
+    ]
+    merchants.extend(Merchant(id=f"branch_{i}", names=[f"Filiale Nord {i:04d}"]) for i in range(2000))
+    return merchants
+
+
+def test_merchant_index_matches_linear_scan() -> None:
+    merchants = _merchants()
+    linear = MerchantsRules(merchants=merchants)
+    indexed = MerchantsRules(merchants=merchants, compiled=MerchantIndex(merchants))
+
+    for text in [
+        "REWE Markt GmbH\nSumme 12,00",
+        "Danke für Ihren Einkauf bei Kaufland",
+        "dm-drogerie markt\nREWE Gutschein",
+        "Filiale Nord 1999\nBrot 1,99",
+        "Tankstelle\n29.12.2025",
+        "",
+    ]:
+        assert detect_merchant(text, indexed) == detect_merchant(text, linear)
+
+
+def test_merchant_index_reports_match_position() -> None:
+    merchants = _merchants()
+    rules = MerchantsRules(merchants=merchants, compiled=MerchantIndex(merchants))
+
+    match = match_merchant("einkauf bei rewe markt", rules)
+
+    assert match is not None
+    assert match.merchant.id == "rewe"
+    assert match.start == len("einkauf bei ")
+    assert [m.name for m in rules.compiled.match_all("rewe markt")] == ["rewe", "rewe markt"]
+
+
+def test_parse_text_reuses_merchant_from_detection(monkeypatch: pytest.MonkeyPatch) -> None:
+    engine = ReceiptEngine(RuleSet.load_from_dir(RULES_DIR))
+    text = "Kaufland\n29.12.2025 12:07\nFrosch Waschmittel 2,99\nPfand 0,25"
+    expected = engine.parse_text(text, source_type="text").receipt.merchant
+    detection = detect_receipt(text, engine.ruleset)
+
+    def no_second_scan(text: str, rules: MerchantsRules) -> Merchant | None:
+        raise AssertionError("the text was already cleaned and scanned by detect_receipt")
+
+    monkeypatch.setattr(engine_module, "detect_merchant", no_second_scan)
+    receipt = engine.parse_text(text, source_type="text", detection=detection)
+
+    assert receipt.receipt.merchant == expected
+    assert expected.id == "kaufland"
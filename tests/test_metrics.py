@@ -0,0 +1,84 @@
+from collections.abc import Callable
+
+import pytest
+
+from datenerfassung.metrics import (
+    INGEST_RESULTS,
+    REGISTRY,
+    ROUTE_ERRORS,
+    STAGE_SECONDS,
+    MetricsRegistry,
+    stage_timer,
+)
+from datenerfassung.project_paths import ProjectPaths
+from datenerfassung.services.ingest_service.orchestrator import IngestOrchestrator, RoutingConfig
+
+TEXT = "Kaufland\n29.12.2025 12:07\nFrosch Waschmittel 2,99\nPfand 0,25"
+
+
+def test_registry_renders_prometheus_text() -> None:
+    registry = MetricsRegistry()
+    requests = registry.counter("app_requests", "Requests.", ("status",))
+    latency = registry.histogram("app_latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    requests.inc('ok "quoted"')
+    requests.inc('ok "quoted"')
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(3.0)
+    registry.register_collector("queue", lambda: [("app_queue_depth", "gauge", "Depth.", [("app_queue_depth", {}, 4)])])
+
+    text = registry.render()
+
+    assert "# TYPE app_requests counter" in text
+    assert 'app_requests_total{status="ok \\"quoted\\""} 2' in text
+    assert 'app_latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'app_latency_seconds_bucket{le="1.0"} 2' in text
+    assert 'app_latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "app_latency_seconds_count 3" in text
+    assert "# TYPE app_queue_depth gauge\napp_queue_depth 4" in text
+
+
+def test_stage_timer_is_a_no_op_when_disabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(REGISTRY, "enabled", False)
+    before = STAGE_SECONDS.count("test_stage")
+
+    with stage_timer("test_stage"):
+        pass
+
+    assert STAGE_SECONDS.count("test_stage") == before
+
+
+def test_orchestrator_records_stages_and_statuses(orchestrator: IngestOrchestrator) -> None:
+    ok_before = INGEST_RESULTS.value("text", "ok_local")
+    non_receipt_before = INGEST_RESULTS.value("text", "non_receipt")
+    stages_before = {stage: STAGE_SECONDS.count(stage) for stage in ("detect", "parse", "persist", "write")}
+
+    orchestrator.ingest_text(TEXT)
+    orchestrator.ingest_text("hallo welt")
+
+    assert INGEST_RESULTS.value("text", "ok_local") == ok_before + 1
+    assert INGEST_RESULTS.value("text", "non_receipt") == non_receipt_before + 1
+    assert STAGE_SECONDS.count("detect") == stages_before["detect"] + 2
+    assert STAGE_SECONDS.count("parse") == stages_before["parse"] + 1
+    assert STAGE_SECONDS.count("persist") == stages_before["persist"] + 1
+    assert STAGE_SECONDS.count("write") == stages_before["write"] + 2
+
+
+def test_failed_routing_counts_route_errors(
+    paths: ProjectPaths, make_orchestrator: Callable[..., IngestOrchestrator]
+) -> None:
+    # Nothing listens on the discard port; without fallback the ingest ends as route_failed.
+    routing = RoutingConfig(
+        receipt_service_url="http://127.0.0.1:9", allow_fallback=False, timeout_s=1.0
+    )
+    orchestrator = make_orchestrator(paths, routing=routing)
+    failed_before = INGEST_RESULTS.value("text", "route_failed")
+    errors_before = ROUTE_ERRORS.value()
+    try:
+        result = orchestrator.ingest_text(TEXT)
+    finally:
+        orchestrator.close()
+
+    assert result.status == "route_failed"
+    assert INGEST_RESULTS.value("text", "route_failed") == failed_before + 1
+    assert ROUTE_ERRORS.value() == errors_before + 1
@@ -1,5 +1,9 @@
+import random
+import re
+import unicodedata
+
 from datenerfassung.rules.loader import NormalizationRules
-from datenerfassung.rules.normalization import normalize_name
+from datenerfassung.rules.normalization import clean_text, compile_normalization, normalize_name
 
 
 def test_normalize_name_applies_stopwords_and_synonyms() -> None:
@@ -14,3 +18,93 @@ def test_normalize_name_applies_stopwords_and_synonyms() -> None:
     assert tokens == ["milch"]
     assert name_norm == "milch"
 
+
+
+def test_compiled_normalization_matches_sequential_synonyms() -> None:
+    rules = NormalizationRules(
+        stopwords={"bio", "k"},
+        synonyms={
+            "h-milch": "milch",
+            "champig": "champignon",
+            "champignons": "champignon",
+            "milch 3 5": "vollmilch",
+            "vollmilch": "milch voll",
+            "Äpfel": "apfel",
+            "a": "b",
+            "b c": "d",
+        },
+    )
+    compiled = NormalizationRules(
+        stopwords=rules.stopwords, synonyms=rules.synonyms, compiled=compile_normalization(rules)
+    )
+
+    for name in [
+        "KBio H-Milch",
+        "H-MILCH 3,5%",
+        "Champig. braun",
+        "Champignons  weiss",
+        "ÄPFEL rot",
+        "a c",
+        "c a  a c",
+        "",
+        "---",
+    ]:
+        assert normalize_name(name, compiled) == normalize_name(name, rules)
+
+
+def test_compiled_normalization_caches_repeated_names() -> None:
+    compiled = compile_normalization(NormalizationRules(stopwords={"bio"}, synonyms={"h-milch": "milch"}))
+
+    first = compiled.normalize("Bio H-Milch")
+    first[1].append("mutated")
+    second = compiled.normalize("Bio H-Milch")
+
+    assert second == ("bio milch", ["milch"], "milch")
+    assert compiled.cache_info().hits == 1
+
+
+def _reference_clean_text(value: str) -> str:
+    # clean_text before the ASCII fast path / translate table, kept as the oracle.
+    value = value.casefold()
+    value = unicodedata.normalize("NFKD", value)
+    value = "".join(ch for ch in value if not unicodedata.combining(ch))
+    value = re.sub(r"[^0-9a-zA-Z]+", " ", value)
+    return re.sub(r"\s+", " ", value).strip()
+
+
+def _random_texts(rng: random.Random, count: int) -> list[str]:
+    pools = [
+        "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789",
+        " \t\n\r\x0b\x0c\x1c\x1f-.,;:%/*#()&'\"",
+        "äöüÄÖÜßẞéèêëÉÈçñøØåÅæœŒłŁıİſﬆﬁµΣσςΩÅK€£§°²³½¼",
+        "\u0300\u0301\u0308\u0327\u0338\u20dd\u00a0\u2009\u200b\u3000\u2013\u2014\u201e\u201c",
+        "ℌℍℕ①⑴ＡＺａｚ０９㎏㍱ﾊﾟ가힣ǅǈ",
+    ]
+    texts = []
+    for _ in range(count):
+        length = rng.randint(0, 40)
+        chars = []
+        for _ in range(length):
+            if rng.random() < 0.1:
+                chars.append(chr(rng.randint(0x80, 0x2FFFF)))
+            else:
+                chars.append(rng.choice(rng.choice(pools)))
+        texts.append("".join(chars))
+    return texts
+
+
+def test_clean_text_matches_reference_on_random_corpus() -> None:
+    rng = random.Random(20251229)
+    texts = _random_texts(rng, 20000)
+    # Long inputs bypass the cache; repeated ones hit it.
+    texts += ["".join(rng.sample(texts, 20)) for _ in range(200)]
+    texts += texts[:500]
+
+    for text in texts:
+        assert clean_text(text) == _reference_clean_text(text), repr(text)
+
+
+def test_clean_text_examples() -> None:
+    assert clean_text("KBio H-Milch 3,5%") == "kbio h milch 3 5"
+    assert clean_text("Straße Äpfel Crème") == "strasse apfel creme"
+    assert clean_text("  ---  ") == ""
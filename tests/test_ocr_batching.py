@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from datenerfassung.ocr import pool as pool_module
+from datenerfassung.ocr.paddleocr_backend import PaddleOcrConfig, ocr_images
+from datenerfassung.ocr.pool import OcrWorkerPool
+
+
+class FakeOcr:
+    # Stands in for PaddleOCR's predict(): "images" are text files, one recognized line per file line.
+    # Each result also reports the size of the inference batch it was part of.
+    def __init__(self) -> None:
+        self.calls: list[int] = []
+
+    def predict(self, inputs: str | list[str]) -> list[dict]:
+        paths = [inputs] if isinstance(inputs, str) else list(inputs)
+        self.calls.append(len(paths))
+        pages = []
+        for path in paths:
+            lines = Path(path).read_text(encoding="utf-8").splitlines()
+            if lines and lines[0] == "CORRUPT":
+                raise ValueError(f"cannot decode {path}")
+            texts = [*lines, f"#batch={len(paths)}"]
+            boxes = [[0, 10 * i, 100, 10 * i + 8] for i in range(len(texts))]
+            pages.append({"rec_texts": texts, "rec_boxes": boxes})
+        return pages
+
+
+def fake_factory(config: PaddleOcrConfig) -> FakeOcr:
+    return FakeOcr()
+
+
+def _images(tmp_path: Path, count: int) -> list[Path]:
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"bon_{i}.jpg"
+        path.write_text(f"Kaufland\nArtikel {i} 1,99", encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def _strip_marker(text: str) -> str:
+    return "\n".join(ln for ln in text.splitlines() if not ln.startswith("#batch="))
+
+
+def test_ocr_images_feeds_batches_to_the_model(tmp_path: Path) -> None:
+    fake = FakeOcr()
+    paths = _images(tmp_path, 7)
+
+    texts = ocr_images(paths, batch_size=3, ocr=fake)
+
+    assert fake.calls == [3, 3, 1]
+    assert [_strip_marker(t) for t in texts] == [f"Kaufland\nArtikel {i} 1,99" for i in range(7)]
+
+
+def test_ocr_images_requires_existing_files(tmp_path: Path) -> None:
+    with pytest.raises(FileNotFoundError):
+        ocr_images([tmp_path / "missing.jpg"], ocr=FakeOcr())
+
+
+def test_worker_pool_coalesces_requests_and_keeps_order(tmp_path: Path) -> None:
+    paths = _images(tmp_path, 8)
+    corrupt = tmp_path / "corrupt.jpg"
+    corrupt.write_text("CORRUPT", encoding="utf-8")
+
+    with OcrWorkerPool(workers=2, batch_size=4, max_wait_s=0.5, factory=fake_factory) as pool:
+        texts = pool.ocr_images(paths)
+        failing = pool.submit(corrupt)
+        neighbour = pool.submit(paths[0])
+
+        with pytest.raises(RuntimeError):
+            failing.result()
+        assert _strip_marker(neighbour.result()) == "Kaufland\nArtikel 0 1,99"
+
+    assert [_strip_marker(t) for t in texts] == [f"Kaufland\nArtikel {i} 1,99" for i in range(8)]
+    assert max(int(t.rsplit("#batch=", 1)[1]) for t in texts) > 1
+
+
+def test_failed_batch_is_logged_before_retrying_per_image(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    corrupt = tmp_path / "corrupt.jpg"
+    corrupt.write_text("CORRUPT", encoding="utf-8")
+    monkeypatch.setattr(pool_module, "_worker_ocr", FakeOcr())
+
+    with caplog.at_level("WARNING", logger="datenerfassung.ocr.pool"):
+        results = pool_module._ocr_batch([str(corrupt), *map(str, _images(tmp_path, 2))], 3)
+
+    assert isinstance(results[0], RuntimeError)
+    assert [_strip_marker(str(text)) for text in results[1:]] == [
+        f"Kaufland\nArtikel {i} 1,99" for i in range(2)
+    ]
+    assert "OCR batch of 3 images failed" in caplog.text
+    assert "cannot decode" in caplog.text
+
+
+def broken_factory(config: PaddleOcrConfig) -> FakeOcr:
+    raise ValueError("corrupt model dir")
+
+
+def test_worker_pool_warm_up_failure_does_not_raise(tmp_path: Path) -> None:
+    pool = OcrWorkerPool(workers=1, factory=broken_factory)
+    try:
+        pool.start(warm_up=True)
+
+        assert isinstance(pool.warm_up_error, ValueError)
+        with pytest.raises(ValueError, match="corrupt model dir"):
+            pool.ocr_image_path(_images(tmp_path, 1)[0])
+    finally:
+        pool.close()
+
+
+def test_batch_result_count_mismatch_is_logged(tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    class MergingOcr(FakeOcr):
+        def predict(self, inputs: str | list[str]) -> list[dict]:
+            pages = super().predict(inputs)
+            return pages[:1] if isinstance(inputs, list) else pages
+
+    fake = MergingOcr()
+    with caplog.at_level("WARNING", logger="datenerfassung.ocr.paddleocr_backend"):
+        texts = ocr_images(_images(tmp_path, 3), batch_size=3, ocr=fake)
+
+    assert fake.calls == [3, 1, 1, 1]
+    assert len(texts) == 3
+    assert "3 images" in caplog.text
@@ -0,0 +1,91 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from datenerfassung.engine import ReceiptEngine
+from datenerfassung.ocr.cache import OcrCache, cache_key
+from datenerfassung.ocr.paddleocr_backend import PaddleOcrConfig
+from datenerfassung.project_paths import ProjectPaths
+from datenerfassung.rules.loader import RuleSet
+from datenerfassung.services.ingest_service import orchestrator as orchestrator_module
+from datenerfassung.services.ingest_service.orchestrator import IngestOrchestrator
+
+
+def test_cache_key_depends_on_config() -> None:
+    digest = "ab" * 32
+    assert cache_key(digest, PaddleOcrConfig()) == cache_key(digest, PaddleOcrConfig())
+    assert cache_key(digest, PaddleOcrConfig()) != cache_key(digest, PaddleOcrConfig(lang="en"))
+    assert cache_key(digest, PaddleOcrConfig()) != cache_key(digest, PaddleOcrConfig(use_angle_cls=False))
+
+
+def test_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    cache = OcrCache(tmp_path / "ocr_cache", max_entries=2)
+    cache.put("aa01", "first")
+    cache.put("bb02", "second")
+    assert cache.get("aa01") == "first"
+
+    cache.put("cc03", "third")
+
+    assert cache.get("bb02") is None
+    assert cache.get("cc03") == "third"
+    stats = cache.stats()
+    assert (stats.entries, stats.hits, stats.misses, stats.evictions) == (2, 2, 1, 1)
+
+    reopened = OcrCache(tmp_path / "ocr_cache", max_entries=2)
+    assert reopened.get("aa01") == "first"
+
+
+def test_duplicate_image_skips_ocr(paths: ProjectPaths, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("HOUSEHOLD_RECEIPT_SERVICE_URL", "")
+    calls: list[Path] = []
+
+    def fake_ocr(image_path: Path, *, config: PaddleOcrConfig | None = None) -> str:
+        calls.append(image_path)
+        return "Kaufland\nPfand 0,25"
+
+    monkeypatch.setattr(orchestrator_module, "ocr_image_path", fake_ocr)
+
+    ruleset = RuleSet.load_from_dir(paths.rules_dir)
+    cache = OcrCache(paths.data_dir / "ocr_cache")
+    orchestrator = IngestOrchestrator(
+        paths=paths, ruleset=ruleset, receipt_engine=ReceiptEngine(ruleset), ocr_cache=cache
+    )
+
+    first = orchestrator.ingest_image(b"same-photo", filename="bon.jpg")
+    second = orchestrator.ingest_image(b"same-photo", filename="bon_again.jpg")
+    orchestrator.ingest_image(b"other-photo", filename="bon2.jpg")
+
+    assert first.status == second.status == "ok_local"
+    assert len(calls) == 2
+    assert cache.stats().hits == 1
+
+
+def test_concurrent_puts_of_one_key_do_not_collide(tmp_path: Path) -> None:
+    cache = OcrCache(tmp_path / "ocr_cache")
+    texts = [f"Kaufland\n{i}" * 2000 for i in range(8)]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda text: cache.put("ab01", text), texts * 4))
+
+    assert cache.get("ab01") in texts
+    assert [p.name for p in (tmp_path / "ocr_cache" / "ab").iterdir()] == ["ab01.txt"]
+
+
+def test_cache_write_failure_keeps_the_ocr_text(paths: ProjectPaths, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("HOUSEHOLD_RECEIPT_SERVICE_URL", "")
+    monkeypatch.setattr(
+        orchestrator_module, "ocr_image_path", lambda image_path, *, config=None: "Kaufland\nPfand 0,25"
+    )
+
+    def full_disk(key: str, text: str) -> None:
+        raise OSError(28, "No space left on device")
+
+    ruleset = RuleSet.load_from_dir(paths.rules_dir)
+    cache = OcrCache(paths.data_dir / "ocr_cache")
+    monkeypatch.setattr(cache, "put", full_disk)
+    orchestrator = IngestOrchestrator(
+        paths=paths, ruleset=ruleset, receipt_engine=ReceiptEngine(ruleset), ocr_cache=cache
+    )
+
+    assert orchestrator.ingest_image(b"photo", filename="bon.jpg").status == "ok_local"
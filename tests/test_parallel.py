@@ -0,0 +1,87 @@
+from pathlib import Path
+
+from datenerfassung.engine import IngestEngine
+from datenerfassung.parallel import ParseError, ParseJob, ReceiptEnginePool
+from datenerfassung.project_paths import ProjectPaths
+
+RULES_DIR = Path(__file__).resolve().parents[1] / "data" / "rules"
+
+
+def _texts(count: int) -> list[str]:
+    return [f"Kaufland\n29.12.2025 12:{i % 60:02d}\nH-Milch {i % 9 + 1},99\nPfand 0,25" for i in range(count)]
+
+
+def _stable(receipt) -> list[tuple]:
+    return [(li.name_norm, li.total, li.category) for li in receipt.line_items] + [
+        (receipt.receipt.datetime, receipt.receipt.merchant.id, receipt.totals.total)
+    ]
+
+
+def test_pool_results_are_ordered_and_match_serial() -> None:
+    texts = _texts(50)
+
+    with ReceiptEnginePool(RULES_DIR, workers=1) as serial:
+        expected = [_stable(r) for r in serial.parse_many(texts)]
+    with ReceiptEnginePool(RULES_DIR, workers=2, chunk_size=7, max_pending_chunks=2) as pool:
+        actual = [_stable(r) for r in pool.parse_many(texts)]
+
+    assert actual == expected
+
+
+def test_pool_reports_failures_in_place() -> None:
+    jobs = [ParseJob(text="Kaufland\nBrot 1,99"), ParseJob(text="Kaufland\n31.02.2025\nBrot 1,99")]
+
+    with ReceiptEnginePool(RULES_DIR, workers=2) as pool:
+        results = list(pool.parse_many(jobs, return_exceptions=True))
+
+    assert not isinstance(results[0], ParseError)
+    assert isinstance(results[1], ParseError)
+
+
+def test_ingest_many_with_pool(paths: ProjectPaths) -> None:
+    engine = IngestEngine(paths)
+
+    items = [{"text": t} for t in _texts(5)] + [{"text": "Kaufland\n31.02.2025\nBrot 1,99"}]
+    with ReceiptEnginePool(RULES_DIR, workers=2, chunk_size=2) as pool:
+        result = engine.ingest_many(items, pool=pool)
+
+    assert result.ok == 5
+    assert result.failed == 1
+    for item in result.items[:5]:
+        assert item.result is not None
+        assert item.result.receipt.provenance.ingest_event_id == item.result.ingest_event_id
+        assert (paths.root / item.result.canonical_receipt_path).exists()
+    assert (paths.root / result.items[0].result.raw_text_path).exists()
+
+
+def test_ingest_many_with_pool_streams_items(paths: ProjectPaths) -> None:
+    engine = IngestEngine(paths)
+    pulled = 0
+    handled = 0
+    ahead: list[int] = []
+
+    def items():
+        nonlocal pulled
+        for i, text in enumerate(_texts(40)):
+            ahead.append(pulled - handled)
+            pulled += 1
+            yield {"receipt": {"merchant": {"name": "Kaufland"}, "items": []}} if i % 5 == 0 else {"text": text}
+
+    ingest_item, ingest_text = engine._ingest_item, engine._ingest_text
+
+    def counted(fn):
+        def wrapper(*args, **kwargs):
+            nonlocal handled
+            handled += 1
+            return fn(*args, **kwargs)
+
+        return wrapper
+
+    engine._ingest_item = counted(ingest_item)
+    engine._ingest_text = counted(ingest_text)
+    with ReceiptEnginePool(RULES_DIR, workers=2, chunk_size=2, max_pending_chunks=2) as pool:
+        result = engine.ingest_many(items(), pool=pool, keep_receipts=False)
+
+    assert (result.ok, result.failed) == (40, 0)
+    assert max(ahead) <= 4
+    assert all(item.result.receipt is None for item in result.items)
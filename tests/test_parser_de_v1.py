@@ -0,0 +1,37 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from datenerfassung.receipt.parser_de_v1 import ParsedReceipt, parse_receipt_text
+
+# Expected outputs were recorded from the original multi-pass parser; the single-pass scanner must
+# reproduce them exactly.
+GOLDEN = json.loads(
+    (Path(__file__).resolve().parent / "fixtures" / "parser_de_v1_golden.json").read_text(encoding="utf-8")
+)
+
+
+def _dump(parsed: ParsedReceipt) -> dict:
+    return {
+        "merchant_name_hint": parsed.merchant_name_hint,
+        "datetime_hint": parsed.datetime_hint.isoformat() if parsed.datetime_hint else None,
+        "lines": [[li.name_raw, li.quantity, li.unit_price, li.total] for li in parsed.lines],
+    }
+
+
+@pytest.mark.parametrize("case", GOLDEN, ids=[case["name"] for case in GOLDEN])
+def test_parser_matches_golden_output(case: dict) -> None:
+    if "error" in case["expected"]:
+        with pytest.raises(ValueError):
+            parse_receipt_text(case["text"])
+        return
+    assert _dump(parse_receipt_text(case["text"])) == case["expected"]
+
+
+@pytest.mark.parametrize("case", GOLDEN, ids=[case["name"] for case in GOLDEN])
+def test_streamed_lines_match_whole_text(case: dict) -> None:
+    if "error" in case["expected"]:
+        return
+    lines = iter(case["text"].splitlines(keepends=True))
+    assert _dump(parse_receipt_text(lines)) == case["expected"]
@@ -0,0 +1,68 @@
+import json
+from collections.abc import Callable
+from pathlib import Path
+
+from datenerfassung.profiling import ProfilingConfig, RequestProfile
+from datenerfassung.project_paths import ProjectPaths
+from datenerfassung.rules.categorization import categorize
+from datenerfassung.rules.loader import RuleSet
+from datenerfassung.rules.normalization import normalize_name
+from datenerfassung.services.ingest_service.orchestrator import IngestOrchestrator
+
+TEXT = "Kaufland\n29.12.2025 12:07\nFrosch Waschmittel 2,99\nPfand 0,25"
+
+
+def test_requested_profile_is_written_next_to_the_ingest_event(
+    tmp_path: Path, paths: ProjectPaths, make_orchestrator: Callable[..., IngestOrchestrator]
+) -> None:
+    orchestrator = make_orchestrator(paths, profiling=ProfilingConfig(sample_percent=0.0))
+
+    result = orchestrator.ingest_text(TEXT, profile=True)
+
+    event = json.loads((tmp_path / result.ingest_event_path).read_text(encoding="utf-8"))
+    assert event["profile_path"] == f"data/raw/profiles/{result.ingest_event_id}.json"
+    profile = json.loads((tmp_path / event["profile_path"]).read_text(encoding="utf-8"))
+    assert profile["ingest_event_id"] == result.ingest_event_id
+    assert profile["rules_hash"] == orchestrator.receipt_engine.ruleset.hash
+    assert {"detect", "parse", "parse.normalize", "parse.categorize", "persist"} <= set(profile["stages_ms"])
+    assert profile["rules"]
+    assert sorted(line["name_raw"] for line in profile["slowest_lines"]) == sorted(
+        item.name_raw for item in result.receipt.line_items
+    )
+
+
+def test_unsampled_requests_are_not_profiled(
+    tmp_path: Path,
+    paths: ProjectPaths,
+    make_paths: Callable[[Path], ProjectPaths],
+    make_orchestrator: Callable[..., IngestOrchestrator],
+) -> None:
+    orchestrator = make_orchestrator(paths, profiling=ProfilingConfig(sample_percent=0.0))
+    sampled_all = make_orchestrator(
+        make_paths(tmp_path / "all"), profiling=ProfilingConfig(sample_percent=100.0)
+    )
+    header_ignored = make_orchestrator(
+        make_paths(tmp_path / "ignored"), profiling=ProfilingConfig(allow_header=False)
+    )
+
+    plain = orchestrator.ingest_text(TEXT)
+    opted_out = sampled_all.ingest_text(TEXT, profile=False)
+    ignored = header_ignored.ingest_text(TEXT, profile=True)
+    sampled = sampled_all.ingest_text("hallo welt")
+
+    for root, result in ((tmp_path, plain), (tmp_path / "all", opted_out), (tmp_path / "ignored", ignored)):
+        event = json.loads((root / result.ingest_event_path).read_text(encoding="utf-8"))
+        assert "profile_path" not in event
+    assert not (tmp_path / "data" / "raw" / "profiles").exists()
+    assert (tmp_path / "all" / "data" / "raw" / "profiles" / f"{sampled.ingest_event_id}.json").exists()
+
+
+def test_profiled_categorization_matches_unprofiled(paths: ProjectPaths) -> None:
+    ruleset = RuleSet.load_from_dir(paths.rules_dir)
+    profile = RequestProfile("test", source_type="text")
+    for name in ("Frosch Waschmittel", "Pfand", "Bio Vollmilch 3,5%", "Unbekannter Artikel"):
+        name_clean, tokens, _ = normalize_name(name, ruleset.normalization)
+        assert categorize(name_clean, tokens, ruleset.categories, profile=profile) == categorize(
+            name_clean, tokens, ruleset.categories
+        )
+    assert profile.rules or profile.stages
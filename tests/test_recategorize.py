@@ -0,0 +1,76 @@
+import dataclasses
+import json
+import shutil
+
+from datenerfassung.engine import IngestEngine
+from datenerfassung.project_paths import ProjectPaths
+from datenerfassung.recategorize import diff_rules, recategorize_receipts
+from datenerfassung.rules.loader import CategoryRule, RuleSet
+
+TEXTS = [
+    "Kaufland\n29.12.2025 12:07\nFrosch Waschmittel 2,99\nPfand 0,25",
+    "Kaufland\n30.12.2025 18:30\nFrosch Reiniger 1,99\nBananen 1,29",
+]
+
+
+def _with_own_rules(paths: ProjectPaths) -> ProjectPaths:
+    # A copy of the rules the test can edit.
+    rules_dir = paths.root / "rules"
+    shutil.copytree(paths.rules_dir, rules_dir)
+    return dataclasses.replace(paths, rules_dir=rules_dir)
+
+
+def _items(paths: ProjectPaths) -> dict[str, dict]:
+    items = {}
+    for path in (paths.canonical_dir / "receipts").rglob("*.json"):
+        for item in json.loads(path.read_text(encoding="utf-8"))["line_items"]:
+            items[item["name_raw"]] = item
+    return items
+
+
+def test_diff_rules_detects_added_removed_changed_and_reordering() -> None:
+    a = CategoryRule(id="a", priority=10, when_any=[{"contains_any": ["x"]}], then={"category": "c1"})
+    b = CategoryRule(id="b", priority=10, when_any=[{"contains_any": ["y"]}], then={"category": "c2"})
+    c = CategoryRule(id="c", priority=5, when_any=[{"contains_any": ["z"]}], then={"category": "c3"})
+    a2 = CategoryRule(id="a", priority=10, when_any=[{"contains_any": ["x"]}], then={"category": "c9"})
+    d = CategoryRule(id="d", priority=1, when_any=[], then={"category": "c4"})
+
+    diff = diff_rules([a, b, c], [a2, b, d])
+    assert (diff.added, diff.removed, diff.changed, diff.reordered) == ({"d"}, {"c"}, {"a"}, False)
+    assert diff_rules([a, b], [b, a]).reordered
+    assert diff_rules([a, b], [a, b]).empty
+
+
+def test_recategorize_rewrites_only_affected_items_and_resumes(paths: ProjectPaths) -> None:
+    paths = _with_own_rules(paths)
+    engine = IngestEngine(paths, duplicate_policy=None)
+    for text in TEXTS:
+        engine.ingest_text(text)
+    before = _items(paths)
+    assert before["Frosch Waschmittel"]["category"] == "household.cleaning"
+
+    categories = paths.rules_dir / "categories.yml"
+    categories.write_text(
+        categories.read_text(encoding="utf-8").replace("household.cleaning", "household.laundry"), encoding="utf-8"
+    )
+    ruleset = RuleSet.load_from_dir(paths.rules_dir)
+    result = recategorize_receipts(
+        paths.canonical_dir, ruleset, rules_dir=paths.rules_dir, chunk_receipts=1, index=engine.receipt_index
+    )
+
+    after = _items(paths)
+    cleaning_rule = before["Frosch Waschmittel"]["classification"]["rule_id"]
+    assert result.receipts_scanned == 2 and result.receipts_changed == 2 and result.receipts_full == 0
+    assert result.changed_by_rule == {cleaning_rule: 2}
+    # Only the two items of the changed rule were looked at, not every stored line item.
+    assert result.items_evaluated == result.items_changed == 2 < len(after)
+    assert after["Frosch Waschmittel"]["category"] == after["Frosch Reiniger"]["category"] == "household.laundry"
+    assert after["Pfand"] == before["Pfand"]
+    stats = engine.receipt_index.category_stats(by_month=False)
+    assert {row["category"] for row in stats} >= {"household.laundry"}
+    assert "household.cleaning" not in {row["category"] for row in stats}
+
+    again = recategorize_receipts(paths.canonical_dir, ruleset, rules_dir=paths.rules_dir)
+    assert again.receipts_resumed == 2 and again.receipts_scanned == 0
+    restarted = recategorize_receipts(paths.canonical_dir, ruleset, rules_dir=paths.rules_dir, resume=False)
+    assert restarted.receipts_scanned == 2 and restarted.items_evaluated == 0
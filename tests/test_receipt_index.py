@@ -0,0 +1,55 @@
+from pathlib import Path
+
+from datenerfassung.engine import IngestEngine
+from datenerfassung.project_paths import ProjectPaths
+from datenerfassung.receipt_index import ReceiptIndex
+
+KAUFLAND = "Kaufland\n29.12.2025 12:07\nFrosch Waschmittel 2,99\nPfand 0,25"
+REWE = "REWE Markt\n03.01.2026 09:15\nVollmilch 1,19\nBrot 2,49"
+
+
+def test_index_is_updated_on_ingest_and_filters(paths: ProjectPaths) -> None:
+    engine = IngestEngine(paths)
+    kaufland = engine.ingest_text(KAUFLAND)
+    rewe = engine.ingest_text(REWE)
+    index = engine.receipt_index
+    assert index is not None and len(index) == 2
+
+    rows = index.query_receipts()
+    assert [r["receipt_id"] for r in rows] == [rewe.receipt.receipt.id, kaufland.receipt.receipt.id]
+    assert rows[0]["path"] == rewe.canonical_receipt_path
+
+    merchant = kaufland.receipt.receipt.merchant
+    by_merchant = index.query_receipts(merchant=(merchant.id or merchant.name).upper())
+    assert [r["receipt_id"] for r in by_merchant] == [kaufland.receipt.receipt.id]
+
+    in_2025 = index.query_receipts(date_from="2025-12-01", date_to="2025-12-31")
+    assert [r["receipt_id"] for r in in_2025] == [kaufland.receipt.receipt.id]
+
+    stats = index.category_stats(by_month=False)
+    assert sum(s["items"] for s in stats) == len(kaufland.receipt.line_items) + len(rewe.receipt.line_items)
+    expected = sum(li.total or 0 for r in (kaufland, rewe) for li in r.receipt.line_items)
+    assert round(sum(s["total"] for s in stats), 2) == round(expected, 2)
+    assert {s["month"] for s in index.category_stats()} == {"2025-12", "2026-01"}
+
+
+def test_overwrite_and_rebuild_keep_index_consistent(tmp_path: Path, paths: ProjectPaths) -> None:
+    engine = IngestEngine(paths, duplicate_policy="overwrite")
+    engine.ingest_text(KAUFLAND)
+    latest = engine.ingest_text(KAUFLAND)
+    index = engine.receipt_index
+    assert index is not None
+
+    rows = index.query_receipts()
+    assert [r["receipt_id"] for r in rows] == [latest.receipt.receipt.id]
+    incremental = index.category_stats()
+    assert sum(s["items"] for s in incremental) == len(latest.receipt.line_items)
+
+    rebuilt = ReceiptIndex(tmp_path / "rebuilt.sqlite3", root=tmp_path)
+    assert rebuilt.rebuild(paths.canonical_dir) == 1
+    assert rebuilt.query_receipts() == rows
+    assert rebuilt.category_stats() == incremental
+
+    index.remove(tmp_path / latest.canonical_receipt_path)
+    assert len(index) == 0
+    assert index.category_stats() == []
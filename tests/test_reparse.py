@@ -0,0 +1,83 @@
+import json
+
+from datenerfassung.engine import IngestEngine
+from datenerfassung.project_paths import ProjectPaths
+from datenerfassung.reparse import reparse_events
+
+TEXTS = [
+    "Kaufland\n29.12.2025 12:07\nFrosch Waschmittel 2,99\nPfand 0,25",
+    "Kaufland\n30.12.2025 18:30\nFrosch Reiniger 1,99\nBananen 1,29",
+]
+
+
+def _reparse(engine: IngestEngine, **kwargs: object):
+    paths = engine.paths
+    return reparse_events(
+        paths.root,
+        paths.raw_dir,
+        paths.canonical_dir,
+        engine.receipt_engine,
+        rules_dir=paths.rules_dir,
+        index=engine.receipt_index,
+        **kwargs,
+    )
+
+
+def test_reparse_rewrites_only_changed_receipts_and_skips_known_hashes(paths: ProjectPaths) -> None:
+    engine = IngestEngine(paths)
+    first, second = (engine.ingest_text(text) for text in TEXTS)
+    root = engine.paths.root
+    untouched = (root / second.canonical_receipt_path).read_text(encoding="utf-8")
+
+    result = _reparse(engine)
+    assert (result.changed, result.unchanged, result.up_to_date) == (0, 2, 0)
+    assert (root / second.canonical_receipt_path).read_text(encoding="utf-8") == untouched
+
+    # Stand-in for a parser fix: the same event now yields a different date and an extra item.
+    raw_text = root / first.raw_text_path
+    raw_text.write_text(TEXTS[0].replace("29.12.2025", "28.12.2025") + "\nBananen 1,29", encoding="utf-8")
+    result = _reparse(engine, chunk_events=1)
+
+    assert (result.changed, result.unchanged, result.up_to_date) == (1, 0, 1)
+    assert not (root / first.canonical_receipt_path).exists()
+    [row] = [r for r in engine.receipt_index.query_receipts() if r["receipt_id"] == first.receipt.receipt.id]
+    moved = json.loads((root / row["path"]).read_text(encoding="utf-8"))
+    assert moved["receipt"]["datetime"].startswith("2025-12-28")
+    assert moved["line_items"][0]["line_id"] == first.receipt.line_items[0].line_id
+    assert moved["provenance"]["parser_version"] == "1"
+    assert len(engine.receipt_index) == 2
+
+    assert _reparse(engine).up_to_date == 2
+    assert _reparse(engine, restart=True).unchanged == 2
+
+
+def test_reparse_keeps_ingest_time_of_undated_receipts(paths: ProjectPaths) -> None:
+    engine = IngestEngine(paths)
+    undated = "Kaufland\nFrosch Waschmittel 2,99\nPfand 0,25"
+    first = engine.ingest_text(undated)
+    root = engine.paths.root
+    stamped = first.receipt.receipt.datetime
+
+    # An item the parser now reads: the receipt changes but must keep its ingest time and path.
+    (root / first.raw_text_path).write_text(undated + "\nBananen 1,29", encoding="utf-8")
+    result = _reparse(engine, duplicates=engine.duplicates)
+
+    assert result.changed == 1
+    data = json.loads((root / first.canonical_receipt_path).read_text(encoding="utf-8"))
+    assert data["receipt"]["datetime"] == stamped
+    assert data["receipt"]["datetime_source"] == "ingest"
+    assert len(data["line_items"]) == len(first.receipt.line_items) + 1
+
+
+def test_reparse_drops_stale_fingerprints(paths: ProjectPaths) -> None:
+    engine = IngestEngine(paths)
+    first = engine.ingest_text(TEXTS[0])
+    (paths.root / first.raw_text_path).write_text(TEXTS[0] + "\nBananen 1,29", encoding="utf-8")
+
+    assert _reparse(engine, duplicates=engine.duplicates).changed == 1
+
+    # The old content's fingerprint is gone, the new one points at the rewritten receipt.
+    assert engine.ingest_text(TEXTS[0]).status == "ok"
+    again = engine.ingest_text(TEXTS[0] + "\nBananen 1,29")
+    assert again.status == "duplicate"
+    assert again.canonical_receipt_path == first.canonical_receipt_path
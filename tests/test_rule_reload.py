@@ -0,0 +1,60 @@
+import os
+import shutil
+from pathlib import Path
+
+from datenerfassung.engine import ReceiptEngine
+from datenerfassung.rules.loader import RuleSet
+from datenerfassung.rules.reload import RuleReloader
+
+RULES_DIR = Path(__file__).resolve().parents[1] / "data" / "rules"
+TEXT = "Kaufland\n29.12.2025 12:07\nFrosch Waschmittel 2,99\nPfand 0,25"
+
+
+def _touch(path: Path, text: str) -> None:
+    path.write_text(text, encoding="utf-8")
+    # Make the change visible to mtime polling even on coarse-grained filesystems.
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def _category(receipt, name_raw: str) -> str | None:
+    return next(li.category for li in receipt.line_items if li.name_raw == name_raw)
+
+
+def test_reload_swaps_rules_and_records_them_in_provenance(tmp_path: Path) -> None:
+    rules_dir = tmp_path / "rules"
+    shutil.copytree(RULES_DIR, rules_dir)
+    engine = ReceiptEngine(RuleSet.load_from_dir(rules_dir))
+    reloader = RuleReloader(engine, rules_dir, poll_interval_s=0)
+
+    before = engine.parse_text(TEXT, source_type="text")
+    assert _category(before, "Frosch Waschmittel") == "household.cleaning"
+    assert before.provenance.rules_hash == engine.ruleset.hash
+    assert "categories=1" in (before.provenance.rules_version or "")
+    assert reloader.check() is None
+
+    categories = rules_dir / "categories.yml"
+    _touch(categories, categories.read_text(encoding="utf-8").replace("household.cleaning", "household.laundry"))
+    result = reloader.check()
+
+    assert result is not None and result.status == "reloaded"
+    assert result.previous_hash == before.provenance.rules_hash
+    after = engine.parse_text(TEXT, source_type="text")
+    assert _category(after, "Frosch Waschmittel") == "household.laundry"
+    assert after.provenance.rules_hash == result.hash != before.provenance.rules_hash
+
+
+def test_broken_rules_keep_current_ruleset(tmp_path: Path) -> None:
+    rules_dir = tmp_path / "rules"
+    shutil.copytree(RULES_DIR, rules_dir)
+    engine = ReceiptEngine(RuleSet.load_from_dir(rules_dir))
+    current = engine.ruleset
+    reloader = RuleReloader(engine, rules_dir, poll_interval_s=0)
+
+    _touch(rules_dir / "merchants.yml", "merchants: [unclosed")
+    result = reloader.check()
+
+    assert result is not None and result.status == "failed" and result.error
+    assert engine.ruleset is current
+    assert reloader.check() is None
+    assert reloader.reload().status == "failed"
@@ -0,0 +1,121 @@
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+from datenerfassung.project_paths import ProjectPaths
+from datenerfassung.services.ingest_service.orchestrator import IngestOrchestrator
+from datenerfassung.storage import (
+    DirectStorage,
+    StorageConfig,
+    WriteBatch,
+    WriteBehindStorage,
+    set_storage,
+    write_json_atomic,
+)
+
+TEXT = "Kaufland\n29.12.2025 12:07\nFrosch Waschmittel 2,99\nPfand 0,25"
+
+
+def test_write_behind_groups_queued_commits_and_drains_on_close(tmp_path: Path) -> None:
+    storage = WriteBehindStorage(durability="none", group_delay_s=0.2)
+    groups: list[int] = []
+    write_group = storage._dirs.write_group
+
+    def record(writes, *, fsync):
+        groups.append(len(writes))
+        write_group(writes, fsync=fsync)
+
+    storage._dirs.write_group = record
+    for i in range(6):
+        storage.commit([(tmp_path / "a" / f"{i}.txt", str(i).encode())])
+    storage.close()
+
+    assert sum(groups) == 6
+    assert len(groups) < 6
+    assert storage.pending() == 0
+    assert sorted(p.read_text() for p in (tmp_path / "a").iterdir()) == [str(i) for i in range(6)]
+
+
+def test_concurrent_fsync_commits_wait_until_written(tmp_path: Path) -> None:
+    storage = WriteBehindStorage(durability="fsync")
+
+    def ingest(i: int) -> None:
+        with WriteBatch(storage) as batch:
+            batch.write_text(tmp_path / "raw" / f"{i}.txt", f"text {i}")
+            batch.write_json(tmp_path / "events" / f"{i}.json", {"i": i})
+        # Returned from the commit: both files are already there.
+        assert json.loads((tmp_path / "events" / f"{i}.json").read_text(encoding="utf-8")) == {"i": i}
+        assert (tmp_path / "raw" / f"{i}.txt").read_text(encoding="utf-8") == f"text {i}"
+
+    threads = [threading.Thread(target=ingest, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    storage.close()
+
+    assert len(list((tmp_path / "events").iterdir())) == 8
+
+
+def test_failed_write_raises_in_waiting_caller(tmp_path: Path) -> None:
+    (tmp_path / "blocker").write_text("not a directory")
+    for storage in (DirectStorage(), WriteBehindStorage()):
+        with pytest.raises(OSError):
+            storage.commit([(tmp_path / "blocker" / "x.json", b"{}")])
+        storage.close()
+
+
+def test_batch_callbacks_wait_for_write_behind_writes(tmp_path: Path) -> None:
+    (tmp_path / "blocker").write_text("not a directory")
+    # One commit per group, so the failing write does not take the other one down with it.
+    storage = WriteBehindStorage(durability="none", group_max_writes=1, group_delay_s=0.1)
+    seen: list[str] = []
+
+    written = WriteBatch(storage)
+    written.write_text(tmp_path / "ok" / "a.txt", "a")
+    written.after_flush(lambda: seen.append(f"landed {(tmp_path / 'ok' / 'a.txt').exists()}"))
+    failing = WriteBatch(storage)
+    failing.write_text(tmp_path / "blocker" / "b.txt", "b")
+    failing.after_flush(lambda: seen.append("landed b"), on_error=lambda exc: seen.append("failed b"))
+
+    written.flush()
+    failing.flush()
+    # durability=none: flush returns before anything is written, so nothing has run yet.
+    assert seen == []
+    storage.close()
+
+    assert seen == ["landed True", "failed b"]
+    assert storage.failed_writes == 1
+
+
+def test_compact_json_for_ingest_artifacts(paths: ProjectPaths, orchestrator: IngestOrchestrator) -> None:
+    previous = set_storage(DirectStorage(compact_json=True))
+    try:
+        result = orchestrator.ingest_text(TEXT)
+    finally:
+        set_storage(previous)
+
+    for rel in (result.ingest_event_path, result.canonical_receipt_path):
+        content = (paths.root / rel).read_text(encoding="utf-8")
+        assert "\n" not in content and ": " not in content
+        json.loads(content)
+
+
+def test_atomic_json_follows_backend_settings(tmp_path: Path) -> None:
+    target = tmp_path / "jobs" / "job.json"
+    previous = set_storage(DirectStorage(durability="fsync", compact_json=True))
+    try:
+        write_json_atomic(target, {"status": "done", "items": [1, 2]})
+    finally:
+        set_storage(previous)
+
+    assert target.read_text(encoding="utf-8") == '{"status":"done","items":[1,2]}'
+    assert [p.name for p in target.parent.iterdir()] == ["job.json"]
+
+
+def test_config_rejects_unknown_durability(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("DATENERFASSUNG_STORAGE_DURABILITY", "sometimes")
+    with pytest.raises(ValueError, match="DURABILITY"):
+        StorageConfig.from_env()
@@ -0,0 +1,74 @@
+import hashlib
+import io
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from datenerfassung.ocr.cache import OcrCache
+from datenerfassung.ocr.paddleocr_backend import PaddleOcrConfig
+from datenerfassung.project_paths import ProjectPaths
+from datenerfassung.services.ingest_service import orchestrator as orchestrator_module
+from datenerfassung.services.ingest_service.orchestrator import IngestOrchestrator, UploadConfig
+from datenerfassung.storage import StreamTooLargeError, write_stream
+
+
+class _ChunkRecorder(io.BytesIO):
+    def __init__(self, data: bytes) -> None:
+        super().__init__(data)
+        self.reads: list[int] = []
+
+    def read(self, size: int | None = -1) -> bytes:
+        self.reads.append(-1 if size is None else size)
+        return super().read(size)
+
+
+def test_write_stream_copies_in_chunks_and_enforces_limit(tmp_path: Path) -> None:
+    data = bytes(range(256)) * 40
+    stream = _ChunkRecorder(data)
+
+    digest, size = write_stream(tmp_path / "images" / "a.jpg", stream, chunk_size=1000)
+
+    assert (tmp_path / "images" / "a.jpg").read_bytes() == data
+    assert (digest, size) == (hashlib.sha256(data).hexdigest(), len(data))
+    assert set(stream.reads) == {1000}
+
+    with pytest.raises(StreamTooLargeError):
+        write_stream(tmp_path / "images" / "b.jpg", io.BytesIO(data), max_bytes=len(data) - 1, chunk_size=1000)
+    assert sorted(p.name for p in (tmp_path / "images").iterdir()) == ["a.jpg"]
+
+
+def test_ingest_upload_reuses_stream_hash_for_ocr_cache(
+    paths: ProjectPaths,
+    make_orchestrator: Callable[..., IngestOrchestrator],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    calls: list[Path] = []
+
+    def fake_ocr(image_path: Path, *, config: PaddleOcrConfig | None = None) -> str:
+        calls.append(image_path)
+        return "Kaufland\nPfand 0,25"
+
+    def no_rehash(path: Path, *, chunk_size: int = 1 << 20) -> str:
+        raise AssertionError("uploaded images are hashed while they are stored")
+
+    monkeypatch.setattr(orchestrator_module, "ocr_image_path", fake_ocr)
+    monkeypatch.setattr(orchestrator_module, "hash_file", no_rehash)
+
+    cache = OcrCache(paths.data_dir / "ocr_cache")
+    orchestrator = make_orchestrator(
+        paths, ocr_cache=cache, uploads=UploadConfig(max_bytes=64 * 1024, chunk_bytes=4096)
+    )
+    photo = b"\xff\xd8" + b"x" * 20000
+
+    first = orchestrator.ingest_upload(io.BytesIO(photo), filename="bon.jpg")
+    second = orchestrator.ingest_upload(io.BytesIO(photo), filename="bon_again.jpg")
+
+    assert first.status == second.status == "ok_local"
+    assert (paths.root / first.raw_image_path).read_bytes() == photo
+    assert len(calls) == 1
+    assert cache.stats().hits == 1
+
+    with pytest.raises(StreamTooLargeError):
+        orchestrator.ingest_upload(io.BytesIO(b"x" * (64 * 1024 + 1)), filename="scan.jpg")
+    assert len(list((paths.raw_dir / "images").iterdir())) == 2